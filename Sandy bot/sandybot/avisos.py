@@ -0,0 +1,220 @@
+# Nombre de archivo: avisos.py
+# Ubicación de archivo: Sandy bot/sandybot/avisos.py
+# User-provided custom instructions
+"""Generación y envío de avisos de tareas programadas en lote.
+
+Reenviar el aviso de una tarea implicaba varias consultas por tarea: una
+``session.get`` por cada servicio y por su cliente, otra sesión en
+``generar_archivo_msg`` para el nombre del carrier y otra en
+``cargar_destinatarios`` al encolar. Para un rango de tareas eso se
+multiplica.
+
+:func:`cargar_avisos` trae tareas, servicios, clientes y carriers de un rango
+de IDs con joins en tres consultas como máximo (la tercera solo si hay
+servicios que guardan el cliente por nombre). :func:`enviar_avisos` arma todos
+los cuerpos con la plantilla leída una vez y los deja en la bandeja de salida
+con un único ``commit``; el trabajador del outbox los envía por la misma
+sesión SMTP del pool. Un rango no puede superar ``AVISOS_MAX_TAREAS`` tareas
+y cada aviso lleva una clave de idempotencia ligada al rango y al día, para que
+repetir el comando no duplique los correos.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func
+
+from .config import config
+from .database import (
+    Carrier,
+    Cliente,
+    CorreoSaliente,
+    Servicio,
+    SessionLocal,
+    TareaProgramada,
+    TareaServicio,
+)
+from .email_utils import (
+    aplicar_plantilla_aviso,
+    contenido_aviso,
+    destinatarios_cliente,
+    leer_plantilla_aviso,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AvisoTarea:
+    """Tarea con todo lo necesario para armar su aviso."""
+
+    tarea: TareaProgramada
+    servicios: list[Servicio] = field(default_factory=list)
+    cliente: Optional[Cliente] = None
+    carrier: Optional[Carrier] = None
+
+    @property
+    def asunto(self) -> str:
+        return f"Aviso de tarea programada - {self.cliente.nombre}"
+
+    @property
+    def carrier_nombre(self) -> Optional[str]:
+        return self.carrier.nombre if self.carrier else None
+
+    def cuerpo(self, plantilla: Optional[str] = None) -> str:
+        """Texto del aviso con ``plantilla`` ya leída (ver ``leer_plantilla_aviso``)."""
+        contenido = contenido_aviso(self.tarea, self.servicios, self.carrier_nombre)
+        return aplicar_plantilla_aviso(contenido, plantilla)
+
+
+@dataclass
+class ResultadoAvisos:
+    """Resumen de :func:`enviar_avisos`, con los IDs de tarea de cada caso.
+
+    ``repetidos`` son los avisos que ya estaban en la bandeja de salida por un
+    pedido anterior del mismo rango: no se duplican y, si habían fallado,
+    vuelven a la cola.
+    """
+
+    encolados: list[int] = field(default_factory=list)
+    repetidos: list[int] = field(default_factory=list)
+    sin_cliente: list[int] = field(default_factory=list)
+    sin_destinatarios: list[int] = field(default_factory=list)
+    fallidos: list[int] = field(default_factory=list)
+
+
+def cargar_avisos(
+    session, desde: int, hasta: int, carrier_nombre: Optional[str] = None
+) -> list[AvisoTarea]:
+    """Carga las tareas ``desde``..``hasta`` (inclusive) con sus relaciones.
+
+    El cliente es el del primer servicio que lo tenga, y el carrier el indicado
+    por ``carrier_nombre``, el de la tarea o, si todos los servicios comparten
+    uno, ese; igual que en ``/reenviar_aviso``.
+    """
+    avisos: dict[int, AvisoTarea] = {}
+    for tarea, carrier in (
+        session.query(TareaProgramada, Carrier)
+        .outerjoin(Carrier, TareaProgramada.carrier_id == Carrier.id)
+        .filter(TareaProgramada.id.between(desde, hasta))
+        .order_by(TareaProgramada.id)
+    ):
+        avisos[tarea.id] = AvisoTarea(tarea, carrier=carrier)
+    if not avisos:
+        return []
+
+    filas = (
+        session.query(TareaServicio.tarea_id, Servicio, Cliente, Carrier)
+        .join(Servicio, Servicio.id == TareaServicio.servicio_id)
+        .outerjoin(Cliente, Cliente.id == Servicio.cliente_id)
+        .outerjoin(Carrier, Carrier.id == Servicio.carrier_id)
+        .filter(TareaServicio.tarea_id.between(desde, hasta))
+        .order_by(TareaServicio.tarea_id, TareaServicio.id)
+        .all()
+    )
+
+    # Servicios viejos guardan el cliente solo por nombre: una consulta para todos
+    nombres = {s.cliente for _, s, _, _ in filas if not s.cliente_id and s.cliente}
+    por_nombre: dict[str, Cliente] = {}
+    if nombres:
+        por_nombre = {
+            c.nombre: c
+            for c in session.query(Cliente).filter(Cliente.nombre.in_(nombres))
+        }
+
+    carriers_servicios: dict[int, dict[int, Carrier]] = {}
+    for tarea_id, servicio, cliente, carrier in filas:
+        aviso = avisos.get(tarea_id)
+        if aviso is None:
+            continue
+        aviso.servicios.append(servicio)
+        if aviso.cliente is None:
+            if servicio.cliente_id:
+                aviso.cliente = cliente
+            else:
+                aviso.cliente = por_nombre.get(servicio.cliente)
+        if carrier is not None:
+            carriers_servicios.setdefault(tarea_id, {})[carrier.id] = carrier
+
+    forzado = None
+    if carrier_nombre:
+        forzado = session.query(Carrier).filter(Carrier.nombre == carrier_nombre).first()
+    for tarea_id, aviso in avisos.items():
+        if carrier_nombre:
+            aviso.carrier = forzado
+        if aviso.carrier is None:
+            candidatos = carriers_servicios.get(tarea_id, {})
+            if len(candidatos) == 1:
+                aviso.carrier = next(iter(candidatos.values()))
+    return list(avisos.values())
+
+
+def clave_aviso(desde: int, hasta: int, tarea_id: int) -> str:
+    """Clave de idempotencia del aviso de ``tarea_id`` pedido en ese rango hoy."""
+    return f"avisos-{date.today():%Y%m%d}-{desde}-{hasta}-tarea-{tarea_id}"
+
+
+def enviar_avisos(
+    desde: int, hasta: int, carrier_nombre: Optional[str] = None
+) -> ResultadoAvisos:
+    """Encola el aviso de cada tarea ``desde``..``hasta`` para su cliente.
+
+    Los destinatarios salen del cliente ya cargado (los del carrier si hay
+    uno, como en ``encolar_correo``). Lanza ``ValueError`` si el rango supera
+    ``AVISOS_MAX_TAREAS``. Repetir el mismo rango en el día no duplica los
+    correos: esas tareas quedan en ``repetidos``.
+    """
+    from .outbox import encolar_lote
+
+    if hasta - desde + 1 > config.AVISOS_MAX_TAREAS:
+        raise ValueError(
+            f"El rango {desde}-{hasta} supera el máximo de "
+            f"{config.AVISOS_MAX_TAREAS} tareas"
+        )
+
+    resultado = ResultadoAvisos()
+    plantilla = leer_plantilla_aviso()
+    lote: list[tuple[list[str], str, str, str]] = []
+    tareas_lote: list[int] = []
+    with SessionLocal() as session:
+        for aviso in cargar_avisos(session, desde, hasta, carrier_nombre):
+            if aviso.cliente is None:
+                resultado.sin_cliente.append(aviso.tarea.id)
+                continue
+            correos = destinatarios_cliente(aviso.cliente, aviso.carrier_nombre)
+            if not correos:
+                resultado.sin_destinatarios.append(aviso.tarea.id)
+                continue
+            lote.append(
+                (
+                    correos,
+                    aviso.asunto,
+                    aviso.cuerpo(plantilla),
+                    clave_aviso(desde, hasta, aviso.tarea.id),
+                )
+            )
+            tareas_lote.append(aviso.tarea.id)
+        # Los IDs son crecientes: hasta acá llegan los correos ya encolados
+        ultimo_id = session.query(func.max(CorreoSaliente.id)).scalar() or 0
+
+    for tarea_id, id_correo in zip(tareas_lote, encolar_lote(lote)):
+        if id_correo is None:
+            resultado.fallidos.append(tarea_id)
+        elif id_correo <= ultimo_id:
+            resultado.repetidos.append(tarea_id)
+        else:
+            resultado.encolados.append(tarea_id)
+    logger.info(
+        "Avisos %s-%s: %s encolados, %s repetidos, %s sin cliente, %s sin destinatarios",
+        desde,
+        hasta,
+        len(resultado.encolados),
+        len(resultado.repetidos),
+        len(resultado.sin_cliente),
+        len(resultado.sin_destinatarios),
+    )
+    return resultado
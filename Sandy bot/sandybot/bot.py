@@ -18,117 +18,120 @@ from telegram.ext import (
 )
 
 from .config import config
-from .gpt_handler import gpt
-from .handlers import (
-    start_handler,
-    callback_handler,
-    message_handler,
-    document_handler,
-    voice_handler,
-    iniciar_comparador,
-    procesar_comparacion,
-    iniciar_carga_tracking,
-    iniciar_descarga_tracking,
-    iniciar_envio_camaras_mail,
-    iniciar_informe_sla,
-)
-from .handlers import (
-    agregar_destinatario,
-    eliminar_destinatario,
-    listar_destinatarios,
-    listar_carriers,
-    agregar_carrier,
-    eliminar_carrier,
-    registrar_tarea_programada,
-    listar_tareas,
-    detectar_tarea_mail,
-    iniciar_identificador_tarea,
-    procesar_identificador_tarea,
-    procesar_correos,
-    reenviar_aviso,
-    supermenu,
-    listar_servicios,
-    listar_reclamos,
-    listar_camaras,
-    depurar_duplicados,
-    listar_clientes,
-    listar_carriers_cdb,
-    listar_conversaciones,
-    listar_ingresos,
-    listar_tareas_programadas,
-    listar_tareas_servicio,
-)
 
 logger = logging.getLogger(__name__)
 
 
+def _diferido(nombre: str):
+    """Devuelve un callback que importa el handler ``nombre`` al primer uso.
+
+    Registrar los handlers así evita que importar el bot cargue todos los
+    módulos de ``sandybot.handlers`` (y con ellos pandas, python-docx, etc.).
+    """
+
+    async def _callback(update: Update, context: Any):
+        from . import handlers
+
+        return await getattr(handlers, nombre)(update, context)
+
+    _callback.__name__ = nombre
+    _callback.__qualname__ = nombre
+    return _callback
+
+
+
 class SandyBot:
     """Clase principal del bot"""
 
     def __init__(self):
         """Inicializa el bot y sus handlers"""
         self.app = Application.builder().token(config.TELEGRAM_TOKEN).build()
+        # El trabajador de la bandeja de salida corre dentro del loop del bot
+        self.app.post_init = self._iniciar_outbox
+        self.app.post_shutdown = self._detener_outbox
         self._setup_handlers()
 
+    @staticmethod
+    async def _iniciar_outbox(app: Application) -> None:
+        from .outbox import iniciar_trabajador
+
+        await iniciar_trabajador(app)
+
+    @staticmethod
+    async def _detener_outbox(app: Application) -> None:
+        from .outbox import detener_trabajador
+
+        await detener_trabajador(app)
+
     def _setup_handlers(self):
         """Configura los handlers del bot"""
         # Comandos básicos
-        self.app.add_handler(CommandHandler("start", start_handler))
-        self.app.add_handler(CommandHandler("comparar_fo", iniciar_comparador))
-        self.app.add_handler(CommandHandler("procesar", procesar_comparacion))
-        self.app.add_handler(CommandHandler("cargar_tracking", iniciar_carga_tracking))
+        self.app.add_handler(CommandHandler("start", _diferido("start_handler")))
+        self.app.add_handler(CommandHandler("comparar_fo", _diferido("iniciar_comparador")))
+        self.app.add_handler(CommandHandler("procesar", _diferido("procesar_comparacion")))
+        self.app.add_handler(CommandHandler("cargar_tracking", _diferido("iniciar_carga_tracking")))
         self.app.add_handler(
-            CommandHandler("descargar_tracking", iniciar_descarga_tracking)
+            CommandHandler("descargar_tracking", _diferido("iniciar_descarga_tracking"))
         )
 
         self.app.add_handler(
-            CommandHandler("agregar_destinatario", agregar_destinatario)
+            CommandHandler("agregar_destinatario", _diferido("agregar_destinatario"))
+        )
+        self.app.add_handler(
+            CommandHandler("eliminar_destinatario", _diferido("eliminar_destinatario"))
+        )
+        self.app.add_handler(
+            CommandHandler("listar_destinatarios", _diferido("listar_destinatarios"))
+        )
+        self.app.add_handler(
+            CommandHandler("registrar_tarea", _diferido("registrar_tarea_programada"))
         )
+        self.app.add_handler(CommandHandler("listar_carriers", _diferido("listar_carriers")))
+        self.app.add_handler(CommandHandler("agregar_carrier", _diferido("agregar_carrier")))
+        self.app.add_handler(CommandHandler("eliminar_carrier", _diferido("eliminar_carrier")))
+        self.app.add_handler(CommandHandler("listar_tareas", _diferido("listar_tareas")))
+        self.app.add_handler(CommandHandler("detectar_tarea", _diferido("detectar_tarea_mail")))
         self.app.add_handler(
-            CommandHandler("eliminar_destinatario", eliminar_destinatario)
+            CommandHandler("identificar_tarea", _diferido("iniciar_identificador_tarea"))
         )
+        self.app.add_handler(CommandHandler("procesar_correos", _diferido("procesar_correos")))
         self.app.add_handler(
-            CommandHandler("listar_destinatarios", listar_destinatarios)
+            CommandHandler("limpiar_cache_correos", _diferido("limpiar_cache_correos"))
         )
+        self.app.add_handler(CommandHandler("reenviar_aviso", _diferido("reenviar_aviso")))
+        self.app.add_handler(CommandHandler("avisos_tareas", _diferido("avisos_tareas")))
+        self.app.add_handler(CommandHandler("informe_sla", _diferido("iniciar_informe_sla")))
+        self.app.add_handler(CommandHandler("Supermenu", _diferido("supermenu")))
+        self.app.add_handler(CommandHandler("CDB_Servicios", _diferido("listar_servicios")))
+        self.app.add_handler(CommandHandler("CDB_Reclamos", _diferido("listar_reclamos")))
+        self.app.add_handler(CommandHandler("CDB_Camaras", _diferido("listar_camaras")))
+        self.app.add_handler(CommandHandler("Depurar_Duplicados", _diferido("depurar_duplicados")))
+        self.app.add_handler(CommandHandler("CDB_Clientes", _diferido("listar_clientes")))
+        self.app.add_handler(CommandHandler("CDB_Carriers", _diferido("listar_carriers_cdb")))
+        self.app.add_handler(CommandHandler("CDB_Conversaciones", _diferido("listar_conversaciones")))
+        self.app.add_handler(CommandHandler("CDB_Ingresos", _diferido("listar_ingresos")))
+        self.app.add_handler(CommandHandler("CDB_Tareas", _diferido("listar_tareas_programadas")))
+        self.app.add_handler(CommandHandler("CDB_TareasServicio", _diferido("listar_tareas_servicio")))
         self.app.add_handler(
-            CommandHandler("registrar_tarea", registrar_tarea_programada)
+            CommandHandler("CDB_CorreosFallidos", _diferido("listar_correos_fallidos"))
         )
-        self.app.add_handler(CommandHandler("listar_carriers", listar_carriers))
-        self.app.add_handler(CommandHandler("agregar_carrier", agregar_carrier))
-        self.app.add_handler(CommandHandler("eliminar_carrier", eliminar_carrier))
-        self.app.add_handler(CommandHandler("listar_tareas", listar_tareas))
-        self.app.add_handler(CommandHandler("detectar_tarea", detectar_tarea_mail))
         self.app.add_handler(
-            CommandHandler("identificar_tarea", iniciar_identificador_tarea)
+            CommandHandler("Reintentar_Correo", _diferido("reintentar_correos_fallidos"))
         )
-        self.app.add_handler(CommandHandler("procesar_correos", procesar_correos))
-        self.app.add_handler(CommandHandler("reenviar_aviso", reenviar_aviso))
-        self.app.add_handler(CommandHandler("informe_sla", iniciar_informe_sla))
-        self.app.add_handler(CommandHandler("Supermenu", supermenu))
-        self.app.add_handler(CommandHandler("CDB_Servicios", listar_servicios))
-        self.app.add_handler(CommandHandler("CDB_Reclamos", listar_reclamos))
-        self.app.add_handler(CommandHandler("CDB_Camaras", listar_camaras))
-        self.app.add_handler(CommandHandler("Depurar_Duplicados", depurar_duplicados))
-        self.app.add_handler(CommandHandler("CDB_Clientes", listar_clientes))
-        self.app.add_handler(CommandHandler("CDB_Carriers", listar_carriers_cdb))
-        self.app.add_handler(CommandHandler("CDB_Conversaciones", listar_conversaciones))
-        self.app.add_handler(CommandHandler("CDB_Ingresos", listar_ingresos))
-        self.app.add_handler(CommandHandler("CDB_Tareas", listar_tareas_programadas))
-        self.app.add_handler(CommandHandler("CDB_TareasServicio", listar_tareas_servicio))
 
         # Callbacks de botones
-        self.app.add_handler(CallbackQueryHandler(callback_handler))
+        self.app.add_handler(CallbackQueryHandler(_diferido("callback_handler")))
 
         # Mensajes de texto
         self.app.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler)
+            MessageHandler(filters.TEXT & ~filters.COMMAND, _diferido("message_handler"))
         )
 
         # Documentos
-        self.app.add_handler(MessageHandler(filters.Document.ALL, document_handler))
+        self.app.add_handler(MessageHandler(filters.Document.ALL, _diferido("document_handler")))
 
         # Mensajes de voz
-        self.app.add_handler(MessageHandler(filters.VOICE, voice_handler))
+        self.app.add_handler(MessageHandler(filters.VOICE, _diferido("voice_handler")))
 
         # Error handler
         self.app.add_error_handler(self._error_handler)
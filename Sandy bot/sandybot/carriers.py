@@ -0,0 +1,193 @@
+# Nombre de archivo: carriers.py
+# Ubicación de archivo: Sandy bot/sandybot/carriers.py
+# User-provided custom instructions
+"""Registro de carriers para el análisis de avisos por correo.
+
+Cada carrier se declara en ``data/carriers.json`` (``ARCHIVO_CARRIERS``) con:
+
+- ``nombre``: nombre con el que se registra en la base.
+- ``remitentes``: expresiones que identifican sus direcciones de correo.
+- ``id_interno``: patrón del identificador de la tarea en el aviso.
+- ``servicio``: patrón de los IDs de servicio que informa.
+- ``formatos_fecha``: formatos ``strptime`` propios, que se prueban antes que
+  los genéricos.
+- ``estricto`` (opcional, ``true`` por defecto): si se descartan los IDs que no
+  cumplen ``servicio``. Con ``false`` solo se filtran los puramente numéricos.
+- ``etiquetas`` (opcional): rótulos propios del carrier para cada campo del
+  aviso (``inicio``, ``fin``, ``tipo``, ``ids``...), que se suman a los de
+  :mod:`sandybot.extractor_correo`.
+
+La entrada ``generico`` se usa cuando no se reconoce el carrier. Todas las
+expresiones se compilan una vez al cargar el archivo: los remitentes se
+combinan en una única alternancia y los patrones de id y servicio forman parte
+del escáner de :mod:`sandybot.escaner_correo`, así que sumar un carrier es
+agregar una entrada al JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import config
+from .escaner_correo import Escaneo, EscanerCorreo
+
+logger = logging.getLogger(__name__)
+
+# Valores usados si falta el archivo o la entrada ``generico``
+_GENERICO = {
+    "id_interno": r"ID\w+",
+    "servicio": r"\b\d{6,}\b",
+    "estricto": False,
+    "formatos_fecha": [
+        "%Y-%m-%d %H:%M",
+        "%Y-%m-%d %H:%M:%S",
+        "%d/%m/%Y %H:%M",
+        "%d/%m/%Y %H:%M:%S",
+        "%d/%m %H:%M",
+        "%d/%m %H:%M:%S",
+    ],
+}
+
+
+def _compilar(patron: Optional[str]) -> Optional[re.Pattern]:
+    return re.compile(patron) if patron else None
+
+
+@dataclass(frozen=True)
+class PerfilCarrier:
+    """Reglas ya compiladas de un carrier."""
+
+    nombre: Optional[str]
+    remitentes: tuple[str, ...]
+    id_interno: Optional[re.Pattern]
+    servicio: Optional[re.Pattern]
+    formatos_fecha: tuple[str, ...]
+    estricto: bool = True
+    etiquetas: Optional[dict[str, tuple[str, ...]]] = None
+
+    def buscar_id_interno(self, texto: str) -> Optional[str]:
+        if not self.id_interno:
+            return None
+        m = self.id_interno.search(texto)
+        return m.group(0) if m else None
+
+    def buscar_servicios(self, texto: str) -> list[str]:
+        return self.servicio.findall(texto) if self.servicio else []
+
+    def filtrar_ids(self, ids: Iterable[str]) -> tuple[list[str], list[str]]:
+        """Separa ``ids`` en (válidos, descartados) según ``servicio``."""
+        validos: list[str] = []
+        descartados: list[str] = []
+        for ident in ids:
+            if self.servicio is None:
+                valido = True
+            elif self.estricto or ident.isdigit():
+                valido = self.servicio.fullmatch(ident) is not None
+            else:
+                valido = True
+            (validos if valido else descartados).append(ident)
+        return validos, descartados
+
+
+def _perfil(datos: dict, generico: Optional[PerfilCarrier] = None) -> PerfilCarrier:
+    formatos = tuple(datos.get("formatos_fecha") or ())
+    if generico:
+        formatos += tuple(f for f in generico.formatos_fecha if f not in formatos)
+    return PerfilCarrier(
+        nombre=datos.get("nombre"),
+        remitentes=tuple(datos.get("remitentes") or ()),
+        id_interno=_compilar(datos.get("id_interno")),
+        servicio=_compilar(datos.get("servicio")),
+        formatos_fecha=formatos,
+        estricto=bool(datos.get("estricto", True)),
+        etiquetas={
+            campo: tuple(valores)
+            for campo, valores in (datos.get("etiquetas") or {}).items()
+        }
+        or None,
+    )
+
+
+class RegistroCarriers:
+    """Perfiles de carriers indexados por nombre y por remitente."""
+
+    def __init__(self, carriers: Iterable[dict], generico: Optional[dict] = None) -> None:
+        self.generico = _perfil({**_GENERICO, **(generico or {}), "nombre": None})
+        self._por_nombre: dict[str, PerfilCarrier] = {}
+        grupos: list[str] = []
+        self._grupos: dict[str, PerfilCarrier] = {}
+        for datos in carriers:
+            perfil = _perfil(datos, self.generico)
+            if not perfil.nombre:
+                logger.warning("Carrier sin nombre en el registro: %s", datos)
+                continue
+            self._por_nombre[perfil.nombre.upper()] = perfil
+            for patron in perfil.remitentes:
+                grupo = f"c{len(grupos)}"
+                grupos.append(f"(?P<{grupo}>{patron})")
+                self._grupos[grupo] = perfil
+        # Una sola alternancia: el primer remitente que coincide define el carrier
+        self._remitentes = re.compile("|".join(grupos), re.I) if grupos else None
+        self._escaner = EscanerCorreo(
+            [self.generico, *self._por_nombre.values()],
+            self.obtener,
+            self.detectar_por_remitente,
+        )
+
+    @classmethod
+    def desde_archivo(cls, ruta: Path | str) -> "RegistroCarriers":
+        """Carga el registro desde un JSON; si no existe usa solo el genérico."""
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            logger.warning("No se encontró %s; se usa el carrier genérico", ruta)
+            datos = {}
+        return cls(datos.get("carriers", []), datos.get("generico"))
+
+    @property
+    def nombres(self) -> list[str]:
+        return [p.nombre for p in self._por_nombre.values()]
+
+    def detectar_por_remitente(self, remitente: str) -> Optional[PerfilCarrier]:
+        if not self._remitentes or not remitente:
+            return None
+        m = self._remitentes.search(remitente)
+        return self._grupos[m.lastgroup] if m else None
+
+    def escanear(self, texto: str) -> Escaneo:
+        """Limpia el correo y detecta carrier, id interno y servicios en una pasada."""
+        return self._escaner.escanear(texto)
+
+    def obtener(self, nombre: Optional[str]) -> PerfilCarrier:
+        """Perfil del carrier ``nombre`` o el genérico si no está registrado."""
+        if not nombre:
+            return self.generico
+        return self._por_nombre.get(nombre.strip().upper(), self.generico)
+
+
+_registro: Optional[RegistroCarriers] = None
+_registro_lock = threading.Lock()
+
+
+def obtener_registro() -> RegistroCarriers:
+    """Registro compartido, cargado de ``ARCHIVO_CARRIERS`` la primera vez."""
+    global _registro
+    with _registro_lock:
+        if _registro is None:
+            _registro = RegistroCarriers.desde_archivo(config.ARCHIVO_CARRIERS)
+        return _registro
+
+
+def recargar_registro() -> RegistroCarriers:
+    """Vuelve a leer el archivo de carriers (por ejemplo tras editarlo)."""
+    global _registro
+    with _registro_lock:
+        _registro = RegistroCarriers.desde_archivo(config.ARCHIVO_CARRIERS)
+        return _registro
@@ -43,6 +43,18 @@ class Config:  # pylint: disable=too-many-instance-attributes
         self.DATA_DIR = self.BASE_DIR / "data"
         self.LOG_DIR = self.BASE_DIR / "logs"
         self.HISTORICO_DIR = self.DATA_DIR / "historico"
+        # Trackings ya parseados, indexados por SHA-256 del contenido
+        self.TRACKING_CACHE_DIR = Path(
+            os.getenv("TRACKING_CACHE_DIR", self.DATA_DIR / "tracking_cache")
+        )
+        # Entradas que se conservan en ``servicios.trackings``; el historial
+        # completo queda en la tabla ``tracking_versiones``
+        self.TRACKINGS_MAX_ENTRADAS = int(os.getenv("TRACKINGS_MAX_ENTRADAS", "20"))
+        # Copiar además a ``HISTORICO_DIR`` los trackings que ya quedaron
+        # comprimidos en ``tracking_versiones``
+        self.TRACKING_HISTORICO_TXT = (
+            os.getenv("TRACKING_HISTORICO_TXT", "false").lower() == "true"
+        )
 
 
         # Rutas historial/plantillas SLA
@@ -70,12 +82,22 @@ class Config:  # pylint: disable=too-many-instance-attributes
         self.SUPER_PASS = os.getenv("SUPER_PASS", "Bio123")
 
         # 4) Archivos comunes
-        self.ARCHIVO_CONTADOR = self.DATA_DIR / "contador_diario.json"
+        self.ARCHIVO_CONTADOR = Path(
+            os.getenv("CONTADOR_FILE", self.DATA_DIR / "contador_diario.json")
+        )
         self.ARCHIVO_INTERACCIONES = self.DATA_DIR / "interacciones.json"
         self.ARCHIVO_DESTINATARIOS = self.DATA_DIR / "destinatarios.json"
+        # Registro de carriers para analizar avisos por correo
+        self.ARCHIVO_CARRIERS = Path(
+            os.getenv("CARRIERS_FILE", self.DATA_DIR / "carriers.json")
+        )
         self.LOG_FILE = self.LOG_DIR / "sandy.log"
         self.ERRORES_FILE = self.LOG_DIR / "errores_ingresos.log"
         self.GPT_CACHE_FILE = self.DATA_DIR / "gpt_cache.json"
+        # Tareas ya extraídas de correos, indexadas por hash del texto
+        self.EXTRACCION_CACHE_FILE = Path(
+            os.getenv("EXTRACCION_CACHE_FILE", self.DATA_DIR / "extracciones_cache.json")
+        )
 
         # 5) Plantillas
         self.PLANTILLA_PATH = os.getenv(
@@ -88,6 +110,23 @@ class Config:  # pylint: disable=too-many-instance-attributes
         )
         Path(self.SLA_PLANTILLA_PATH).parent.mkdir(parents=True, exist_ok=True)
 
+        # Conversión a PDF con LibreOffice headless
+        self.SOFFICE_PATH = os.getenv("SOFFICE_PATH")
+        self.PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+        self.PDF_TIMEOUT = float(os.getenv("PDF_TIMEOUT", "60"))
+
+        # Teselas para los mapas de repetitividad (cache local z/x/y)
+        self.TILES_DIR = Path(os.getenv("TILES_DIR", self.DATA_DIR / "tiles"))
+        self.TILES_URL = os.getenv(
+            "TILES_URL", "https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+        )
+        self.TILES_MAX_MB = int(os.getenv("TILES_MAX_MB", "500"))
+        self.TILES_OFFLINE = os.getenv("TILES_OFFLINE", "false").lower() == "true"
+        # Procesos para dibujar mapas en paralelo
+        self.MAP_WORKERS = int(
+            os.getenv("MAP_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
+
         # 6) Firma de correos opcional
         self.SIGNATURE_PATH = os.getenv("SIGNATURE_PATH")
         self.MSG_TEMPLATE_PATH = os.getenv(
@@ -102,6 +141,14 @@ class Config:  # pylint: disable=too-many-instance-attributes
         self.GPT_CACHE_TIMEOUT = 3600  # 1 hora
         # Cada cuántas consultas se persiste la cache de GPT
         self.GPT_CACHE_SAVE_INTERVAL = int(os.getenv("GPT_CACHE_SAVE_INTERVAL", "5"))
+        # Correos que se analizan a la vez en /procesar_correos
+        self.CORREOS_CONCURRENCIA = int(os.getenv("CORREOS_CONCURRENCIA", "4"))
+        # Segundos que se recuerda la tarea extraída de un correo (0 = sin cache)
+        self.EXTRACCION_CACHE_TTL = int(os.getenv("EXTRACCION_CACHE_TTL", "604800"))
+        # Procesos que leen los .msg en paralelo (0 = en el proceso del bot)
+        self.MSG_WORKERS = int(
+            os.getenv("MSG_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
 
         # 8) Conexión BD
         self.DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -117,6 +164,19 @@ class Config:  # pylint: disable=too-many-instance-attributes
         self.SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", os.getenv("EMAIL_PASSWORD"))
         self.EMAIL_FROM = os.getenv("EMAIL_FROM")
         self.SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() != "false"
+        # Conexiones SMTP persistentes: cantidad por servidor, segundos de
+        # inactividad antes de verificar con NOOP y máximo antes de descartarla
+        self.SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+        self.SMTP_KEEPALIVE = float(os.getenv("SMTP_KEEPALIVE", "30"))
+        self.SMTP_IDLE_MAX = float(os.getenv("SMTP_IDLE_MAX", "240"))
+        # Bandeja de salida: segundos entre revisiones, reintentos antes de
+        # pasar a fallidos y espera exponencial (base y tope en segundos)
+        self.OUTBOX_INTERVALO = float(os.getenv("OUTBOX_INTERVALO", "30"))
+        self.OUTBOX_MAX_INTENTOS = int(os.getenv("OUTBOX_MAX_INTENTOS", "6"))
+        self.OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "60"))
+        self.OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "3600"))
+        # Máximo de tareas que /avisos_tareas acepta en un mismo rango
+        self.AVISOS_MAX_TAREAS = int(os.getenv("AVISOS_MAX_TAREAS", "50"))
 
         # Aliases legacy
         self.EMAIL_HOST = self.SMTP_HOST
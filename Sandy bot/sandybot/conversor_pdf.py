@@ -0,0 +1,272 @@
+# Nombre de archivo: conversor_pdf.py
+# Ubicación de archivo: Sandy bot/sandybot/conversor_pdf.py
+# User-provided custom instructions
+"""Conversión DOCX → PDF con un pool de LibreOffice en modo headless.
+
+Levantar ``soffice`` cuesta varios segundos (sobre todo la primera vez, cuando
+crea el perfil de usuario). Para no pagar ese costo en cada informe se mantiene
+un pool de trabajadores, cada uno con su propio perfil, de modo que varias
+conversiones puedan correr en paralelo sin pisarse el bloqueo del perfil.
+
+- Si el módulo ``uno`` está disponible, cada trabajador mantiene un proceso
+  ``soffice --accept`` vivo y convierte a través del puente UNO.
+- Si no, se ejecuta ``soffice --convert-to pdf`` reutilizando el perfil ya
+  inicializado del trabajador.
+
+En ambos casos se respeta un tiempo máximo y, ante cualquier error, se
+devuelve ``None`` para que el llamador entregue el DOCX original.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+# ▸ Puente UNO opcional (paquete python3-uno de LibreOffice)
+try:  # pragma: no cover - depende de la instalación de LibreOffice
+    import uno  # type: ignore
+    from com.sun.star.beans import PropertyValue  # type: ignore
+except Exception:  # pragma: no cover
+    uno = None
+    PropertyValue = None
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+_EJECUTABLES = ("soffice", "libreoffice")
+
+
+def buscar_soffice() -> Optional[str]:
+    """Devuelve la ruta al ejecutable de LibreOffice o ``None`` si no existe."""
+    if config.SOFFICE_PATH:
+        return config.SOFFICE_PATH if Path(config.SOFFICE_PATH).exists() else None
+    for nombre in _EJECUTABLES:
+        ruta = shutil.which(nombre)
+        if ruta:
+            return ruta
+    return None
+
+
+def _puerto_libre() -> int:
+    """Pide al sistema un puerto TCP libre para el listener UNO."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Trabajador:
+    """Una instancia de LibreOffice con perfil propio."""
+
+    def __init__(self, soffice: str, indice: int, usar_uno: bool) -> None:
+        self.soffice = soffice
+        self.indice = indice
+        self.usar_uno = usar_uno
+        self.perfil = Path(tempfile.mkdtemp(prefix=f"sandy_lo_{indice}_"))
+        self.proceso: Optional[subprocess.Popen] = None
+        self.puerto: Optional[int] = None
+        self.desktop = None
+
+    # ── Utilidades ────────────────────────────────────────────────────
+    def _args_base(self) -> list[str]:
+        return [
+            self.soffice,
+            f"-env:UserInstallation={self.perfil.as_uri()}",
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--norestore",
+            "--nodefault",
+        ]
+
+    def _iniciar_listener(self, timeout: float) -> None:
+        """Levanta ``soffice --accept`` y se conecta por UNO."""
+        self.puerto = _puerto_libre()
+        self.proceso = subprocess.Popen(
+            self._args_base()
+            + [f"--accept=socket,host=127.0.0.1,port={self.puerto};urp;"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        url = (
+            f"uno:socket,host=127.0.0.1,port={self.puerto};urp;"
+            "StarOffice.ComponentContext"
+        )
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > limite or self.proceso.poll() is not None:
+                    self.detener()
+                    raise TimeoutError("LibreOffice no aceptó conexiones a tiempo")
+                time.sleep(0.2)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx
+        )
+
+    def detener(self) -> None:
+        """Finaliza el proceso persistente, si lo hay."""
+        self.desktop = None
+        if self.proceso and self.proceso.poll() is None:
+            self.proceso.kill()
+            try:
+                self.proceso.wait(timeout=5)
+            except subprocess.TimeoutExpired:  # pragma: no cover
+                pass
+        self.proceso = None
+
+    def eliminar(self) -> None:
+        """Detiene el proceso y borra el perfil temporal."""
+        self.detener()
+        shutil.rmtree(self.perfil, ignore_errors=True)
+
+    # ── Conversión ────────────────────────────────────────────────────
+    def _convertir_uno(self, origen: Path, destino: Path, timeout: float) -> None:
+        if self.desktop is None or self.proceso is None or self.proceso.poll() is not None:
+            self._iniciar_listener(timeout)
+
+        # Si la conversión se cuelga se mata el proceso, lo que corta la
+        # llamada UNO con una excepción y libera al trabajador.
+        vigilante = threading.Timer(timeout, self.detener)
+        vigilante.start()
+        try:
+            oculto = (PropertyValue(Name="Hidden", Value=True),)
+            doc = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(origen)), "_blank", 0, oculto
+            )
+            try:
+                filtro = (PropertyValue(Name="FilterName", Value="writer_pdf_Export"),)
+                doc.storeToURL(uno.systemPathToFileUrl(str(destino)), filtro)
+            finally:
+                doc.close(True)
+        except Exception:
+            self.detener()
+            raise
+        finally:
+            vigilante.cancel()
+
+    def _convertir_cli(self, origen: Path, destino: Path, timeout: float) -> None:
+        with tempfile.TemporaryDirectory(prefix="sandy_pdf_") as salida:
+            subprocess.run(
+                self._args_base()
+                + ["--convert-to", "pdf", "--outdir", salida, str(origen)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=timeout,
+                check=True,
+            )
+            generado = Path(salida) / (origen.stem + ".pdf")
+            if not generado.exists():
+                raise FileNotFoundError(generado)
+            shutil.move(str(generado), destino)
+
+    def convertir(self, origen: Path, destino: Path, timeout: float) -> None:
+        if self.usar_uno:
+            self._convertir_uno(origen, destino, timeout)
+        else:
+            self._convertir_cli(origen, destino, timeout)
+
+
+class PoolLibreOffice:
+    """Pool de trabajadores LibreOffice reutilizables."""
+
+    def __init__(
+        self,
+        soffice: str,
+        trabajadores: int = 2,
+        usar_uno: Optional[bool] = None,
+    ) -> None:
+        if usar_uno is None:
+            usar_uno = uno is not None
+        self._libres: "queue.Queue[_Trabajador]" = queue.Queue()
+        self._todos = [
+            _Trabajador(soffice, i, usar_uno) for i in range(max(1, trabajadores))
+        ]
+        for trabajador in self._todos:
+            self._libres.put(trabajador)
+
+    def convertir(
+        self,
+        ruta_docx: str | Path,
+        ruta_pdf: str | Path | None = None,
+        timeout: float | None = None,
+    ) -> Optional[str]:
+        """Convierte ``ruta_docx`` a PDF y devuelve la ruta o ``None``."""
+        timeout = timeout or config.PDF_TIMEOUT
+        origen = Path(ruta_docx).resolve()
+        destino = Path(ruta_pdf) if ruta_pdf else origen.with_suffix(".pdf")
+
+        try:
+            trabajador = self._libres.get(timeout=timeout)
+        except queue.Empty:
+            logger.warning("No hay trabajadores LibreOffice libres para %s", origen)
+            return None
+
+        try:
+            trabajador.convertir(origen, destino, timeout)
+            return str(destino)
+        except Exception as exc:
+            logger.warning("Conversión a PDF con LibreOffice falló: %s", exc)
+            destino.unlink(missing_ok=True)
+            return None
+        finally:
+            self._libres.put(trabajador)
+
+    def cerrar(self) -> None:
+        """Detiene todos los procesos y borra los perfiles temporales."""
+        for trabajador in self._todos:
+            trabajador.eliminar()
+
+
+_pool: Optional[PoolLibreOffice] = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool() -> Optional[PoolLibreOffice]:
+    """Crea el pool compartido bajo demanda. ``None`` si no hay LibreOffice."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            soffice = buscar_soffice()
+            if not soffice:
+                return None
+            _pool = PoolLibreOffice(soffice, config.PDF_WORKERS)
+            atexit.register(cerrar_pool)
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Libera el pool compartido (se registra con ``atexit``)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.cerrar()
+            _pool = None
+
+
+def convertir_a_pdf(
+    ruta_docx: str | Path,
+    ruta_pdf: str | Path | None = None,
+    timeout: float | None = None,
+) -> Optional[str]:
+    """Atajo que usa el pool compartido. Devuelve ``None`` si no se pudo."""
+    pool = obtener_pool()
+    if pool is None:
+        logger.info("LibreOffice no está instalado; se omite la conversión a PDF")
+        return None
+    return pool.convertir(ruta_docx, ruta_pdf, timeout)
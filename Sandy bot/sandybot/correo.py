@@ -6,6 +6,7 @@ import smtplib
 from email.message import EmailMessage
 import logging
 from .config import config
+from .smtp_pool import obtener_pool
 
 logger = logging.getLogger(__name__)
 
@@ -51,11 +52,16 @@ def enviar_email(destinatarios, asunto, cuerpo, archivo_adjunto, nombre_adjunto=
         return False
 
     try:
-        with smtplib.SMTP(config.SMTP_HOST, config.SMTP_PORT) as server:
-            server.starttls()
-            if config.SMTP_USER and config.SMTP_PASSWORD:
-                server.login(config.SMTP_USER, config.SMTP_PASSWORD)
-            server.send_message(msg)
+        # La sesión se toma del pool compartido y queda abierta al terminar
+        obtener_pool().enviar(
+            lambda server: server.send_message(msg),
+            smtplib.SMTP,
+            config.SMTP_HOST,
+            config.SMTP_PORT,
+            usuario=config.SMTP_USER,
+            clave=config.SMTP_PASSWORD,
+            starttls=True,
+        )
         logger.info("Correo enviado a %s", destinatarios)
         return True
     except Exception as e:
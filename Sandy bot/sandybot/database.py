@@ -1,11 +1,13 @@
 # Nombre de archivo: database.py
 # Ubicación de archivo: Sandy bot/sandybot/database.py
 # User-provided custom instructions
+import hashlib
 import json
 import logging
+import zlib
 from datetime import datetime
+from pathlib import Path
 
-import pandas as pd
 from sqlalchemy import (  # (+) Necesario para definir y recrear índices de forma explícita; (+) Mantiene la restricción única de tareas_servicio
     JSON,
     Column,
@@ -13,7 +15,9 @@ from sqlalchemy import (  # (+) Necesario para definir y recrear índices de for
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
+    Text,
     UniqueConstraint,
     create_engine,
     func,
@@ -22,7 +26,7 @@ from sqlalchemy import (  # (+) Necesario para definir y recrear índices de for
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import declarative_base, deferred, sessionmaker
 
 from .config import config
 from .utils import normalizar_camara
@@ -117,6 +121,55 @@ class Servicio(Base):
         return f"<Servicio(id={self.id}, nombre={self.nombre}, cliente={self.cliente})>"
 
 
+class TrackingVersion(Base):
+    """Versión de un tracking cargado para un servicio.
+
+    Cada fila guarda una instantánea comprimida (zlib) de la lista de cámaras
+    y del archivo original, junto con el cambio respecto de la versión
+    anterior. Las columnas comprimidas se cargan recién cuando se usan.
+    """
+
+    __tablename__ = "tracking_versiones"
+
+    id = Column(Integer, primary_key=True)
+    servicio_id = Column(Integer, ForeignKey("servicios.id"), index=True)
+    version = Column(Integer, nullable=False)
+    tipo = Column(String)
+    fecha = Column(DateTime, default=datetime.utcnow, index=True)
+    ruta = Column(String)
+    sha256 = Column(String(64), index=True)
+    cantidad_camaras = Column(Integer)
+    agregadas = Column(JSONType)
+    quitadas = Column(JSONType)
+    camaras_z = deferred(Column(LargeBinary))
+    contenido_z = deferred(Column(LargeBinary))
+
+    __table_args__ = (
+        UniqueConstraint("servicio_id", "version", name="uix_tracking_version"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<TrackingVersion(servicio={self.servicio_id}, version={self.version}, "
+            f"fecha={self.fecha})>"
+        )
+
+
+class TrackingReciente(Base):
+    """Ruta del último tracking de cada servicio.
+
+    Se actualiza en cada carga (y cuando la búsqueda en ``HISTORICO_DIR``
+    encuentra un archivo), así ``obtener_tracking_reciente`` resuelve con una
+    consulta por clave primaria sin listar la carpeta.
+    """
+
+    __tablename__ = "tracking_reciente"
+
+    servicio_id = Column(Integer, ForeignKey("servicios.id"), primary_key=True)
+    ruta = Column(String, nullable=False)
+    fecha = Column(DateTime, default=datetime.utcnow)
+
+
 class Camara(Base):
     """Registro de cámaras asociadas a los servicios."""
 
@@ -230,6 +283,38 @@ class ServicioPendiente(Base):
     id_carrier = Column(String, index=True)
 
 
+class CorreoSaliente(Base):
+    """Correo en la bandeja de salida, pendiente de envío o ya procesado.
+
+    ``estado`` es ``pendiente``, ``enviado`` o ``fallido``; estos últimos
+    agotaron los reintentos y forman la cola de correos muertos. ``clave`` es
+    única y evita encolar dos veces el mismo aviso.
+    """
+
+    __tablename__ = "correos_salientes"
+
+    id = Column(Integer, primary_key=True)
+    clave = Column(String, unique=True, nullable=False)
+    destinatarios = Column(JSONType, nullable=False)
+    asunto = Column(String)
+    cuerpo = Column(Text)
+    nombre_adjunto = Column(String)
+    tipo_adjunto = Column(String)
+    adjunto = deferred(Column(LargeBinary))
+    estado = Column(String, default="pendiente", index=True)
+    intentos = Column(Integer, default=0)
+    proximo_intento = Column(DateTime, default=datetime.utcnow, index=True)
+    ultimo_error = Column(Text)
+    creado = Column(DateTime, default=datetime.utcnow)
+    enviado = Column(DateTime)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CorreoSaliente(id={self.id}, estado={self.estado}, "
+            f"intentos={self.intentos})>"
+        )
+
+
 def eliminar_duplicados_tareas(conn) -> None:
     """Borra tareas con ``carrier_id`` e ``id_interno`` repetidos.
 
@@ -546,6 +631,136 @@ def crear_servicio(**datos) -> Servicio:
         return servicio
 
 
+def _comprimir_camaras(camaras: list[str]) -> bytes:
+    return zlib.compress(json.dumps(camaras, ensure_ascii=False).encode("utf-8"))
+
+
+def _descomprimir_camaras(datos: bytes | None) -> list[str]:
+    if not datos:
+        return []
+    return json.loads(zlib.decompress(datos).decode("utf-8"))
+
+
+def _diferencia_camaras(
+    anteriores: list[str], nuevas: list[str]
+) -> tuple[list[str], list[str]]:
+    """Cámaras agregadas y quitadas, comparando los nombres normalizados."""
+    claves_nuevas = {normalizar_camara(c) for c in nuevas}
+    claves_anteriores = {normalizar_camara(c) for c in anteriores}
+    agregadas = [c for c in nuevas if normalizar_camara(c) not in claves_anteriores]
+    quitadas = [c for c in anteriores if normalizar_camara(c) not in claves_nuevas]
+    return agregadas, quitadas
+
+
+def _siguiente_version(session, id_servicio: int) -> int:
+    ultima = (
+        session.query(func.max(TrackingVersion.version))
+        .filter(TrackingVersion.servicio_id == id_servicio)
+        .scalar()
+    )
+    return (ultima or 0) + 1
+
+
+def _registrar_version_tracking(
+    session,
+    id_servicio: int,
+    ruta: str | None,
+    camaras: list[str],
+    agregadas: list[str],
+    quitadas: list[str],
+    tipo: str,
+) -> TrackingVersion:
+    """Agrega la siguiente versión del tracking del servicio a la sesión."""
+    contenido = None
+    if ruta and Path(ruta).is_file():
+        contenido = Path(ruta).read_bytes()
+    version = TrackingVersion(
+        servicio_id=id_servicio,
+        version=_siguiente_version(session, id_servicio),
+        tipo=tipo,
+        ruta=ruta,
+        sha256=hashlib.sha256(contenido).hexdigest() if contenido is not None else None,
+        cantidad_camaras=len(camaras),
+        agregadas=agregadas,
+        quitadas=quitadas,
+        camaras_z=_comprimir_camaras(camaras),
+        contenido_z=zlib.compress(contenido) if contenido is not None else None,
+    )
+    session.add(version)
+    return version
+
+
+def _ultima_ruta(rutas: list | None) -> str | None:
+    """Ruta de la última entrada de ``rutas`` (cadenas o dicts con ``ruta``)."""
+    for r in reversed(rutas or []):
+        ruta = r.get("ruta") if isinstance(r, dict) else r
+        if ruta:
+            return str(ruta)
+    return None
+
+
+def obtener_ruta_tracking_reciente(id_servicio: int) -> str | None:
+    """Último tracking registrado del servicio, si el archivo sigue existiendo."""
+    with SessionLocal() as session:
+        reciente = session.get(TrackingReciente, id_servicio)
+    if reciente and Path(reciente.ruta).exists():
+        return reciente.ruta
+    return None
+
+
+def registrar_ruta_tracking(id_servicio: int, ruta: str) -> bool:
+    """Guarda ``ruta`` como el último tracking del servicio."""
+    try:
+        with SessionLocal() as session:
+            session.merge(
+                TrackingReciente(
+                    servicio_id=id_servicio, ruta=str(ruta), fecha=datetime.utcnow()
+                )
+            )
+            session.commit()
+        return True
+    except SQLAlchemyError as e:
+        logger.warning("No se pudo registrar el tracking de %s: %s", id_servicio, e)
+        return False
+
+
+def archivar_tracking_anterior(id_servicio: int, ruta: str | Path) -> str | None:
+    """Libera ``ruta`` antes de guardar ahí un tracking nuevo del servicio.
+
+    Si el archivo ya está comprimido en ``tracking_versiones`` (mismo SHA-256)
+    simplemente se borra. Solo se mueve a ``HISTORICO_DIR`` cuando la base no
+    tiene esa copia (trackings anteriores a la tabla) o si
+    ``config.TRACKING_HISTORICO_TXT`` está activo. Devuelve la ruta en el
+    histórico o ``None`` si no se archivó nada.
+    """
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return None
+    if not config.TRACKING_HISTORICO_TXT:
+        sha = hashlib.sha256(ruta.read_bytes()).hexdigest()
+        with SessionLocal() as session:
+            guardado = (
+                session.query(TrackingVersion.id)
+                .filter(
+                    TrackingVersion.servicio_id == id_servicio,
+                    TrackingVersion.sha256 == sha,
+                    TrackingVersion.contenido_z.isnot(None),
+                )
+                .first()
+            )
+        if guardado:
+            ruta.unlink()
+            return None
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    historico = Path(config.HISTORICO_DIR) / f"tracking_{id_servicio}_{timestamp}.txt"
+    ruta.rename(historico)
+    return str(historico)
+
+
+# Intentos ante cargas simultáneas que calculan el mismo número de versión
+_INTENTOS_VERSION = 3
+
+
 def actualizar_tracking(
     id_servicio: int,
     ruta: str | None = None,
@@ -553,13 +768,48 @@ def actualizar_tracking(
     trackings_txt: list[str] | None = None,
     tipo: str = "principal",
 ) -> None:
-    """Actualiza datos del servicio: tracking, cámaras y archivos asociados."""
+    """Actualiza datos del servicio: tracking, cámaras y archivos asociados.
+
+    Cuando llegan cámaras nuevas se registra además una fila en
+    ``tracking_versiones`` con la instantánea comprimida. En
+    ``servicios.trackings`` solo se conservan las últimas
+    ``config.TRACKINGS_MAX_ENTRADAS`` entradas. Si otra carga del mismo
+    servicio tomó el mismo número de versión, la restricción única lo
+    rechaza y se reintenta con el siguiente.
+    """
+    for intento in range(1, _INTENTOS_VERSION + 1):
+        try:
+            _actualizar_tracking(id_servicio, ruta, camaras, trackings_txt, tipo)
+            return
+        except IntegrityError:
+            if intento == _INTENTOS_VERSION:
+                raise
+            logger.warning(
+                "Versión de tracking duplicada para %s; reintento %s", id_servicio, intento
+            )
+
+
+def _actualizar_tracking(
+    id_servicio: int,
+    ruta: str | None,
+    camaras: list[str] | None,
+    trackings_txt: list[str] | None,
+    tipo: str,
+) -> None:
     with SessionLocal() as session:
         servicio = session.get(Servicio, id_servicio)
         if not servicio:
             return
         if ruta is not None:
             servicio.ruta_tracking = ruta
+        reciente = ruta or _ultima_ruta(trackings_txt)
+        if reciente:
+            # Índice para ``obtener_tracking_reciente``
+            session.merge(
+                TrackingReciente(
+                    servicio_id=id_servicio, ruta=str(reciente), fecha=datetime.utcnow()
+                )
+            )
         if camaras is not None:
             # Si las cámaras llegan como cadena (caso de registros antiguos),
             # se intenta convertir desde JSON para guardar siempre una lista.
@@ -569,7 +819,23 @@ def actualizar_tracking(
                 except json.JSONDecodeError:
                     camaras = []
             cam_anterior = servicio.camaras or []
+            if isinstance(cam_anterior, str):
+                try:
+                    cam_anterior = json.loads(cam_anterior)
+                except json.JSONDecodeError:
+                    cam_anterior = []
             servicio.camaras = camaras
+            # Se calcula una sola vez para la versión y para las entradas
+            agregadas, quitadas = _diferencia_camaras(cam_anterior, camaras)
+            _registrar_version_tracking(
+                session,
+                id_servicio,
+                ruta,
+                camaras,
+                agregadas,
+                quitadas,
+                tipo,
+            )
         if trackings_txt:
             existentes = servicio.trackings or []
             # Compatibilidad con registros del esquema antiguo. Si ``existentes``
@@ -583,13 +849,6 @@ def actualizar_tracking(
                     existentes = []
 
             nuevos = []
-            if camaras is not None:
-                # Se calcula una sola vez para evitar repetir este proceso
-                nuevas = {normalizar_camara(c) for c in camaras}
-                anteriores = {normalizar_camara(c) for c in cam_anterior}
-                dif_agregadas = nuevas - anteriores
-                dif_quitadas = anteriores - nuevas
-
             for t in trackings_txt:
                 if isinstance(t, dict):
                     entrada = t
@@ -600,18 +859,80 @@ def actualizar_tracking(
                         "fecha": datetime.utcnow().isoformat(),
                     }
                 if camaras is not None:
-                    entrada["nuevas"] = [
-                        c for c in camaras if normalizar_camara(c) in dif_agregadas
-                    ]
-                    entrada["quitadas"] = [
-                        c for c in cam_anterior if normalizar_camara(c) in dif_quitadas
-                    ]
+                    entrada["nuevas"] = list(agregadas)
+                    entrada["quitadas"] = list(quitadas)
                 nuevos.append(entrada)
-            existentes.extend(nuevos)
-            servicio.trackings = existentes
+            existentes = existentes + nuevos
+            # El historial completo vive en ``tracking_versiones``
+            limite = config.TRACKINGS_MAX_ENTRADAS
+            servicio.trackings = existentes[-limite:] if limite > 0 else existentes
         session.commit()
 
 
+def listar_versiones_tracking(id_servicio: int) -> list[TrackingVersion]:
+    """Versiones del tracking del servicio, de la más antigua a la más nueva.
+
+    No carga las instantáneas comprimidas, por lo que es liviana aunque haya
+    muchas versiones.
+    """
+    with SessionLocal() as session:
+        return (
+            session.query(TrackingVersion)
+            .filter(TrackingVersion.servicio_id == id_servicio)
+            .order_by(TrackingVersion.version)
+            .all()
+        )
+
+
+def obtener_camaras_version(id_servicio: int, version: int) -> list[str] | None:
+    """Lista de cámaras de una versión o ``None`` si no existe."""
+    with SessionLocal() as session:
+        datos = (
+            session.query(TrackingVersion.camaras_z)
+            .filter_by(servicio_id=id_servicio, version=version)
+            .scalar()
+        )
+    return None if datos is None else _descomprimir_camaras(datos)
+
+
+def obtener_contenido_version(id_servicio: int, version: int) -> bytes | None:
+    """Archivo original de una versión del tracking (descomprimido)."""
+    with SessionLocal() as session:
+        datos = (
+            session.query(TrackingVersion.contenido_z)
+            .filter_by(servicio_id=id_servicio, version=version)
+            .scalar()
+        )
+    return None if datos is None else zlib.decompress(datos)
+
+
+def comparar_versiones_tracking(
+    id_servicio: int, version_a: int, version_b: int
+) -> dict | None:
+    """Qué cambió entre dos versiones del tracking de un servicio.
+
+    Devuelve ``{"agregadas": [...], "quitadas": [...]}`` con los nombres tal
+    como figuran en cada versión, o ``None`` si alguna no existe. Solo se
+    leen y descomprimen las dos instantáneas involucradas.
+    """
+    with SessionLocal() as session:
+        filas = dict(
+            session.query(TrackingVersion.version, TrackingVersion.camaras_z)
+            .filter(
+                TrackingVersion.servicio_id == id_servicio,
+                TrackingVersion.version.in_((version_a, version_b)),
+            )
+            .all()
+        )
+    if version_a not in filas or version_b not in filas:
+        return None
+    agregadas, quitadas = _diferencia_camaras(
+        _descomprimir_camaras(filas[version_a]),
+        _descomprimir_camaras(filas[version_b]),
+    )
+    return {"agregadas": agregadas, "quitadas": quitadas}
+
+
 def buscar_servicios_por_camara(
     nombre_camara: str, exacto: bool = False
 ) -> list[Servicio]:
@@ -690,11 +1011,13 @@ def exportar_camaras_servicio(id_servicio: int, ruta_excel: str) -> bool:
         except json.JSONDecodeError:
             return False
 
-    # Se crea el DataFrame con una única columna
-    df = pd.DataFrame(camaras, columns=["camara"])
+    # Se escribe fila por fila, sin armar el libro completo en memoria
+    from .excel_utils import Hoja, escribir_excel
 
     try:
-        df.to_excel(ruta_excel, index=False)
+        escribir_excel(
+            ruta_excel, [Hoja("Sheet1", ["camara"], ([c] for c in camaras))]
+        )
         return True
     except Exception:
         return False
@@ -988,6 +1311,31 @@ def obtener_tareas_programadas(desc: bool = True) -> list[TareaProgramada]:
         return query.all()
 
 
+def obtener_correos_fallidos(desc: bool = True) -> list[CorreoSaliente]:
+    """Correos que agotaron los reintentos (cola de correos muertos)."""
+    with SessionLocal() as session:
+        query = session.query(CorreoSaliente).filter(
+            CorreoSaliente.estado == "fallido"
+        )
+        query = query.order_by(
+            CorreoSaliente.id.desc() if desc else CorreoSaliente.id
+        )
+        return query.all()
+
+
+def reintentar_correo(id_correo: int) -> bool:
+    """Vuelve a poner en cola un correo fallido. ``False`` si no existe."""
+    with SessionLocal() as session:
+        correo = session.get(CorreoSaliente, id_correo)
+        if not correo or correo.estado != "fallido":
+            return False
+        correo.estado = "pendiente"
+        correo.intentos = 0
+        correo.proximo_intento = datetime.utcnow()
+        session.commit()
+        return True
+
+
 def obtener_proxima_tarea() -> TareaProgramada | None:
     """Devuelve la tarea futura más cercana a la fecha actual."""
     with SessionLocal() as session:
@@ -8,6 +8,7 @@ import os
 import re
 import smtplib
 import tempfile
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from email.message import EmailMessage
 from pathlib import Path
@@ -20,8 +21,17 @@ except Exception:  # pragma: no cover - entornos sin win32
     win32 = None
     pythoncom = None
 
+from .carriers import obtener_registro
 from .config import config
+from .escaner_correo import PATRON_AVISO_LEGAL
+from .extractor_correo import (
+    cache_extracciones,
+    extraer_por_plantilla,
+    metricas,
+    parsear_fecha,
+)
 from .gpt_handler import gpt
+from .smtp_pool import obtener_pool as obtener_pool_smtp
 
 SIGNATURE_PATH = Path(config.SIGNATURE_PATH) if config.SIGNATURE_PATH else None
 TEMPLATE_MSG_PATH = Path(config.MSG_TEMPLATE_PATH)
@@ -39,18 +49,15 @@ from .utils import cargar_json, guardar_json, incrementar_contador
 
 logger = logging.getLogger(__name__)
 
-# Mapeo rapido de remitente a carrier
-carrier_map: dict[str, str] = {r".*telxius.*": "TELXIUS"}
+_TIPO_EXCEL = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+_RE_AVISO_LEGAL = re.compile(PATRON_AVISO_LEGAL, re.I)
 
 
 def detectar_carrier_por_remitente(remitente: str) -> str | None:
-    """Devuelve el carrier segun el remitente utilizando ``carrier_map``."""
+    """Devuelve el carrier según el remitente usando el registro de carriers."""
 
-    rem = remitente.lower()
-    for patron, nombre in carrier_map.items():
-        if re.search(patron, rem):
-            return nombre
-    return None
+    perfil = obtener_registro().detectar_por_remitente(remitente)
+    return perfil.nombre if perfil else None
 
 
 def _limpiar_correo(texto: str) -> str:
@@ -60,20 +67,10 @@ def _limpiar_correo(texto: str) -> str:
     confidencialidad, por ejemplo «confidentiality notice» o
     «este correo es privado».
     """
-    lineas: list[str] = []
-    for linea in texto.splitlines():
-        l = linea.strip()
-        if not l:
-            continue
-        if re.search(
-            r"disclaimer|confidencial|aviso legal|confidentiality notice|"
-            r"correo(?:\s+electronico)?\s*(?:es\s+)?privado",
-            l,
-            re.I,
-        ):
-            break
-        lineas.append(l)
-    return "\n".join(lineas)
+    m = _RE_AVISO_LEGAL.search(texto)
+    if m:
+        texto = texto[: texto.rfind("\n", 0, m.start()) + 1]
+    return "\n".join(l for l in (linea.strip() for linea in texto.splitlines()) if l)
 
 
 def cargar_destinatarios(cliente_id: int, carrier: str | None = None) -> list[str]:
@@ -83,13 +80,18 @@ def cargar_destinatarios(cliente_id: int, carrier: str | None = None) -> list[st
         cli = session.get(Cliente, cliente_id)
         if not cli:
             return []
-        if carrier:
-            if cli.destinatarios_carrier:
-                lista = cli.destinatarios_carrier.get(carrier)
-                if lista is not None:
-                    return lista
-            return []
-        return cli.destinatarios if cli.destinatarios else []
+        return destinatarios_cliente(cli, carrier)
+
+
+def destinatarios_cliente(cli: Cliente, carrier: str | None = None) -> list[str]:
+    """Correos de ``cli`` (ya cargado) para el carrier indicado o los generales."""
+    if carrier:
+        if cli.destinatarios_carrier:
+            lista = cli.destinatarios_carrier.get(carrier)
+            if lista is not None:
+                return lista
+        return []
+    return cli.destinatarios if cli.destinatarios else []
 
 
 def guardar_destinatarios(
@@ -159,25 +161,72 @@ def enviar_correo(
     try:
         usar_ssl = port == 465
         smtp_cls = smtplib.SMTP_SSL if usar_ssl else smtplib.SMTP
-        with smtp_cls(host, port) as smtp:
-            activar_debug = (
-                debug
-                if debug is not None
-                else os.getenv("SMTP_DEBUG", "0").lower() in {"1", "true", "yes"}
-            )
-            if activar_debug:
-                smtp.set_debuglevel(1)
-            if not usar_ssl and config.SMTP_USE_TLS:
-                smtp.starttls()
-            if config.SMTP_USER and config.SMTP_PASSWORD:
-                smtp.login(config.SMTP_USER, config.SMTP_PASSWORD)
-            smtp.sendmail(config.EMAIL_FROM or config.SMTP_USER, correos, msg)
+        activar_debug = (
+            debug
+            if debug is not None
+            else os.getenv("SMTP_DEBUG", "0").lower() in {"1", "true", "yes"}
+        )
+        obtener_pool_smtp().enviar(
+            lambda smtp: smtp.sendmail(
+                config.EMAIL_FROM or config.SMTP_USER, correos, msg
+            ),
+            smtp_cls,
+            host,
+            port,
+            usuario=config.SMTP_USER,
+            clave=config.SMTP_PASSWORD,
+            starttls=not usar_ssl and config.SMTP_USE_TLS,
+            debug=activar_debug,
+        )
         return True
     except Exception as e:  # pragma: no cover - depende del entorno
         logger.error("Error enviando correo: %s", e)
         return False
 
 
+def encolar_correo(
+    asunto: str,
+    cuerpo: str,
+    cliente_id: int,
+    carrier: str | None = None,
+    *,
+    clave: str | None = None,
+) -> bool:
+    """Deja en la bandeja de salida un correo para los destinatarios del cliente.
+
+    Equivale a :func:`enviar_correo` pero no espera al servidor SMTP: el
+    envío y sus reintentos quedan a cargo de :mod:`sandybot.outbox`.
+    """
+    correos = cargar_destinatarios(cliente_id, carrier)
+    if not correos:
+        return False
+    from .outbox import encolar
+
+    return encolar(correos, asunto, cuerpo, clave=clave) is not None
+
+
+def encolar_excel_por_correo(
+    destinatario: str,
+    ruta_excel: str,
+    *,
+    asunto: str = "Reporte SandyBot",
+    cuerpo: str = "Adjunto el archivo Excel.",
+) -> bool:
+    """Versión encolada de :func:`enviar_excel_por_correo`."""
+    from .outbox import encolar
+
+    return (
+        encolar(
+            [destinatario],
+            asunto,
+            cuerpo,
+            adjunto=ruta_excel,
+            tipo_adjunto=_TIPO_EXCEL,
+        )
+        is not None
+    )
+
+
 def enviar_excel_por_correo(
     destinatario: str,
     ruta_excel: str,
@@ -227,20 +276,21 @@ def enviar_excel_por_correo(
         msg.add_attachment(
             datos,
             maintype="application",
-            subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            subtype=_TIPO_EXCEL.split("/", 1)[1],
             filename=ruta.name,
         )
 
         usar_ssl = smtp_port == 465
         smtp_cls = smtplib.SMTP_SSL if usar_ssl else smtplib.SMTP
-        server = smtp_cls(smtp_host, smtp_port)
-        if not usar_ssl and use_tls:
-            server.starttls()
-        if smtp_user and smtp_pwd:
-            server.login(smtp_user, smtp_pwd)
-
-        server.send_message(msg)
-        server.quit()
+        obtener_pool_smtp().enviar(
+            lambda smtp: smtp.send_message(msg),
+            smtp_cls,
+            smtp_host,
+            smtp_port,
+            usuario=smtp_user,
+            clave=smtp_pwd,
+            starttls=not usar_ssl and use_tls,
+        )
         return True
 
     except Exception as e:  # pragma: no cover - errores dependen del entorno
@@ -262,8 +312,12 @@ def generar_nombre_tracking(id_servicio: int) -> str:
     return f"Tracking_{id_servicio}_{fecha}_{nro:02d}"
 
 
-def obtener_tracking_reciente(id_servicio: int) -> str | None:
-    """Devuelve la ruta del tracking más reciente del histórico."""
+def _buscar_tracking_historico(id_servicio: int) -> str | None:
+    """Busca en ``HISTORICO_DIR`` el archivo más nuevo del servicio.
+
+    Solo se usa como reparación cuando la base no tiene la ruta registrada
+    (trackings cargados antes del índice o a mano).
+    """
     patron = re.compile(rf"tracking_{id_servicio}_(\d{{8}}_\d{{6}})\.txt")
     archivos = []
     for archivo in config.HISTORICO_DIR.glob(f"tracking_{id_servicio}_*.txt"):
@@ -271,14 +325,40 @@ def obtener_tracking_reciente(id_servicio: int) -> str | None:
         if m:
             archivos.append((m.group(1), archivo))
     if archivos:
-        archivos.sort(key=lambda x: x[0], reverse=True)
-        return str(archivos[0][1])
-    from .database import obtener_servicio
+        return str(max(archivos)[1])
+    return None
+
+
+def obtener_tracking_reciente(id_servicio: int) -> str | None:
+    """Devuelve la ruta del tracking más reciente del servicio.
+
+    La ruta se toma de ``tracking_reciente``, que se actualiza en cada carga.
+    Si falta o el archivo ya no existe se repara con ``servicios.ruta_tracking``
+    o, en última instancia, recorriendo ``HISTORICO_DIR``; lo encontrado se
+    registra para que la próxima consulta vuelva a usar el índice.
+    """
+    from .database import (
+        obtener_ruta_tracking_reciente,
+        obtener_servicio,
+        registrar_ruta_tracking,
+    )
+
+    try:
+        ruta = obtener_ruta_tracking_reciente(id_servicio)
+    except Exception as e:  # pragma: no cover - base no disponible
+        logger.warning("No se pudo consultar el tracking de %s: %s", id_servicio, e)
+        ruta = None
+    if ruta:
+        return ruta
 
     servicio = obtener_servicio(id_servicio)
     if servicio and servicio.ruta_tracking and os.path.exists(servicio.ruta_tracking):
-        return servicio.ruta_tracking
-    return None
+        ruta = servicio.ruta_tracking
+    else:
+        ruta = _buscar_tracking_historico(id_servicio)
+    if ruta and servicio:
+        registrar_ruta_tracking(id_servicio, ruta)
+    return ruta
 
 
 def enviar_tracking_reciente_por_correo(
@@ -298,6 +378,50 @@ def enviar_tracking_reciente_por_correo(
     return enviar_email([destinatario], asunto, cuerpo, ruta, nombre)
 
 
+def contenido_aviso(
+    tarea: TareaProgramada, servicios: list[Servicio], carrier_nombre: str | None
+) -> str:
+    """Texto del aviso de ``tarea`` sin plantilla ni firma."""
+    lineas = [
+        "Estimado Cliente, nuestro partner nos da aviso de la siguiente tarea programada:",
+    ]
+    if carrier_nombre:
+        lineas.append(f"Carrier: {carrier_nombre}")
+    lineas.extend(
+        [
+            f"Inicio: {tarea.fecha_inicio}",
+            f"Fin: {tarea.fecha_fin}",
+            f"Tipo de tarea: {tarea.tipo_tarea}",
+        ]
+    )
+    if tarea.tiempo_afectacion:
+        lineas.append(f"Tiempo de afectación: {tarea.tiempo_afectacion}")
+    if tarea.descripcion:
+        lineas.append(f"Descripción: {tarea.descripcion}")
+
+    lista_servicios = ", ".join(str(s.id) for s in servicios)
+    lineas.append(f"Servicios afectados: {lista_servicios}")
+    return "\n".join(lineas)
+
+
+def leer_plantilla_aviso() -> str | None:
+    """Plantilla de ``MSG_TEMPLATE_PATH`` como texto, o ``None`` si no se puede leer."""
+    if not TEMPLATE_MSG_PATH.exists():
+        return None
+    try:
+        return TEMPLATE_MSG_PATH.read_text(encoding="utf-8")
+    except Exception as e:  # pragma: no cover
+        logger.warning("No se pudo leer la plantilla: %s", e)
+        return None
+
+
+def aplicar_plantilla_aviso(contenido: str, plantilla: str | None) -> str:
+    """Reemplaza ``{{CONTENIDO}}`` en ``plantilla``; sin plantilla devuelve el contenido."""
+    if plantilla is None:
+        return contenido
+    return plantilla.replace("{{CONTENIDO}}", contenido)
+
+
 def generar_archivo_msg(
     tarea: TareaProgramada,
     cliente: Cliente,
@@ -338,26 +462,7 @@ def generar_archivo_msg(
                 car = s.get(Carrier, ids.pop())
                 carrier_nombre = car.nombre if car else None
 
-    lineas = [
-        "Estimado Cliente, nuestro partner nos da aviso de la siguiente tarea programada:",
-    ]
-    if carrier_nombre:
-        lineas.append(f"Carrier: {carrier_nombre}")
-    lineas.extend(
-        [
-            f"Inicio: {tarea.fecha_inicio}",
-            f"Fin: {tarea.fecha_fin}",
-            f"Tipo de tarea: {tarea.tipo_tarea}",
-        ]
-    )
-    if tarea.tiempo_afectacion:
-        lineas.append(f"Tiempo de afectación: {tarea.tiempo_afectacion}")
-    if tarea.descripcion:
-        lineas.append(f"Descripción: {tarea.descripcion}")
-
-    lista_servicios = ", ".join(str(s.id) for s in servicios)
-    lineas.append(f"Servicios afectados: {lista_servicios}")
-    contenido = "\n".join(lineas)
+    contenido = contenido_aviso(tarea, servicios, carrier_nombre)
 
     # 🪟 Intento de generar MSG con Outlook
     if win32 is not None:
@@ -416,14 +521,7 @@ def generar_archivo_msg(
                     pass
 
     # 📝 Fallback a texto plano
-    cuerpo_final = contenido
-    if TEMPLATE_MSG_PATH.exists():
-        try:
-            plantilla = TEMPLATE_MSG_PATH.read_text(encoding="utf-8")
-            cuerpo_final = plantilla.replace("{{CONTENIDO}}", contenido)
-        except Exception as e:  # pragma: no cover
-            logger.warning("No se pudo leer la plantilla: %s", e)
-            cuerpo_final = contenido
+    cuerpo_final = aplicar_plantilla_aviso(contenido, leer_plantilla_aviso())
 
     with open(ruta, "w", encoding="utf-8") as f:
         f.write(cuerpo_final)
@@ -431,6 +529,37 @@ def generar_archivo_msg(
     return ruta, cuerpo_final
 
 
+@dataclass
+class TareaExtraida:
+    """Datos de una tarea obtenidos del correo, todavía sin registrar."""
+
+    inicio: datetime
+    fin: datetime
+    tipo: str
+    ids: list[str]
+    id_interno: str | None = None
+    afectacion: str | None = None
+    descripcion: str | None = None
+    carrier_nombre: str | None = None
+
+    def a_dict(self) -> dict:
+        """Versión serializable en JSON (fechas en ISO 8601)."""
+        datos = asdict(self)
+        datos["inicio"] = self.inicio.isoformat()
+        datos["fin"] = self.fin.isoformat()
+        return datos
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "TareaExtraida":
+        return cls(
+            **{
+                **datos,
+                "inicio": datetime.fromisoformat(datos["inicio"]),
+                "fin": datetime.fromisoformat(datos["fin"]),
+            }
+        )
+
+
 async def procesar_correo_a_tarea(
     texto: str,
     cliente_nombre: str,
@@ -446,25 +575,43 @@ async def procesar_correo_a_tarea(
     Si ``generar_msg`` es ``True`` también se crea un archivo ``.MSG``. El
     retorno incluye la tarea, un flag ``creada_nueva`` y los IDs pendientes.
     """
+    extraida = await extraer_tarea_correo(texto, carrier_nombre)
+    return registrar_tarea_extraida(extraida, cliente_nombre, generar_msg=generar_msg)
+
 
-    texto_limpio = _limpiar_correo(texto)
-    datos_detectados = _detectar_datos_correo(texto_limpio)
+async def extraer_tarea_correo(
+    texto: str, carrier_nombre: str | None = None
+) -> TareaExtraida:
+    """Obtiene fechas, tipo y servicios del correo sin tocar la base.
+
+    Es la parte lenta (puede consultar a GPT) y se puede ejecutar en paralelo
+    para varios correos; el registro queda para :func:`registrar_tarea_extraida`.
+    Si el mismo correo ya se analizó dentro de ``EXTRACCION_CACHE_TTL`` se
+    devuelve el resultado guardado sin volver a consultar a GPT.
+    """
+
+    # Una sola pasada limpia el correo y detecta carrier, id interno y servicios
+    escaneo = obtener_registro().escanear(texto)
+    texto_limpio = escaneo.texto_limpio
+    clave_cache = cache_extracciones.clave(texto_limpio, carrier_nombre)
+    previa = cache_extracciones.obtener(clave_cache)
+    if previa:
+        logger.info("Correo ya analizado; se reutiliza la extracción guardada")
+        return TareaExtraida.desde_dict(previa)
+    datos_detectados = escaneo.datos()
 
     if not carrier_nombre:
-        carrier_nombre = datos_detectados.get("carrier")
+        carrier_nombre = escaneo.carrier or escaneo.carrier_declarado
+    perfil = obtener_registro().obtener(carrier_nombre)
 
-    # 👉 (1) INTENTO RÁPIDO: extraer datos con regex
-    datos = _extraer_por_regex(texto_limpio)
+    # 👉 (1) INTENTO RÁPIDO: plantillas conocidas (etiquetas y tablas)
+    datos = extraer_por_plantilla(texto_limpio, perfil)
     if datos:
         if os.getenv("SANDY_ENV") == "dev":
-            logger.debug("Regex OK, sin GPT: %s", datos)
+            logger.debug("Plantilla OK, sin GPT: %s", datos)
     else:
         datos = {}
-
-    if not carrier_nombre:
-        m = re.search(r"carrier[:\s-]+([^\n\r]+)", texto_limpio, re.I)
-        if m:
-            carrier_nombre = m.group(1).strip()
+    metricas.registrar(perfil.nombre or carrier_nombre, uso_gpt=not datos)
 
     ejemplo = (
         "Ejemplo correo:\n"
@@ -528,24 +675,9 @@ async def procesar_correo_a_tarea(
         raise ValueError("No se pudo extraer la tarea del correo") from exc
 
     def _parse_fecha(valor: str) -> datetime:
-        valor = valor.replace("T", " ").strip()
-        formatos = (
-            "%Y-%m-%d %H:%M",
-            "%Y-%m-%d %H:%M:%S",
-            "%d/%m/%Y %H:%M",
-            "%d/%m/%Y %H:%M:%S",
-            "%d/%m %H:%M",
-            "%d/%m %H:%M:%S",
+        return parsear_fecha(valor, perfil.formatos_fecha) or datetime.fromisoformat(
+            valor.strip()
         )
-        for fmt in formatos:
-            try:
-                dt = datetime.strptime(valor, fmt)
-                if "%Y" not in fmt:
-                    dt = dt.replace(year=datetime.now().year)
-                return dt
-            except ValueError:
-                continue
-        return datetime.fromisoformat(valor)
 
     try:
         inicio = _parse_fecha(str(datos["inicio"]))
@@ -560,34 +692,7 @@ async def procesar_correo_a_tarea(
     ids_brutos.extend(
         [s for s in datos_detectados.get("ids", []) if s not in ids_brutos]
     )
-    descartados: list[str] = []
-    carrier_norm = carrier_nombre.upper() if carrier_nombre else ""
-    if carrier_norm == "TELXIUS":
-        ids_filtrados = []
-        for i in ids_brutos:
-            if re.fullmatch(r"CRT-\d{6}", i):
-                ids_filtrados.append(i)
-            else:
-                descartados.append(i)
-    elif carrier_norm == "IGNETWORK":
-        ids_filtrados = []
-        patron = re.compile(r"MTR\.\d{4,6}\.[A0]\d+")
-        for i in ids_brutos:
-            if patron.fullmatch(i):
-                ids_filtrados.append(i)
-            else:
-                descartados.append(i)
-    else:
-        ids_filtrados = []
-        for i in ids_brutos:
-            if re.fullmatch(r"\d{4}", i):
-                descartados.append(i)
-                continue
-            if i.isdigit() and len(i) < 6:
-                descartados.append(i)
-                continue
-            ids_filtrados.append(i)
-    ids_brutos = ids_filtrados
+    ids_brutos, descartados = perfil.filtrar_ids(ids_brutos)
 
     id_interno = datos_detectados.get("id_interno")
     afectacion = datos.get("afectacion")
@@ -599,6 +704,33 @@ async def procesar_correo_a_tarea(
     if descartados:
         logger.info(">> Servicios descartados: %s", descartados)
 
+    extraida = TareaExtraida(
+        inicio=inicio,
+        fin=fin,
+        tipo=tipo,
+        ids=ids_brutos,
+        id_interno=id_interno,
+        afectacion=afectacion,
+        descripcion=descripcion,
+        carrier_nombre=carrier_nombre,
+    )
+    cache_extracciones.guardar_resultado(clave_cache, extraida.a_dict())
+    return extraida
+
+
+def registrar_tarea_extraida(
+    extraida: TareaExtraida,
+    cliente_nombre: str,
+    *,
+    generar_msg: bool = False,
+) -> (
+    tuple[TareaProgramada, bool, list[str]]
+    | tuple[TareaProgramada, bool, Cliente, Path, str, list[str]]
+):
+    """Registra en la base la tarea extraída y, si se pide, genera el ``.MSG``."""
+    carrier_nombre = extraida.carrier_nombre
+    ids_brutos = extraida.ids
+
     with SessionLocal() as session:
         cliente = obtener_cliente_por_nombre(cliente_nombre)
         if not cliente:
@@ -649,14 +781,14 @@ async def procesar_correo_a_tarea(
             logger.info(">> Servicios faltantes: %s", ids_pendientes)
 
         tarea, creada_nueva = crear_tarea_programada(
-            inicio,
-            fin,
-            tipo,
+            extraida.inicio,
+            extraida.fin,
+            extraida.tipo,
             [s.id for s in servicios],
             carrier_id=carrier.id if carrier else None,
-            tiempo_afectacion=afectacion,
-            descripcion=descripcion,
-            id_interno=id_interno,
+            tiempo_afectacion=extraida.afectacion,
+            descripcion=extraida.descripcion,
+            id_interno=extraida.id_interno,
         )
         if carrier:
             for srv in servicios:
@@ -695,75 +827,6 @@ async def procesar_correo_a_tarea(
         return tarea, creada_nueva, ids_pendientes, carrier_nombre
 
 
-def _extraer_por_regex(texto: str) -> dict | None:
-    """Devuelve datos de una tarea con expresiones regulares.
-
-    Retorna ``None`` si no consigue inicio, fin e IDs.
-    """
-    import re as _re
-
-    inicio_m = _re.search(r"inicio[:\s-]+([^\n\r]+)", texto, _re.I)
-    fin_m = _re.search(r"fin[:\s-]+([^\n\r]+)", texto, _re.I)
-    ids_m = _re.search(
-        r"servicios?(?:\s+afectados)?[:\s-]+([A-Z0-9,\- ]+)", texto, _re.I
-    )
-    if not (inicio_m and fin_m and ids_m):
-        return None
-    return {
-        "inicio": inicio_m.group(1).strip(),
-        "fin": fin_m.group(1).strip(),
-        "tipo": "Mantenimiento",
-        "afectacion": None,
-        "descripcion": None,
-        "ids": [i.strip() for i in ids_m.group(1).split(",") if i.strip()],
-    }
-
-
 def _detectar_datos_correo(texto: str) -> dict:
     """Detecta carrier, id interno y servicios en el correo."""
-    resultado: dict = {}
-
-    lineas = texto.splitlines()
-    asunto = ""
-    if lineas:
-        if lineas[0].lower().startswith("subject:"):
-            asunto = lineas[0].split(":", 1)[1].strip()
-        else:
-            asunto = lineas[0].strip()
-
-    m = re.search(r"From:\s*([^\n]+)", texto, re.I)
-    if not m:
-        m = re.search(r"Name:\s*([^\n]+)", texto, re.I)
-    if m:
-        parte = m.group(1).strip()
-        correo = parte.split()[-1].strip("<>")
-        carrier_rem = detectar_carrier_por_remitente(correo)
-        if carrier_rem:
-            resultado["carrier"] = carrier_rem
-        elif "@" in correo:
-            resultado["carrier"] = correo.split("@")[0].split()[0]
-
-    if not resultado.get("carrier") and asunto:
-        m = re.match(r"([^\-]+)-\s*METROTEL", asunto, re.I)
-        if m:
-            resultado["carrier"] = m.group(1).strip().split()[0]
-
-    carrier_norm = resultado.get("carrier", "").upper()
-    if carrier_norm == "TELXIUS":
-        id_pat = r"SWX\d{7}"
-        srv_pat = r"CRT-\d{6}"
-    elif carrier_norm == "IGNETWORK":
-        id_pat = r"MTR\.\d{4,6}\.[A0]\d+"
-        srv_pat = r"MTR\.\d{4,6}\.[A0]\d+"
-    else:
-        id_pat = r"ID\w+"
-        srv_pat = r"\b\d+\b"
-
-    m = re.search(id_pat, texto)
-    if m:
-        resultado["id_interno"] = m.group(0)
-
-    resultado["ids"] = re.findall(srv_pat, texto)
-
-    resultado["tipo"] = "Emergencia" if "EMERGENCY" in asunto.upper() else "Programada"
-    return resultado
+    return obtener_registro().escanear(texto).datos()
@@ -0,0 +1,194 @@
+# Nombre de archivo: excel_utils.py
+# Ubicación de archivo: Sandy bot/sandybot/excel_utils.py
+# User-provided custom instructions
+"""Utilidades para leer y generar planillas Excel.
+
+Escritura: ``pd.ExcelWriter`` con openpyxl arma el libro completo en memoria
+antes de guardarlo. Acá cada fila se vuelca al archivo apenas se escribe, así
+la memoria no crece con la cantidad de filas. Si está instalado se usa
+``xlsxwriter`` en modo ``constant_memory`` (bastante más rápido); si no, el
+modo ``write_only`` de openpyxl.
+
+Lectura: :func:`leer_excel` usa el motor ``calamine`` (``python-calamine``,
+escrito en Rust) cuando está disponible y arma el DataFrame solo con las
+columnas pedidas. El encabezado de cada archivo se guarda en memoria, de modo
+que identificar un Excel y luego cargarlo no obliga a releer la cabecera.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+try:  # pragma: no cover - depende de la instalación
+    import xlsxwriter
+except ImportError:  # pragma: no cover - se usa openpyxl
+    xlsxwriter = None
+
+logger = logging.getLogger(__name__)
+
+# Límite de caracteres de Excel para el nombre de una hoja
+_MAX_NOMBRE_HOJA = 31
+# Motor de lectura de pandas; ``None`` deja el predeterminado (openpyxl)
+MOTOR_LECTURA: Optional[str] = (
+    "calamine" if importlib.util.find_spec("python_calamine") else None
+)
+# Encabezados recordados: (ruta, mtime_ns, tamaño) → nombres de columna
+_MAX_ENCABEZADOS = 32
+_encabezados: "OrderedDict[tuple[str, int, int], list]" = OrderedDict()
+_lock = threading.Lock()
+
+
+class Hoja(NamedTuple):
+    """Hoja a escribir: nombre, encabezado (en negrita) y filas."""
+
+    nombre: str
+    encabezado: Sequence
+    filas: Iterable[Sequence]
+
+
+def _nombres_unicos(nombres: Iterable[str]) -> List[str]:
+    """Evita hojas repetidas (Excel no distingue mayúsculas) agregando ``(n)``."""
+    usados: set[str] = set()
+    resultado = []
+    for nombre in nombres:
+        candidato = nombre[:_MAX_NOMBRE_HOJA]
+        n = 2
+        while candidato.lower() in usados:
+            sufijo = f" ({n})"
+            candidato = nombre[: _MAX_NOMBRE_HOJA - len(sufijo)] + sufijo
+            n += 1
+        usados.add(candidato.lower())
+        resultado.append(candidato)
+    return resultado
+
+
+def _escribir_xlsxwriter(ruta: str, hojas: List[Hoja], nombres: List[str]) -> None:
+    libro = xlsxwriter.Workbook(
+        ruta,
+        {
+            "constant_memory": True,
+            # Los textos se guardan tal cual, igual que con openpyxl
+            "strings_to_formulas": False,
+            "strings_to_urls": False,
+        },
+    )
+    try:
+        negrita = libro.add_format({"bold": True})
+        for hoja, nombre in zip(hojas, nombres):
+            ws = libro.add_worksheet(nombre)
+            fila_actual = 0
+            if hoja.encabezado:
+                ws.write_row(0, 0, list(hoja.encabezado), negrita)
+                fila_actual = 1
+            for fila in hoja.filas:
+                if fila:
+                    ws.write_row(fila_actual, 0, fila)
+                fila_actual += 1
+    finally:
+        libro.close()
+
+
+def _valor_openpyxl(ws, valor):
+    """openpyxl toma como fórmula todo texto que empieza con ``=``: se fuerza texto."""
+    if isinstance(valor, str) and valor.startswith("="):
+        from openpyxl.cell import WriteOnlyCell
+
+        celda = WriteOnlyCell(ws, value=valor)
+        celda.data_type = "s"
+        return celda
+    return valor
+
+
+def _escribir_openpyxl(ruta: str, hojas: List[Hoja], nombres: List[str]) -> None:
+    # openpyxl se importa acá para no cargarlo al iniciar el bot
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    negrita = Font(bold=True)
+    libro = Workbook(write_only=True)
+    for hoja, nombre in zip(hojas, nombres):
+        ws = libro.create_sheet(title=nombre)
+        if hoja.encabezado:
+            celdas = []
+            for valor in hoja.encabezado:
+                celda = WriteOnlyCell(ws, value=valor)
+                celda.font = negrita
+                celdas.append(celda)
+            ws.append(celdas)
+        for fila in hoja.filas:
+            ws.append([_valor_openpyxl(ws, v) for v in fila])
+    libro.save(ruta)
+
+
+def escribir_excel(ruta: str, hojas: Iterable[Hoja]) -> None:
+    """Genera ``ruta`` con las ``hojas`` indicadas, fila por fila.
+
+    Las filas pueden ser un generador: se consumen a medida que se escriben.
+    Una fila vacía deja un renglón en blanco.
+    """
+    hojas = list(hojas)
+    nombres = _nombres_unicos(h.nombre for h in hojas)
+    if xlsxwriter is not None:
+        _escribir_xlsxwriter(ruta, hojas, nombres)
+    else:
+        _escribir_openpyxl(ruta, hojas, nombres)
+
+
+# ───────────────────────────── LECTURA ─────────────────────────────
+def normalizar_columna(nombre) -> str:
+    """Clave para comparar encabezados: sin acentos, espacios extra ni mayúsculas."""
+    texto = unicodedata.normalize("NFKD", str(nombre))
+    texto = texto.encode("ascii", "ignore").decode("ascii")
+    return " ".join(texto.lower().split())
+
+
+def _read_excel(ruta: str, **kwargs):
+    """``pd.read_excel`` con el motor rápido y respaldo al predeterminado."""
+    import pandas as pd
+
+    if MOTOR_LECTURA and "engine" not in kwargs:
+        try:
+            return pd.read_excel(ruta, engine=MOTOR_LECTURA, **kwargs)
+        except Exception as exc:
+            logger.debug("%s no pudo leer %s (%s); se usa openpyxl", MOTOR_LECTURA, ruta, exc)
+    return pd.read_excel(ruta, **kwargs)
+
+
+def leer_encabezado(ruta: str) -> list:
+    """Nombres de columna de la primera hoja, recordados mientras no cambie el archivo."""
+    st = os.stat(ruta)
+    clave = (os.path.abspath(ruta), st.st_mtime_ns, st.st_size)
+    with _lock:
+        if clave in _encabezados:
+            _encabezados.move_to_end(clave)
+            return list(_encabezados[clave])
+
+    columnas = list(_read_excel(ruta, nrows=0).columns)
+    with _lock:
+        _encabezados[clave] = columnas
+        while len(_encabezados) > _MAX_ENCABEZADOS:
+            _encabezados.popitem(last=False)
+    return list(columnas)
+
+
+def leer_excel(ruta: str, columnas: Optional[Iterable[str]] = None, **kwargs):
+    """Lee ``ruta`` en un DataFrame, opcionalmente solo con ``columnas``.
+
+    Las columnas se buscan en el encabezado ignorando acentos, mayúsculas y
+    espacios repetidos, pero el DataFrame conserva los nombres originales.
+    Las que no existan simplemente no aparecen: el llamador decide si faltan.
+    Los demás argumentos se pasan a ``pd.read_excel``.
+    """
+    if columnas is not None:
+        buscadas = {normalizar_columna(c) for c in columnas}
+        kwargs["usecols"] = [
+            c for c in leer_encabezado(ruta) if normalizar_columna(c) in buscadas
+        ]
+    return _read_excel(ruta, **kwargs)
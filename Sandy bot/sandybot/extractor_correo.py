@@ -0,0 +1,568 @@
+# Nombre de archivo: extractor_correo.py
+# Ubicación de archivo: Sandy bot/sandybot/extractor_correo.py
+# User-provided custom instructions
+"""Extracción determinística de tareas programadas desde avisos por correo.
+
+Antes de consultar a GPT se intenta leer el aviso con reglas fijas:
+
+- Pares «etiqueta: valor» en una línea (``Inicio: 02/01/2024 08:00``).
+- Tablas con celdas separadas por ``|`` o tabuladores, con la fila de
+  encabezados seguida por una o más filas de datos.
+- Tablas HTML ya pasadas a texto, donde cada celda queda en su propia línea:
+  un bloque de encabezados seguido por los valores en el mismo orden.
+
+Las etiquetas se reconocen en español, inglés y portugués, y cada carrier del
+registro puede sumar las suyas con la clave ``etiquetas``. Las fechas aceptan
+los formatos ``strptime`` del carrier y, si no coinciden, formas con el mes en
+letras («2 de enero de 2024 08:00», «Jan 2, 2024 8:00 AM», «02 jan 2024 08h00»).
+
+:data:`metricas` lleva por carrier cuántos correos se resolvieron con estas
+reglas y cuántos necesitaron GPT, y :data:`cache_extracciones` recuerda el
+resultado de cada correo ya analizado.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Sequence
+
+from .carriers import PerfilCarrier
+from .config import config
+from .utils import cargar_json, guardar_json, normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+# Etiquetas por campo, ya sin acentos y en minúsculas
+ETIQUETAS: dict[str, tuple[str, ...]] = {
+    "inicio": (
+        "inicio", "fecha de inicio", "fecha inicio", "hora de inicio", "comienzo",
+        "inicio de la tarea", "inicio de ventana", "start", "start time", "start date",
+        "begin", "window start", "maintenance start", "data de inicio", "data inicio",
+    ),
+    "fin": (
+        "fin", "fecha de fin", "fecha fin", "hora de fin", "finalizacion",
+        "fin de la tarea", "fin de ventana", "end", "end time", "end date", "finish",
+        "window end", "maintenance end", "fim", "termino", "data de termino", "data fim",
+    ),
+    # Sin «date» ni «data» sueltos: son la fecha de envío en los encabezados de
+    # un correo reenviado o citado
+    "fecha": (
+        "fecha", "fecha programada", "fecha de la tarea", "maintenance date",
+        "scheduled date", "work date", "data programada", "data da manutencao",
+        "data da atividade",
+    ),
+    "horario": (
+        "horario", "hora", "ventana", "ventana de trabajo", "window", "time window",
+        "maintenance window", "janela", "janela de manutencao",
+    ),
+    "tipo": (
+        "tipo", "tipo de tarea", "tipo de trabajo", "trabajo", "motivo", "type",
+        "work type", "activity", "maintenance type", "tipo de atividade", "atividade",
+    ),
+    "afectacion": (
+        "afectacion", "tiempo de afectacion", "impacto", "impacto esperado", "impact",
+        "expected impact", "outage", "outage duration", "duracion", "duration",
+        "duracao",
+    ),
+    "descripcion": ("descripcion", "description", "detalle", "details", "descricao"),
+    "ids": (
+        "servicio", "servicios", "servicios afectados", "id servicio", "service",
+        "services", "service id", "affected services", "circuit", "circuits",
+        "circuit id", "affected circuits", "servico", "servicos", "servicos afetados",
+    ),
+    # Columnas habituales de las tablas que no se usan; reconocerlas permite
+    # saber dónde termina el encabezado
+    "otro": (
+        "ubicacion", "location", "localidade", "direccion", "address", "sitio",
+        "site", "nodo", "node", "cliente", "customer", "estado", "status",
+        "capacidad", "capacity", "bandwidth", "punta a", "punta b", "a-end", "b-end",
+    ),
+}
+
+_MESES = {
+    # español
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10,
+    "noviembre": 11, "diciembre": 12, "ene": 1, "abr": 4, "ago": 8, "dic": 12,
+    # inglés
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11,
+    "december": 12, "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7,
+    "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+    # portugués
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "maio": 5, "junho": 6, "julho": 7,
+    "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12, "fev": 2,
+    "mai": 5, "set": 9, "out": 10, "dez": 12,
+}
+_MES = "|".join(sorted(_MESES, key=len, reverse=True))
+
+_RE_ISO = re.compile(r"(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})")
+_RE_DMA = re.compile(r"(?<!\d)(\d{1,2})[-/.](\d{1,2})(?:[-/.](\d{4}|\d{2}))?(?!\d)")
+_RE_D_MES_A = re.compile(
+    rf"(?<!\d)(\d{{1,2}})(?:\s+de)?[\s-]+({_MES})\.?(?:\s+de)?[\s,-]+(\d{{4}})"
+)
+_RE_MES_D_A = re.compile(rf"\b({_MES})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})")
+_RE_HORA = re.compile(
+    r"(?<![\d/.-])(\d{1,2})\s*[:h]\s*(\d{2})(?::(\d{2}))?\s*(a\.?m\.?|p\.?m\.?)?"
+)
+_RE_T_ISO = re.compile(r"(?<=\d)T(?=\d)")
+# Separador entre el comienzo y el final de una ventana horaria
+_RE_RANGO = re.compile(
+    r"\s+(?:-|–|a|al|to|ate|hasta|until)\s+|\s*[-–]\s*(?=\d{1,2}\s*[:h]\d{2})"
+)
+
+# «etiqueta: valor» en una línea; se ignoran aclaraciones como «(UTC)»
+_RE_PAR = re.compile(r"^([^:|\t]{2,40}?)\s*(?:\([^)]*\))?\s*[:|\t]\s*(.+)$")
+_RE_SEPARADOR = re.compile(r"\s*\|\s*|\t+")
+_RE_IDS = re.compile(r"[,;\s]+")
+_RE_PARENTESIS = re.compile(r"\([^)]*\)")
+# Encabezados de un correo reenviado o citado (ya sin acentos)
+_RE_CABECERA = re.compile(
+    r"^(from|de|remetente|sent|enviado(?: el| em)?|date|fecha|data|to|para|cc|cco|"
+    r"bcc|subject|asunto|assunto)\s*:"
+)
+_RE_REMITENTE = re.compile(r"^(from|de|remetente)\s*:")
+
+
+def _norm_etiqueta(texto: str) -> str:
+    t = _RE_PARENTESIS.sub("", normalizar_texto(texto))
+    return t.strip(" :.-*•").strip()
+
+
+def _indice_etiquetas(extra: dict[str, Sequence[str]] | None) -> dict[str, str]:
+    indice = {}
+    for campo, etiquetas in ETIQUETAS.items():
+        for e in etiquetas:
+            indice[e] = campo
+    for campo, etiquetas in (extra or {}).items():
+        for e in etiquetas:
+            indice[_norm_etiqueta(e)] = campo
+    return indice
+
+
+_INDICE_BASE = _indice_etiquetas(None)
+
+
+# ─────────────────────────────── Fechas ───────────────────────────────
+def _hora(texto: str) -> Optional[tuple[int, int, int]]:
+    m = _RE_HORA.search(texto)
+    if not m:
+        return None
+    h, mi, s = int(m.group(1)), int(m.group(2)), int(m.group(3) or 0)
+    sufijo = (m.group(4) or "").replace(".", "")
+    if sufijo == "pm" and h < 12:
+        h += 12
+    elif sufijo == "am" and h == 12:
+        h = 0
+    return h, mi, s
+
+
+def _dia(texto: str) -> Optional[tuple[int, int, int, int, int]]:
+    """Primera fecha de ``texto`` como (inicio, fin, año, mes, día)."""
+    candidatos = []
+    m = _RE_ISO.search(texto)
+    if m:
+        candidatos.append((m.start(), m.end(), int(m[1]), int(m[2]), int(m[3])))
+    m = _RE_D_MES_A.search(texto)
+    if m:
+        candidatos.append((m.start(), m.end(), int(m[3]), _MESES[m[2]], int(m[1])))
+    m = _RE_MES_D_A.search(texto)
+    if m:
+        candidatos.append((m.start(), m.end(), int(m[3]), _MESES[m[1]], int(m[2])))
+    if not candidatos:
+        m = _RE_DMA.search(texto)
+        if m:
+            if m[3] is None:
+                anio = datetime.now().year
+            else:
+                anio = int(m[3]) + (2000 if len(m[3]) == 2 else 0)
+            candidatos.append((m.start(), m.end(), anio, int(m[2]), int(m[1])))
+    return min(candidatos) if candidatos else None
+
+
+def parsear_fecha(valor: str, formatos: Iterable[str] = ()) -> Optional[datetime]:
+    """Interpreta ``valor`` como fecha y hora; ``None`` si no se reconoce.
+
+    Primero se prueban ``formatos`` (``strptime``) y luego las formas con el
+    mes en número o en letras. Las zonas horarias y los días de la semana se
+    ignoran; sin año se asume el actual, igual que con los formatos sin ``%Y``.
+    """
+    crudo = _RE_T_ISO.sub(" ", valor).strip()
+    for fmt in formatos:
+        try:
+            dt = datetime.strptime(crudo, fmt)
+        except ValueError:
+            continue
+        if "%Y" not in fmt and "%y" not in fmt:
+            dt = dt.replace(year=datetime.now().year)
+        return dt
+
+    texto = normalizar_texto(crudo)
+    dia = _dia(texto)
+    if not dia:
+        return None
+    desde, hasta, anio, mes, d = dia
+    hora = _hora(texto[hasta:]) or _hora(texto[:desde])
+    if not hora:
+        return None
+    try:
+        return datetime(anio, mes, d, *hora)
+    except ValueError:
+        return None
+
+
+def _rango(
+    valor: str, base: Optional[datetime], formatos: Iterable[str]
+) -> tuple[Optional[datetime], Optional[datetime]]:
+    """Interpreta «08:00 a 10:00» o «fecha hora - fecha hora»."""
+    partes = _RE_RANGO.split(valor)
+    if len(partes) < 2:
+        return None, None
+    inicio = parsear_fecha(partes[0], formatos)
+    fin = parsear_fecha(partes[-1], formatos)
+    dia = inicio or base
+    if dia is None:
+        return None, None
+    if inicio is None:
+        h = _hora(normalizar_texto(partes[0]))
+        inicio = dia.replace(hour=h[0], minute=h[1], second=h[2]) if h else None
+    if fin is None and inicio is not None:
+        h = _hora(normalizar_texto(partes[-1]))
+        if h:
+            fin = inicio.replace(hour=h[0], minute=h[1], second=h[2])
+            if fin <= inicio:
+                fin += timedelta(days=1)  # la ventana cruza la medianoche
+    return inicio, fin
+
+
+# ─────────────────────────────── Texto ───────────────────────────────
+def _lineas(texto: str) -> tuple[list[str], set[int]]:
+    """Líneas con texto, sin los bloques de encabezados de correos reenviados.
+
+    Un bloque es una serie de líneas ``From:``/``Sent:``/``To:``... (o sus
+    equivalentes en español y portugués) que incluye al remitente; su fecha es
+    la del envío y no la de la tarea. También devuelve los índices de las
+    líneas que siguen a una línea en blanco.
+    """
+    crudas = texto.splitlines()
+    descartar: set[int] = set()
+    i = 0
+    while i < len(crudas):
+        j = i
+        while j < len(crudas) and _RE_CABECERA.match(normalizar_texto(crudas[j].strip())):
+            j += 1
+        if j - i >= 2 and any(
+            _RE_REMITENTE.match(normalizar_texto(crudas[k].strip())) for k in range(i, j)
+        ):
+            descartar.update(range(i, j))
+        i = max(j, i + 1)
+
+    lineas: list[str] = []
+    cortes: set[int] = set()
+    for n, linea in enumerate(crudas):
+        linea = linea.strip()
+        if not linea:
+            cortes.add(len(lineas))
+        elif n not in descartar:
+            lineas.append(linea)
+    return lineas, cortes
+
+
+def _solo_ids(celdas: list[str]) -> bool:
+    """``True`` si cada celda son solo identificadores (todos con dígitos)."""
+    tokens = [t for c in celdas for t in _RE_IDS.split(c) if t]
+    return bool(tokens) and all(any(ch.isdigit() for ch in t) for t in tokens)
+
+
+def _campos(
+    lineas: list[str], indice: dict[str, str], cortes: set[int] = frozenset()
+) -> dict[str, list[str]]:
+    """Agrupa los valores encontrados para cada campo.
+
+    ``cortes`` son los índices de las líneas precedidas por una en blanco,
+    donde termina la lista de servicios de una tabla.
+    """
+    valores: dict[str, list[str]] = {}
+
+    def agregar(campo: str, valor: str) -> None:
+        valor = valor.strip()
+        if valor and campo != "otro":
+            valores.setdefault(campo, []).append(valor)
+
+    etiquetas = [indice.get(_norm_etiqueta(l)) for l in lineas]
+    i = 0
+    while i < len(lineas):
+        linea = lineas[i]
+
+        # Tabla con separadores: encabezados y filas de datos
+        celdas = _RE_SEPARADOR.split(linea.strip(" |"))
+        if len(celdas) >= 2:
+            columnas = [indice.get(_norm_etiqueta(c)) for c in celdas]
+            if sum(1 for c in columnas if c) >= 2 and any(
+                c and c != "otro" for c in columnas
+            ):
+                j = i + 1
+                while j < len(lineas):
+                    fila = _RE_SEPARADOR.split(lineas[j].strip(" |"))
+                    if any(indice.get(_norm_etiqueta(c)) for c in fila):
+                        break
+                    if len(fila) == len(celdas):
+                        for campo, valor in zip(columnas, fila):
+                            if campo:
+                                agregar(campo, valor)
+                    elif (
+                        j > i + 1
+                        and j not in cortes
+                        and "ids" in columnas
+                        and len(fila) < len(celdas)
+                        and _solo_ids(fila)
+                    ):
+                        # Celdas combinadas: la fila solo trae más servicios
+                        for valor in fila:
+                            agregar("ids", valor)
+                    else:
+                        break
+                    j += 1
+                if j > i + 1:
+                    i = j
+                    continue
+
+        # Bloque de encabezados, uno por línea, seguido de sus valores
+        if etiquetas[i]:
+            k = i
+            while k < len(lineas) and etiquetas[k]:
+                k += 1
+            encabezados = etiquetas[i:k]
+            ancho = len(encabezados)
+            j = k
+            while j + ancho <= len(lineas) and not any(etiquetas[j : j + ancho]):
+                for campo, valor in zip(encabezados, lineas[j : j + ancho]):
+                    agregar(campo, valor)
+                j += ancho
+                # Solo una columna de servicios justifica leer más filas
+                if "ids" not in encabezados:
+                    break
+                col = j + encabezados.index("ids")
+                if col >= len(lineas) or not any(ch.isdigit() for ch in lineas[col]):
+                    break
+            if j > k:
+                i = j
+                continue
+
+        m = _RE_PAR.match(linea) if not etiquetas[i] else None
+        if m:
+            campo = indice.get(_norm_etiqueta(m.group(1)))
+            if campo:
+                agregar(campo, m.group(2))
+        i += 1
+    return valores
+
+
+def extraer_por_plantilla(texto: str, perfil: PerfilCarrier) -> dict | None:
+    """Devuelve los datos de la tarea leídos con reglas fijas.
+
+    El resultado tiene las mismas claves que la respuesta de GPT. Retorna
+    ``None`` si no se pueden determinar inicio, fin y servicios.
+    """
+    indice = (
+        _indice_etiquetas(perfil.etiquetas) if perfil.etiquetas else _INDICE_BASE
+    )
+    lineas, cortes = _lineas(texto)
+    campos = _campos(lineas, indice, cortes)
+    formatos = perfil.formatos_fecha
+
+    def primero(campo: str) -> Optional[str]:
+        return campos.get(campo, [None])[0]
+
+    inicio = parsear_fecha(primero("inicio"), formatos) if primero("inicio") else None
+    fin = parsear_fecha(primero("fin"), formatos) if primero("fin") else None
+    if (inicio is None or fin is None) and primero("horario"):
+        base = None
+        if primero("fecha"):
+            base = parsear_fecha(f"{primero('fecha')} 00:00", formatos)
+        r_inicio, r_fin = _rango(primero("horario"), base, formatos)
+        inicio, fin = inicio or r_inicio, fin or r_fin
+    if inicio is None or fin is None or inicio >= fin:
+        return None
+
+    ids: list[str] = []
+    if perfil.estricto and perfil.servicio is not None:
+        candidatos = perfil.buscar_servicios(texto)
+    else:
+        candidatos = [
+            tok
+            for valor in campos.get("ids", [])
+            for tok in _RE_IDS.split(valor)
+            if any(ch.isdigit() for ch in tok)
+        ]
+    for ident in candidatos:
+        ident = ident.strip(".")
+        if ident and ident not in ids:
+            ids.append(ident)
+    if not ids:
+        return None
+
+    return {
+        "inicio": inicio.isoformat(),
+        "fin": fin.isoformat(),
+        "tipo": primero("tipo"),
+        "afectacion": primero("afectacion"),
+        "descripcion": primero("descripcion"),
+        "ids": ids,
+    }
+
+
+# ────────────────────────────── Métricas ──────────────────────────────
+class MetricasExtraccion:
+    """Cuenta por carrier los correos resueltos con reglas y con GPT."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._datos: dict[str, dict[str, int]] = {}
+
+    def registrar(self, carrier: Optional[str], uso_gpt: bool) -> None:
+        clave = (carrier or "N/D").upper()
+        with self._lock:
+            datos = self._datos.setdefault(clave, {"correos": 0, "gpt": 0})
+            datos["correos"] += 1
+            datos["gpt"] += int(uso_gpt)
+        if uso_gpt:
+            logger.info(
+                "Aviso de %s resuelto con GPT (%.0f%% de sus correos)",
+                clave,
+                self.tasa_gpt(clave) * 100,
+            )
+
+    def tasa_gpt(self, carrier: Optional[str]) -> float:
+        """Proporción de correos de ``carrier`` que necesitaron GPT."""
+        with self._lock:
+            datos = self._datos.get((carrier or "N/D").upper())
+            if not datos or not datos["correos"]:
+                return 0.0
+            return datos["gpt"] / datos["correos"]
+
+    def resumen(self) -> dict[str, dict[str, float]]:
+        """Correos, consultas a GPT y tasa de uso de GPT por carrier."""
+        with self._lock:
+            return {
+                carrier: {**datos, "tasa_gpt": datos["gpt"] / datos["correos"]}
+                for carrier, datos in self._datos.items()
+            }
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+
+metricas = MetricasExtraccion()
+
+
+# ─────────────────────────────── Cache ───────────────────────────────
+class CacheExtracciones:
+    """Resultados de extracción indexados por el hash del correo limpio.
+
+    Un mismo aviso suele llegar varias veces (reenvíos, ``/detectar_tarea``,
+    ``/procesar_correos``); con la cache el segundo análisis no consulta a GPT.
+    Las entradas vencen a los ``EXTRACCION_CACHE_TTL`` segundos y el archivo
+    se escribe cada ``GPT_CACHE_SAVE_INTERVAL`` altas, igual que la cache de
+    GPT, y al cerrar la aplicación. Una extracción equivocada se descarta con
+    :meth:`descartar` (``/limpiar_cache_correos``) para que el próximo
+    reenvío se vuelva a analizar.
+    """
+
+    def __init__(self) -> None:
+        self._datos: Optional[dict[str, dict]] = None
+        self._lock = threading.Lock()
+        self._pendientes = 0
+        atexit.register(self.guardar)
+
+    @staticmethod
+    def clave(texto_limpio: str, carrier: Optional[str] = None) -> str:
+        """Hash del texto; el carrier forzado por el usuario cambia el resultado."""
+        base = f"{(carrier or '').strip().upper()}\n{texto_limpio}"
+        return hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+    def _cargar(self) -> dict[str, dict]:
+        if self._datos is None:
+            self._datos = cargar_json(config.EXTRACCION_CACHE_FILE)
+            self._purgar()
+        return self._datos
+
+    def _purgar(self) -> None:
+        limite = datetime.now() - timedelta(seconds=config.EXTRACCION_CACHE_TTL)
+        vencidas = [
+            k
+            for k, v in self._datos.items()
+            if datetime.fromisoformat(v["timestamp"]) < limite
+        ]
+        for k in vencidas:
+            del self._datos[k]
+        if vencidas:
+            self._pendientes += 1
+
+    def obtener(self, clave: str) -> Optional[dict]:
+        if config.EXTRACCION_CACHE_TTL <= 0:
+            return None
+        with self._lock:
+            entrada = self._cargar().get(clave)
+            if not entrada:
+                return None
+            ts = datetime.fromisoformat(entrada["timestamp"])
+            if (datetime.now() - ts).total_seconds() >= config.EXTRACCION_CACHE_TTL:
+                del self._datos[clave]
+                return None
+            return entrada["datos"]
+
+    def guardar_resultado(self, clave: str, datos: dict) -> None:
+        if config.EXTRACCION_CACHE_TTL <= 0:
+            return
+        with self._lock:
+            self._cargar()[clave] = {
+                "timestamp": datetime.now().isoformat(),
+                "datos": datos,
+            }
+            self._pendientes += 1
+            escribir = self._pendientes >= config.GPT_CACHE_SAVE_INTERVAL
+        if escribir:
+            self.guardar()
+
+    def guardar(self) -> None:
+        """Escribe la cache en disco si hubo cambios."""
+        with self._lock:
+            if self._datos is None or not self._pendientes:
+                return
+            self._purgar()
+            guardar_json(self._datos, config.EXTRACCION_CACHE_FILE)
+            self._pendientes = 0
+
+    def descartar(self, id_interno: str) -> int:
+        """Quita las extracciones con ese ``id_interno`` y devuelve cuántas eran."""
+        buscado = id_interno.strip().upper()
+        with self._lock:
+            datos = self._cargar()
+            claves = [
+                k
+                for k, v in datos.items()
+                if str(v["datos"].get("id_interno") or "").upper() == buscado
+            ]
+            for k in claves:
+                del datos[k]
+            if claves:
+                guardar_json(datos, config.EXTRACCION_CACHE_FILE)
+                self._pendientes = 0
+        return len(claves)
+
+    def limpiar(self) -> None:
+        """Vacía la cache, también en disco."""
+        with self._lock:
+            self._datos = {}
+            self._pendientes = 0
+            guardar_json(self._datos, config.EXTRACCION_CACHE_FILE)
+
+
+cache_extracciones = CacheExtracciones()
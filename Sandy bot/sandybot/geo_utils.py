@@ -5,13 +5,25 @@
 
 from __future__ import annotations
 
+import io
+import logging
+import multiprocessing
 import re
-from typing import Iterable
-import geopandas as gpd
-import contextily as ctx
-from shapely.geometry import Point
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterable, Sequence
 import matplotlib.pyplot as plt
+import numpy as np
 
+from .config import config
+from .teselas import agregar_mapa_base
+
+logger = logging.getLogger(__name__)
+
+# Radio ecuatorial WGS84 usado por Web Mercator (EPSG:3857)
+RADIO_TIERRA = 6378137.0
+
+# Pool de procesos reutilizado entre informes (se crea al primer uso)
+_pool_mapas: ProcessPoolExecutor | None = None
 
 
 def extraer_coordenada(texto: str) -> tuple[float, float] | None:
@@ -39,23 +51,40 @@ def extraer_coordenada(texto: str) -> tuple[float, float] | None:
         return None
 
 
+def proyectar_web_mercator(
+    puntos: Sequence[tuple[float, float]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Proyecta ``(lat, lon)`` en grados a metros EPSG:3857.
+
+    Son las mismas fórmulas esféricas que aplica ``pyproj`` para Web
+    Mercator, así que no hace falta cargar geopandas para unos pocos puntos.
+    """
+    coords = np.asarray(puntos, dtype=float).reshape(-1, 2)
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    xs = RADIO_TIERRA * lon
+    ys = RADIO_TIERRA * np.log(np.tan(np.pi / 4 + lat / 2))
+    return xs, ys
+
+
 def generar_mapa_puntos(
     puntos: Iterable[tuple[float, float]],
     indices: Iterable[int],
-    ruta: str,
+    ruta: str | IO[bytes],
 ) -> None:
-    """Genera un mapa PNG con las coordenadas y sus números de fila."""
+    """Genera un mapa PNG con las coordenadas y sus números de fila.
 
-    gdf = gpd.GeoDataFrame(
-        index=range(len(list(puntos))),
-        geometry=[Point(lon, lat) for lat, lon in puntos],
-        crs="EPSG:4326",
-    ).to_crs(epsg=3857)
+    ``ruta`` puede ser un archivo en disco o un buffer en memoria.
+    """
+    puntos = list(puntos)
+    xs, ys = proyectar_web_mercator(puntos)
 
     fig, ax = plt.subplots(figsize=(6, 6))
-    gdf.plot(ax=ax, color="red")
+    # Equivale a ``GeoDataFrame.plot(color="red")`` para puntos proyectados
+    ax.scatter(xs, ys, color="red", marker="o")
+    ax.set_aspect("equal")
 
-    for numero, (x, y) in zip(indices, zip(gdf.geometry.x, gdf.geometry.y)):
+    for numero, x, y in zip(indices, xs, ys):
         ax.text(
             x,
             y,
@@ -67,10 +96,11 @@ def generar_mapa_puntos(
             bbox=dict(boxstyle="circle", facecolor="blue"),
         )
 
-    xmin, ymin, xmax, ymax = gdf.total_bounds
+    xmin, xmax = xs.min(), xs.max()
+    ymin, ymax = ys.min(), ys.max()
     base_m = 0.04 * 25000  # 4 cm a escala 1:25.000
-    if len(gdf) == 1:
-        cx, cy = gdf.geometry.x.iloc[0], gdf.geometry.y.iloc[0]
+    if len(xs) == 1:
+        cx, cy = xs[0], ys[0]
         ax.set_xlim(cx - base_m / 2, cx + base_m / 2)
         ax.set_ylim(cy - base_m / 2, cy + base_m / 2)
     else:
@@ -83,8 +113,64 @@ def generar_mapa_puntos(
         ax.set_xlim(cx - width / 2, cx + width / 2)
         ax.set_ylim(cy - height / 2, cy + height / 2)
 
-    ctx.add_basemap(ax, crs="EPSG:3857", source=ctx.providers.OpenStreetMap.Mapnik)
+    # Mapa base desde la cache local de teselas (ver ``teselas.py``)
+    agregar_mapa_base(ax)
     ax.set_axis_off()
     plt.tight_layout()
     plt.savefig(ruta, dpi=150)
     plt.close()
+
+
+# ──────────────────────── RENDER EN PARALELO ─────────────────────────
+def generar_mapa_png(
+    puntos: Sequence[tuple[float, float]], indices: Sequence[int]
+) -> bytes:
+    """Devuelve el mapa como bytes PNG, sin pasar por el disco."""
+    buffer = io.BytesIO()
+    generar_mapa_puntos(puntos, indices, buffer)
+    return buffer.getvalue()
+
+
+def _generar_mapa_png_trabajo(trabajo: tuple) -> bytes:
+    """Adaptador para ``ProcessPoolExecutor.map`` (recibe una tupla)."""
+    return generar_mapa_png(*trabajo)
+
+
+def _obtener_pool_mapas() -> ProcessPoolExecutor:
+    global _pool_mapas
+    if _pool_mapas is None:
+        # "spawn" evita heredar hilos y locks del bot al crear los procesos
+        _pool_mapas = ProcessPoolExecutor(
+            max_workers=config.MAP_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool_mapas
+
+
+def cerrar_pool_mapas() -> None:
+    """Finaliza los procesos de render, si existen."""
+    global _pool_mapas
+    if _pool_mapas is not None:
+        _pool_mapas.shutdown(cancel_futures=True)
+        _pool_mapas = None
+
+
+def renderizar_mapas(
+    trabajos: Sequence[tuple[Sequence[tuple[float, float]], Sequence[int]]],
+) -> list[bytes]:
+    """Genera varios mapas en paralelo y devuelve los PNG en el mismo orden.
+
+    Cada trabajo es ``(puntos, indices)``. Con pocos mapas o un solo proceso
+    configurado se dibujan en el proceso actual, ya que levantar el pool
+    cuesta más que el render. Si el pool falla se vuelve al modo secuencial.
+    """
+    trabajos = [(list(p), list(i)) for p, i in trabajos]
+    if len(trabajos) < 2 or config.MAP_WORKERS <= 1:
+        return [generar_mapa_png(*t) for t in trabajos]
+
+    try:
+        return list(_obtener_pool_mapas().map(_generar_mapa_png_trabajo, trabajos))
+    except Exception as exc:  # BrokenProcessPool, falta de memoria, etc.
+        logger.warning("Render de mapas en paralelo falló, se usa modo secuencial: %s", exc)
+        cerrar_pool_mapas()
+        return [generar_mapa_png(*t) for t in trabajos]
@@ -3,117 +3,108 @@
 # User-provided custom instructions
 """
 Handlers del bot Sandy
+
+Los módulos de cada handler se importan recién cuando se accede a alguno de
+sus nombres (``sandybot.handlers.procesar_correos``, ``from .handlers import
+supermenu``...). Así arrancar el bot no carga pandas, python-docx, openai ni
+el resto de dependencias pesadas hasta que un flujo las necesita.
 """
 
-from .callback import callback_handler
-from .cargar_tracking import guardar_tracking_servicio, iniciar_carga_tracking
-from .carriers import (
-    actualizar_carrier,
-    agregar_carrier,
-    eliminar_carrier,
-    listar_carriers,
-)
-from .comparador import iniciar_comparador, procesar_comparacion, recibir_tracking
-from .descargar_camaras import enviar_camaras_servicio, iniciar_descarga_camaras
-from .descargar_tracking import enviar_tracking_servicio, iniciar_descarga_tracking
-from .destinatarios import (
-    agregar_destinatario,
-    eliminar_destinatario,
-    listar_destinatarios,
-    listar_destinatarios_por_carrier,
-)
-from .detectar_tarea_mail import detectar_tarea_mail
-from .document import document_handler
-from .enviar_camaras_mail import iniciar_envio_camaras_mail, procesar_envio_camaras_mail
-from .id_carrier import iniciar_identificador_carrier, procesar_identificador_carrier
-from .identificador_tarea import (
-    iniciar_identificador_tarea,
-    procesar_identificador_tarea,
-)
-from .incidencias import iniciar_incidencias, procesar_incidencias
-from .informe_sla import (
-    actualizar_plantilla_sla,
-    iniciar_informe_sla,
-    procesar_informe_sla,
-)
-from .ingresar_tarea import ingresar_tarea
-from .ingresos import iniciar_verificacion_ingresos, procesar_ingresos
-from .listar_tareas import listar_tareas
-from .message import message_handler
-from .procesar_correos import procesar_correos
-from .reenviar_aviso import reenviar_aviso
-from .registro_ingresos import guardar_registro, iniciar_registro_ingresos
-from .repetitividad import procesar_repetitividad
-from .start import start_handler
-from .supermenu import depurar_duplicados, listar_camaras
-from .supermenu import listar_carriers as listar_carriers_cdb
-from .supermenu import (
-    listar_clientes,
-    listar_conversaciones,
-    listar_ingresos,
-    listar_reclamos,
-    listar_servicios,
-    listar_tareas_programadas,
-    listar_tareas_servicio,
-    supermenu,
-)
-from .tarea_programada import registrar_tarea_programada
-from .voice import voice_handler
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from types import ModuleType
+
+# Nombre exportado -> módulo que lo define, o (módulo, nombre original)
+_EXPORTADOS: dict[str, str | tuple[str, str]] = {
+    "start_handler": "start",
+    "callback_handler": "callback",
+    "message_handler": "message",
+    "document_handler": "document",
+    "voice_handler": "voice",
+    "iniciar_verificacion_ingresos": "ingresos",
+    "procesar_ingresos": "ingresos",
+    "iniciar_registro_ingresos": "registro_ingresos",
+    "guardar_registro": "registro_ingresos",
+    "procesar_repetitividad": "repetitividad",
+    "iniciar_comparador": "comparador",
+    "recibir_tracking": "comparador",
+    "procesar_comparacion": "comparador",
+    "iniciar_carga_tracking": "cargar_tracking",
+    "guardar_tracking_servicio": "cargar_tracking",
+    "iniciar_descarga_tracking": "descargar_tracking",
+    "enviar_tracking_servicio": "descargar_tracking",
+    "iniciar_descarga_camaras": "descargar_camaras",
+    "enviar_camaras_servicio": "descargar_camaras",
+    "iniciar_envio_camaras_mail": "enviar_camaras_mail",
+    "procesar_envio_camaras_mail": "enviar_camaras_mail",
+    "iniciar_identificador_carrier": "id_carrier",
+    "procesar_identificador_carrier": "id_carrier",
+    "iniciar_identificador_tarea": "identificador_tarea",
+    "procesar_identificador_tarea": "identificador_tarea",
+    "iniciar_incidencias": "incidencias",
+    "procesar_incidencias": "incidencias",
+    "iniciar_informe_sla": "informe_sla",
+    "procesar_informe_sla": "informe_sla",
+    "actualizar_plantilla_sla": "informe_sla",
+    "agregar_destinatario": "destinatarios",
+    "eliminar_destinatario": "destinatarios",
+    "listar_destinatarios": "destinatarios",
+    "listar_destinatarios_por_carrier": "destinatarios",
+    "agregar_carrier": "carriers",
+    "eliminar_carrier": "carriers",
+    "listar_carriers": "carriers",
+    "actualizar_carrier": "carriers",
+    "registrar_tarea_programada": "tarea_programada",
+    "ingresar_tarea": "ingresar_tarea",
+    "listar_tareas": "listar_tareas",
+    "detectar_tarea_mail": "detectar_tarea_mail",
+    "procesar_correos": "procesar_correos",
+    "limpiar_cache_correos": "cache_correos",
+    "reenviar_aviso": "reenviar_aviso",
+    "avisos_tareas": "avisos_tareas",
+    "supermenu": "supermenu",
+    "listar_servicios": "supermenu",
+    "listar_reclamos": "supermenu",
+    "listar_camaras": "supermenu",
+    "depurar_duplicados": "supermenu",
+    "listar_clientes": "supermenu",
+    "listar_carriers_cdb": ("supermenu", "listar_carriers"),
+    "listar_conversaciones": "supermenu",
+    "listar_ingresos": "supermenu",
+    "listar_tareas_programadas": "supermenu",
+    "listar_tareas_servicio": "supermenu",
+    "listar_correos_fallidos": "supermenu",
+    "reintentar_correos_fallidos": "supermenu",
+}
+
+__all__ = list(_EXPORTADOS)
+
+
+class _PaqueteHandlers(ModuleType):
+    """Módulo del paquete con carga diferida de los handlers."""
+
+    def __getattr__(self, nombre: str):
+        destino = _EXPORTADOS.get(nombre)
+        if destino is None:
+            raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+        modulo, original = destino if isinstance(destino, tuple) else (destino, nombre)
+        valor = getattr(import_module(f".{modulo}", __name__), original)
+        super().__setattr__(nombre, valor)
+        return valor
+
+    def __setattr__(self, nombre: str, valor) -> None:
+        # Al importar un submódulo Python lo asigna como atributo del paquete.
+        # Si coincide con una función exportada (``procesar_correos``,
+        # ``supermenu``...) se conserva la función, como con la importación
+        # directa que había antes.
+        if isinstance(valor, ModuleType) and nombre in _EXPORTADOS:
+            return
+        super().__setattr__(nombre, valor)
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_EXPORTADOS))
+
 
-__all__ = [
-    "start_handler",
-    "callback_handler",
-    "message_handler",
-    "document_handler",
-    "voice_handler",
-    "iniciar_verificacion_ingresos",
-    "procesar_ingresos",
-    "iniciar_registro_ingresos",
-    "guardar_registro",
-    "procesar_repetitividad",
-    "iniciar_comparador",
-    "recibir_tracking",
-    "procesar_comparacion",
-    "iniciar_carga_tracking",
-    "guardar_tracking_servicio",
-    "iniciar_descarga_tracking",
-    "enviar_tracking_servicio",
-    "iniciar_descarga_camaras",
-    "enviar_camaras_servicio",
-    "iniciar_envio_camaras_mail",
-    "procesar_envio_camaras_mail",
-    "iniciar_identificador_carrier",
-    "procesar_identificador_carrier",
-    "iniciar_identificador_tarea",
-    "procesar_identificador_tarea",
-    "iniciar_incidencias",
-    "procesar_incidencias",
-    "iniciar_informe_sla",
-    "procesar_informe_sla",
-    "actualizar_plantilla_sla",
-    "agregar_destinatario",
-    "eliminar_destinatario",
-    "listar_destinatarios",
-    "listar_destinatarios_por_carrier",
-    "agregar_carrier",
-    "eliminar_carrier",
-    "listar_carriers",
-    "actualizar_carrier",
-    "registrar_tarea_programada",
-    "ingresar_tarea",
-    "listar_tareas",
-    "detectar_tarea_mail",
-    "procesar_correos",
-    "reenviar_aviso",
-    "supermenu",
-    "listar_servicios",
-    "listar_reclamos",
-    "listar_camaras",
-    "depurar_duplicados",
-    "listar_clientes",
-    "listar_carriers_cdb",
-    "listar_conversaciones",
-    "listar_ingresos",
-    "listar_tareas_programadas",
-    "listar_tareas_servicio",
-]
+sys.modules[__name__].__class__ = _PaqueteHandlers
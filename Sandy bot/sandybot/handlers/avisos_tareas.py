@@ -0,0 +1,86 @@
+# Nombre de archivo: avisos_tareas.py
+# Ubicación de archivo: Sandy bot/sandybot/handlers/avisos_tareas.py
+# User-provided custom instructions
+"""Envío en lote de los avisos de un rango de tareas programadas."""
+
+import asyncio
+import logging
+
+from sqlalchemy.exc import SQLAlchemyError
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from ..avisos import ResultadoAvisos, enviar_avisos
+from ..registrador import responder_registrando
+from ..utils import obtener_mensaje
+
+logger = logging.getLogger(__name__)
+
+
+def _lista(ids: list[int]) -> str:
+    return ", ".join(str(i) for i in ids)
+
+
+def _resumen(resultado: ResultadoAvisos, desde: int, hasta: int) -> str:
+    if not (
+        resultado.encolados
+        or resultado.repetidos
+        or resultado.sin_cliente
+        or resultado.sin_destinatarios
+        or resultado.fallidos
+    ):
+        return f"No hay tareas entre {desde} y {hasta}."
+    lineas = [f"📨 Avisos encolados: {len(resultado.encolados)}"]
+    if resultado.repetidos:
+        lineas.append(f"Ya encolados antes: {_lista(resultado.repetidos)}")
+    if resultado.sin_cliente:
+        lineas.append(f"Sin cliente asociado: {_lista(resultado.sin_cliente)}")
+    if resultado.sin_destinatarios:
+        lineas.append(f"Sin destinatarios: {_lista(resultado.sin_destinatarios)}")
+    if resultado.fallidos:
+        lineas.append(f"No se pudieron encolar: {_lista(resultado.fallidos)}")
+    return "\n".join(lineas)
+
+
+async def avisos_tareas(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Envía los avisos de un rango de tareas programadas en un solo lote."""
+    mensaje = obtener_mensaje(update)
+    if not mensaje:
+        return
+
+    user_id = update.effective_user.id
+    args = context.args or []
+    if len(args) < 2 or not args[0].isdigit() or not args[1].isdigit():
+        await responder_registrando(
+            mensaje,
+            user_id,
+            mensaje.text or "avisos_tareas",
+            "Usá: /avisos_tareas <id_desde> <id_hasta> [carrier]",
+            "tareas",
+        )
+        return
+
+    desde, hasta = sorted((int(args[0]), int(args[1])))
+    carrier_nombre = args[2] if len(args) > 2 else None
+
+    # Las consultas y el encolado son sincrónicos: se corren fuera del loop.
+    # ``enviar_avisos`` valida el tamaño del rango antes de tocar la base.
+    try:
+        resultado = await asyncio.to_thread(
+            enviar_avisos, desde, hasta, carrier_nombre
+        )
+    except ValueError as e:
+        respuesta = f"{e}. Dividilo en varios pedidos."
+    except SQLAlchemyError as e:
+        logger.error("Error al cargar los avisos %s-%s: %s", desde, hasta, e)
+        respuesta = "No pude conectarme a la base de datos. Verificá la configuración."
+    else:
+        respuesta = _resumen(resultado, desde, hasta)
+
+    await responder_registrando(
+        mensaje,
+        user_id,
+        mensaje.text or "avisos_tareas",
+        respuesta,
+        "tareas",
+    )
@@ -0,0 +1,44 @@
+# Nombre de archivo: cache_correos.py
+# Ubicación de archivo: Sandy bot/sandybot/handlers/cache_correos.py
+# User-provided custom instructions
+"""Comando para descartar extracciones de correos guardadas en la cache."""
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from ..extractor_correo import cache_extracciones
+from ..registrador import responder_registrando
+from ..utils import obtener_mensaje
+
+
+async def limpiar_cache_correos(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Descarta extracciones guardadas para que los correos se vuelvan a analizar.
+
+    Con un ID de tarea del carrier solo se quitan las de ese aviso; sin
+    argumentos se vacía toda la cache.
+    """
+    mensaje = obtener_mensaje(update)
+    if not mensaje:
+        return
+
+    user_id = update.effective_user.id
+    args = context.args or []
+    if args:
+        cantidad = cache_extracciones.descartar(args[0])
+        if cantidad:
+            respuesta = f"🧹 Se descartaron {cantidad} análisis del aviso {args[0]}."
+        else:
+            respuesta = f"No hay análisis guardados del aviso {args[0]}."
+    else:
+        cache_extracciones.limpiar()
+        respuesta = "🧹 Cache de correos vaciada."
+
+    await responder_registrando(
+        mensaje,
+        user_id,
+        mensaje.text or "limpiar_cache_correos",
+        respuesta,
+        "tareas",
+    )
@@ -13,14 +13,12 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from .estado import UserState
-from .ingresos import iniciar_verificacion_ingresos
-from .repetitividad import iniciar_repetitividad
-from .comparador import iniciar_comparador, procesar_comparacion
-from .cargar_tracking import iniciar_carga_tracking, guardar_tracking_servicio
 from ..database import obtener_servicio
 from ..registrador import registrar_conversacion
 from ..utils import obtener_mensaje  # Si se necesitara en el futuro
-from .message import _ejecutar_accion_natural, _nombre_flujo
+
+# Los handlers de cada flujo se importan al atender el botón correspondiente
+# para que el arranque no cargue pandas, python-docx, etc.
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +32,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # ────────────────────────── CONFIRMAR SÍ/NO ───────────────────────────
     if data == "confirmar_flujo_si":
+        from .message import _ejecutar_accion_natural, _nombre_flujo
         flujo = context.user_data.pop("confirmar_flujo", None)
         registrar_conversacion(user_id, "confirmar_flujo_si", "Confirmar", "callback")
         if flujo:
@@ -64,11 +63,13 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if data == "comparar_fo":
         UserState.set_mode(user_id, "comparador")
         context.user_data.clear()
+        from .comparador import iniciar_comparador
         registrar_conversacion(user_id, "boton_comparar_fo", "Inicio comparador", "callback")
         await iniciar_comparador(update, context)
 
     # ─────────────────────────── VERIFICACIÓN INGRESOS ──────────────────────
     elif data == "verificar_ingresos":
+        from .ingresos import iniciar_verificacion_ingresos
         registrar_conversacion(user_id, "boton_verificar_ingresos", "Inicio ingresos", "callback")
         await iniciar_verificacion_ingresos(update, context)
 
@@ -90,11 +91,13 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # ─────────────────────── INFORME DE REPETITIVIDAD ──────────────────────
     elif data == "informe_repetitividad":
         UserState.set_mode(user_id, "repetitividad")
+        from .repetitividad import iniciar_repetitividad
         registrar_conversacion(user_id, "boton_informe_repetitividad", "Inicio repetitividad", "callback")
         await iniciar_repetitividad(update, context)
 
     # ─────────────────────────── TRACKINGS SERVICIO ─────────────────────────
     elif data == "cargar_tracking":
+        from .cargar_tracking import iniciar_carga_tracking
         registrar_conversacion(user_id, "boton_cargar_tracking", "Inicio carga tracking", "callback")
         await iniciar_carga_tracking(update, context)
 
@@ -170,6 +173,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data["tipo_tracking"] = (
             "principal" if data == "tracking_principal" else "complementario"
         )
+        from .cargar_tracking import guardar_tracking_servicio
         registrar_conversacion(user_id, data, "Elegir tipo", "callback")
         await guardar_tracking_servicio(update, context)
 
@@ -233,6 +237,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("Ese servicio no posee tracking. Debés enviar el archivo .txt.")
 
     elif data == "comparador_procesar":
+        from .comparador import procesar_comparacion
         registrar_conversacion(user_id, "comparador_procesar", "Procesar", "callback")
         await procesar_comparacion(update, context)
 
@@ -7,11 +7,15 @@ from telegram.ext import ContextTypes
 import logging
 import re
 from pathlib import Path
-from datetime import datetime
 from ..utils import obtener_mensaje, normalizar_camara
-from ..tracking_parser import TrackingParser
+from ..tracking_parser import TrackingParser, obtener_cache as obtener_cache_trackings
 from ..config import config
-from ..database import actualizar_tracking, obtener_servicio, crear_servicio
+from ..database import (
+    actualizar_tracking,
+    archivar_tracking_anterior,
+    crear_servicio,
+    obtener_servicio,
+)
 from .estado import UserState
 from ..registrador import responder_registrando
 
@@ -156,19 +160,18 @@ async def guardar_tracking_servicio(update: Update, context: ContextTypes.DEFAUL
 
     ruta_destino = config.DATA_DIR / f"tracking_{servicio}.txt"
     rutas_extra = []
-    if ruta_destino.exists():
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        historico = config.HISTORICO_DIR / f"tracking_{servicio}_{timestamp}.txt"
-        ruta_destino.rename(historico)
-        rutas_extra.append(str(historico))
+    # Si el anterior ya está comprimido en la base no se guarda otra copia
+    historico = archivar_tracking_anterior(servicio, ruta_destino)
+    if historico:
+        rutas_extra.append(historico)
 
     Path(ruta_temp).rename(ruta_destino)
 
-    parser = TrackingParser()
+    parser = TrackingParser(cache=obtener_cache_trackings())
     try:
         parser.clear_data()
         parser.parse_file(str(ruta_destino))
-        camaras = parser._data[0][1]["camara"].astype(str).tolist()
+        camaras = parser.camaras(0)
         rutas_extra.append(str(ruta_destino))
         id_servicio = int(servicio)
         existente = obtener_servicio(id_servicio)
@@ -6,14 +6,15 @@ Handler para la comparación de trazados de fibra óptica.
 """
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+import asyncio
 import logging
 import os
 import tempfile
-from datetime import datetime
-from sandybot.tracking_parser import TrackingParser
+from sandybot.tracking_parser import TrackingParser, obtener_cache as obtener_cache_trackings
 from sandybot.utils import obtener_mensaje, normalizar_camara
 from sandybot.database import (
     actualizar_tracking,
+    archivar_tracking_anterior,
     obtener_servicio,
     crear_servicio,
 )
@@ -104,19 +105,18 @@ async def recibir_tracking(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
         ruta_destino = config.DATA_DIR / f"tracking_{servicio}.txt"
         rutas_extra = []
-        if ruta_destino.exists():
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            historico = config.HISTORICO_DIR / f"tracking_{servicio}_{timestamp}.txt"
-            ruta_destino.rename(historico)
-            rutas_extra.append(str(historico))
+        # Si el anterior ya está comprimido en la base no se guarda otra copia
+        historico = archivar_tracking_anterior(servicio, ruta_destino)
+        if historico:
+            rutas_extra.append(historico)
 
         shutil.move(tmp.name, ruta_destino)
 
-        parser = TrackingParser()
+        parser = TrackingParser(cache=obtener_cache_trackings())
         try:
             parser.clear_data()
             parser.parse_file(str(ruta_destino))
-            camaras = parser._data[0][1]["camara"].astype(str).tolist()
+            camaras = parser.camaras(0)
             rutas_extra.append(str(ruta_destino))
             existente = obtener_servicio(servicio)
             if not existente:
@@ -213,11 +213,25 @@ async def procesar_comparacion(update: Update, context: ContextTypes.DEFAULT_TYP
             "comparador",
         )
 
-        parser = TrackingParser()
+        parser = TrackingParser(cache=obtener_cache_trackings())
         try:
             parser.clear_data()
-            for ruta, nombre in trackings:
-                parser.parse_file(ruta, sheet_name=nombre)
+            # Los trackings se leen en paralelo en un hilo aparte para no
+            # bloquear al bot; cada archivo que falle se informa por separado
+            errores = await asyncio.to_thread(parser.parse_files, trackings)
+            if errores:
+                detalle = "\n".join(
+                    f"• {os.path.basename(ruta)}: {error}" for ruta, error in errores
+                )
+                await responder_registrando(
+                    mensaje,
+                    user_id,
+                    "procesar_comparacion",
+                    f"⚠️ No se pudieron leer algunos trackings:\n{detalle}",
+                    "comparador",
+                )
+            if len(parser._data) < 2:
+                raise ValueError("no quedaron al menos dos trackings válidos")
 
             salida = os.path.join(
                 tempfile.gettempdir(), f"ComparacionFO_{user_id}.xlsx"
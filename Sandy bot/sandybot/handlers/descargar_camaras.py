@@ -14,9 +14,9 @@ from ..database import exportar_camaras_servicio
 from ..registrador import (
     responder_registrando,
     registrar_conversacion,
-    registrar_envio_email,
+    registrar_email_encolado,
 )
-from ..correo import enviar_email
+from ..outbox import encolar
 from .estado import UserState
 
 logger = logging.getLogger(__name__)
@@ -94,14 +94,16 @@ async def enviar_camaras_servicio(
 
         destinatarios = obtener_destinatarios_servicio(id_servicio)
         if destinatarios:
-            if enviar_email(
+            # El Excel se copia en la bandeja de salida; el archivo temporal
+            # puede borrarse aunque el correo todavía no haya salido
+            if encolar(
                 destinatarios,
                 "Listado de camaras",
                 "Adjunto el Excel generado por SandyBot.",
-                ruta,
-                nombre_archivo,
+                adjunto=ruta,
+                nombre_adjunto=nombre_archivo,
             ):
-                registrar_envio_email(
+                registrar_email_encolado(
                     mensaje.from_user.id, destinatarios, nombre_archivo
                 )
     except Exception as e:
@@ -12,9 +12,9 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from ..email_utils import procesar_correo_a_tarea
+from ..lector_msg import leer_msg
 from ..registrador import responder_registrando
 from ..utils import obtener_mensaje
-from .procesar_correos import _leer_msg
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +52,7 @@ async def detectar_tarea_mail(
         try:
             nombre = (mensaje.document.file_name or "").lower()
             if nombre.endswith(".msg"):
-                contenido = _leer_msg(ruta)
+                contenido = leer_msg(ruta)
             else:
                 contenido = Path(ruta).read_text(encoding="utf-8", errors="ignore")
         except Exception as e:
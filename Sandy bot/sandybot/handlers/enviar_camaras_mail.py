@@ -16,7 +16,7 @@ from ..utils import obtener_mensaje
 from ..database import exportar_camaras_servicio
 from ..registrador import responder_registrando, registrar_conversacion
 from .estado import UserState
-from ..email_utils import enviar_excel_por_correo
+from ..email_utils import encolar_excel_por_correo
 
 logger = logging.getLogger(__name__)
 
@@ -87,12 +87,14 @@ async def procesar_envio_camaras_mail(
         return
 
     try:
-        enviar_excel_por_correo(
+        # El correo queda en la bandeja de salida y lo envía el trabajador
+        if not encolar_excel_por_correo(
             correo,
             ruta,
             asunto="Listado de cámaras",
             cuerpo="Adjunto las cámaras solicitadas.",
-        )
+        ):
+            raise RuntimeError("no se pudo encolar el correo")
         registrar_conversacion(
             mensaje.from_user.id,
             mensaje.text,
@@ -11,6 +11,7 @@ import os
 import tempfile
 
 from ..utils import obtener_mensaje
+from ..excel_utils import leer_excel
 from ..database import SessionLocal, Servicio, Carrier, registrar_servicio
 from .estado import UserState
 from ..registrador import responder_registrando, registrar_conversacion
@@ -64,7 +65,7 @@ async def procesar_identificador_carrier(
         await file.download_to_drive(tmp.name)
 
     try:
-        df = pd.read_excel(tmp.name)
+        df = leer_excel(tmp.name)
     except Exception as e:
         logger.error("Error leyendo Excel: %s", e)
         await responder_registrando(
@@ -15,10 +15,10 @@ from telegram.ext import ContextTypes
 from telegram.helpers import escape_markdown
 
 from ..email_utils import procesar_correo_a_tarea
+from ..lector_msg import leer_msg
 from ..registrador import responder_registrando
 from ..utils import obtener_mensaje
 from .estado import UserState
-from .procesar_correos import _leer_msg
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +67,7 @@ async def procesar_identificador_tarea(
 
     try:
         if nombre.lower().endswith(".msg"):
-            contenido = _leer_msg(ruta)
+            contenido = leer_msg(ruta)
             if not contenido:
                 await responder_registrando(
                     mensaje,
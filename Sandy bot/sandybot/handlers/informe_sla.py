@@ -10,6 +10,7 @@ import logging
 import locale
 import os
 import shutil
+import sys
 import tempfile
 from datetime import datetime
 from pathlib import Path
@@ -30,6 +31,7 @@ except Exception:  # pragma: no cover
     pythoncom = None
 
 from sandybot.config import config
+from ..excel_utils import leer_encabezado, leer_excel
 from ..utils import (
     obtener_mensaje,
     cargar_json,
@@ -39,6 +41,8 @@ from ..utils import (
 from .estado import UserState
 from ..registrador import responder_registrando, registrar_conversacion
 from .. import database as bd
+from ..conversor_pdf import convertir_a_pdf
+from ..plantillas import cargar_plantilla, invalidar_plantilla
 
 # Plantilla
 RUTA_PLANTILLA = config.SLA_PLANTILLA_PATH
@@ -51,6 +55,32 @@ def _nombre_base_sla() -> str:
     fecha = datetime.now().strftime("%d%m%Y")
     return f"InformeSLA_{fecha}_{nro:02d}"
 
+# Columnas leídas de cada Excel (el resto se descarta al cargarlo)
+_COLUMNAS_RECLAMOS = (
+    "Número Reclamo",
+    "N° de Ticket",
+    "Servicio",
+    "Número Línea",
+    "Número Primer Servicio",
+    "Fecha Inicio Reclamo",
+    "Fecha Inicio Problema Reclamo",
+    "Fecha Cierre Problema Reclamo",
+    "Horas Netas Reclamo",
+    "Tipo Solución Reclamo",
+    "Descripción Solución Reclamo",
+)
+_COLUMNAS_SERVICIOS = (
+    "Tipo Servicio",
+    "Número Línea",
+    "Nombre Cliente",
+    "Horas Reclamos Todos",
+    "SLA",
+    "SLA Entregado",
+    "Dirección Servicio",
+    "Direccion Servicio",
+    "Domicilio",
+)
+
 # ─────────────────────────────── UTILIDADES ────────────────────────────────
 def _guardar_reclamos(df: pd.DataFrame) -> None:
     """Vuelca los reclamos del DataFrame a la BD si no existen."""
@@ -129,8 +159,11 @@ def _mes_anio_desde_tabla(doc: Document) -> tuple[str, str]:
 
 
 def identificar_excel(path: str) -> str:
-    """Devuelve 'reclamos' o 'servicios' según las columnas del Excel."""
-    columnas = set(pd.read_excel(path, nrows=0).columns.str.strip())
+    """Devuelve 'reclamos' o 'servicios' según las columnas del Excel.
+
+    El encabezado queda en memoria y se reutiliza al cargar el archivo.
+    """
+    columnas = {str(c).strip() for c in leer_encabezado(path)}
     if {"Número Reclamo", "N° de Ticket"} & columnas:
         return "reclamos"
     if {"SLA Entregado", "Número Primer Servicio"} & columnas:
@@ -302,6 +335,8 @@ async def actualizar_plantilla_sla(mensaje, context):
             shutil.move(RUTA_PLANTILLA, config.SLA_HISTORIAL_DIR / nombre_backup)
 
         await f.download_to_drive(RUTA_PLANTILLA)
+        # Se descarta el esqueleto en memoria de la plantilla anterior
+        invalidar_plantilla(RUTA_PLANTILLA)
         texto = "Plantilla de SLA actualizada."
         context.user_data.pop("cambiar_plantilla", None)
     except Exception as exc:  # pragma: no cover
@@ -312,40 +347,16 @@ async def actualizar_plantilla_sla(mensaje, context):
 
 
 # ───────────────────────── GENERADOR DE INFORME ─────────────────────────
-def _generar_documento_sla(
-    reclamos_xlsx: str,
-    servicios_xlsx: str,
-    *,
-    eventos: str = "",
-    conclusion: str = "",
-    propuesta: str = "",
-    exportar_pdf: bool = False,
-) -> str:
-    """Crea el informe SLA y devuelve la ruta del DOCX (o PDF)."""
-
-    reclamos_df = pd.read_excel(reclamos_xlsx)
-    reclamos_df.columns = reclamos_df.columns.str.replace(r"\s+", " ", regex=True).str.strip()
-
-    servicios_df = pd.read_excel(servicios_xlsx)
-    servicios_df.columns = servicios_df.columns.str.replace(r"\s+", " ", regex=True).str.strip()
-
-    # Guarda reclamos en BD (ignora errores si BD no está configurada en tests)
-    try:
-        _guardar_reclamos(reclamos_df)
-    except Exception:  # pragma: no cover
-        logger.debug("No se pudo registrar reclamos en la BD (modo test)")
-
-    if "SLA Entregado" in servicios_df.columns and "SLA" not in servicios_df.columns:
-        servicios_df.rename(columns={"SLA Entregado": "SLA"}, inplace=True)
-
-
-    # ── Cargar plantilla ────────────────────────────────────────────
-    if not Path(RUTA_PLANTILLA).exists():
-        raise ValueError(f"Plantilla de SLA no encontrada: {RUTA_PLANTILLA}")
-    doc = Document(RUTA_PLANTILLA)
+def _preparar_plantilla_sla(doc: Document) -> dict:
+    """Deja el esqueleto de la plantilla listo y devuelve sus bloques.
+
+    Se ejecuta una vez por versión de la plantilla (ver
+    :func:`sandybot.plantillas.cargar_plantilla`). Quita el título duplicado,
+    extrae las tablas 2 y 3 junto con los párrafos que las separan y deja la
+    tabla principal solo con su encabezado.
+    """
     cuerpo = doc._body._element
 
-
     # El título en la plantilla está en un cuadro de texto.
     # Si hubiera algún párrafo con ese mismo contenido se elimina
     # para evitar duplicados como "1. Informe SLA ...".
@@ -353,7 +364,6 @@ def _generar_documento_sla(
         if "Informe SLA" in p.text:
             cuerpo.remove(p._p)
 
-
     # ── Tabla principal (se asume que la plantilla contiene ≥1 tabla) ──
     if not doc.tables:
         raise ValueError("La plantilla debe incluir una tabla para el SLA")
@@ -364,7 +374,6 @@ def _generar_documento_sla(
     if len(tablas_plantilla) < 2:
         raise ValueError("La plantilla debe incluir tres tablas")
     tabla2_tpl, tabla3_tpl = [copy.deepcopy(t._tbl) for t in tablas_plantilla]
-    cuerpo = doc._body._element
 
     # Párrafos entre las tablas 2 y 3 para replicar el bloque
     idx_t2 = cuerpo.index(doc.tables[1]._tbl)
@@ -395,6 +404,55 @@ def _generar_documento_sla(
     while len(tabla_principal.rows) > 1:
         tabla_principal._tbl.remove(tabla_principal.rows[1]._tr)
 
+    return {
+        "tabla2": tabla2_tpl,
+        "tabla3": tabla3_tpl,
+        "parrafos": parrafos_tpl,
+        "estilos": estilos_tpl,
+    }
+
+
+def _generar_documento_sla(
+    reclamos_xlsx: str,
+    servicios_xlsx: str,
+    *,
+    eventos: str = "",
+    conclusion: str = "",
+    propuesta: str = "",
+    exportar_pdf: bool = False,
+) -> str:
+    """Crea el informe SLA y devuelve la ruta del DOCX (o PDF)."""
+
+    # Solo se cargan las columnas que usa el informe
+    reclamos_df = leer_excel(reclamos_xlsx, _COLUMNAS_RECLAMOS)
+    reclamos_df.columns = reclamos_df.columns.str.replace(r"\s+", " ", regex=True).str.strip()
+
+    servicios_df = leer_excel(servicios_xlsx, _COLUMNAS_SERVICIOS)
+    servicios_df.columns = servicios_df.columns.str.replace(r"\s+", " ", regex=True).str.strip()
+
+    # Guarda reclamos en BD (ignora errores si BD no está configurada en tests)
+    try:
+        _guardar_reclamos(reclamos_df)
+    except Exception:  # pragma: no cover
+        logger.debug("No se pudo registrar reclamos en la BD (modo test)")
+
+    if "SLA Entregado" in servicios_df.columns and "SLA" not in servicios_df.columns:
+        servicios_df.rename(columns={"SLA Entregado": "SLA"}, inplace=True)
+
+
+    # ── Cargar plantilla ────────────────────────────────────────────
+    if not Path(RUTA_PLANTILLA).exists():
+        raise ValueError(f"Plantilla de SLA no encontrada: {RUTA_PLANTILLA}")
+    # El esqueleto (sin tablas de ejemplo) se parsea una sola vez y se
+    # reutiliza mientras la plantilla no cambie en disco
+    doc, esqueleto = cargar_plantilla(RUTA_PLANTILLA, _preparar_plantilla_sla)
+    cuerpo = doc._body._element
+    tabla_principal = doc.tables[0]
+    tabla2_tpl = esqueleto["tabla2"]
+    tabla3_tpl = esqueleto["tabla3"]
+    parrafos_tpl = esqueleto["parrafos"]
+    estilos_tpl = esqueleto["estilos"]
+
     columnas_sla = [
         "Tipo Servicio",
         "Número Línea",
@@ -619,11 +677,17 @@ def _generar_documento_sla(
             except Exception:
                 logger.warning("Conversión a PDF con win32 falló")
 
+        # En Linux se usa el pool de LibreOffice headless, que mantiene
+        # procesos y perfiles listos para no pagar el arranque en cada informe
         if not convertido:
+            convertido = convertir_a_pdf(ruta_docx, ruta_pdf) is not None
+
+        # docx2pdf solo funciona con Word instalado (Windows o macOS)
+        if not convertido and sys.platform in ("win32", "darwin"):
             try:
                 from docx2pdf import convert  # type: ignore
                 convert(ruta_docx, str(ruta_pdf))
-                converted = True
+                convertido = True
             except Exception:
                 logger.warning("Conversión a PDF con docx2pdf falló")
 
@@ -12,10 +12,10 @@ import os
 import tempfile
 import json
 import re
-import pandas as pd
 from sandybot.utils import obtener_mensaje, normalizar_camara
 from ..database import obtener_servicio, actualizar_tracking, crear_servicio
 from ..config import config
+from ..excel_utils import leer_excel
 import shutil
 from .estado import UserState
 from ..registrador import responder_registrando
@@ -342,7 +342,8 @@ async def procesar_ingresos_excel(
             await archivo.download_to_drive(tmp.name)
 
         try:
-            df = pd.read_excel(tmp.name, header=None)
+            # Solo interesa la columna A
+            df = leer_excel(tmp.name, header=None, usecols=[0])
             camaras = [str(c).strip() for c in df.iloc[:, 0].dropna()]
         except Exception as e:
             logger.error("Error leyendo Excel: %s", e)
@@ -13,14 +13,8 @@ from ..registrador import responder_registrando
 import os
 from .estado import UserState
 from .notion import registrar_accion_pendiente
-from .ingresos import verificar_camara, iniciar_verificacion_ingresos
-from .comparador import iniciar_comparador
-from .cargar_tracking import (
-    guardar_tracking_servicio,
-    iniciar_carga_tracking,
-)
-from .repetitividad import iniciar_repetitividad
-from .id_carrier import iniciar_identificador_carrier
+# Los handlers de cada flujo se importan dentro de las funciones para no
+# cargar pandas, python-docx y demás dependencias hasta que se usan
 from ..utils import normalizar_texto
 from difflib import SequenceMatcher
 
@@ -218,6 +212,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     )
                     return
                 context.user_data.pop("confirmar_id", None)
+                from .cargar_tracking import guardar_tracking_servicio
                 await guardar_tracking_servicio(update, context)
             else:
                 await responder_registrando(
@@ -306,6 +301,7 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await _manejar_opcion_ingresos(update, context, mensaje_usuario)
                 return
             if context.user_data.get("opcion_ingresos") == "nombre":
+                from .ingresos import verificar_camara
                 await verificar_camara(update, context)
                 return
             if context.user_data.get("opcion_ingresos") == "excel":
@@ -671,12 +667,15 @@ async def _ejecutar_accion_natural(
     continuar con el flujo de conversación por defecto.
     """
     if accion == "comparar_fo":
+        from .comparador import iniciar_comparador
         await iniciar_comparador(update, context)
         return True
     elif accion == "verificar_ingresos":
+        from .ingresos import iniciar_verificacion_ingresos
         await iniciar_verificacion_ingresos(update, context)
         return True
     elif accion == "cargar_tracking":
+        from .cargar_tracking import iniciar_carga_tracking
         await iniciar_carga_tracking(update, context)
         return True
     elif accion == "descargar_tracking":
@@ -692,6 +691,7 @@ async def _ejecutar_accion_natural(
         await iniciar_envio_camaras_mail(update, context)
         return True
     elif accion == "id_carrier":
+        from .id_carrier import iniciar_identificador_carrier
         await iniciar_identificador_carrier(update, context)
         return True
     elif accion == "identificador_tarea":
@@ -699,6 +699,7 @@ async def _ejecutar_accion_natural(
         await iniciar_identificador_tarea(update, context)
         return True
     elif accion == "informe_repetitividad":
+        from .repetitividad import iniciar_repetitividad
         await iniciar_repetitividad(update, context)
         return True
     elif accion == "analizar_incidencias":
@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import tempfile
@@ -14,86 +15,65 @@ from pathlib import Path
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from ..email_utils import enviar_correo, procesar_correo_a_tarea
+from ..config import config
+from ..email_utils import (
+    TareaExtraida,
+    encolar_correo,
+    extraer_tarea_correo,
+    registrar_tarea_extraida,
+)
+from ..lector_msg import MIN_PARA_POOL, leer_msg_async
 from ..registrador import responder_registrando
 from ..utils import obtener_mensaje
 
 logger = logging.getLogger(__name__)
 
 
-# ────────────────────────── UTILIDAD LOCAL ──────────────────────────
-def _leer_msg(ruta: str) -> str:
-    """Devuelve «asunto + cuerpo» del archivo MSG, o '' si falla.
+# ────────────────────────── PIPELINE ────────────────────────────────
+async def _descargar(doc) -> str:
+    """Descarga el adjunto a un archivo temporal y devuelve su ruta."""
+    archivo = await doc.get_file()
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        ruta_tmp = tmp.name
+    await archivo.download_to_drive(ruta_tmp)
+    return ruta_tmp
 
-    Se intenta importar ``extract_msg`` en cada llamada para permitir que el
-    handler funcione aunque la dependencia sea opcional. Si la librería no está
-    instalada, se registra el error y se retorna una cadena vacía.
-    """
 
-    msg = None
+async def _extraer_adjunto(
+    doc,
+    carrier_nombre: str | None,
+    limite: asyncio.Semaphore,
+    procesos: int = 0,
+) -> TareaExtraida:
+    """Descarga, lee y analiza un adjunto. Lanza ``ValueError`` si falla.
+
+    La descarga y la lectura del ``.msg`` corren en paralelo con los demás
+    adjuntos (en ``procesos`` procesos si es mayor que cero); la extracción,
+    que puede consultar a GPT, respeta ``limite``.
+    """
+    ruta_tmp = await _descargar(doc)
     try:
-        try:
-            import extract_msg
-        except ModuleNotFoundError as exc:
-            logger.error("No se encontró la librería 'extract-msg': %s", exc)
-            return ""
-
-        msg = extract_msg.Message(ruta)
-        asunto = msg.subject or ""
-        remitente = getattr(msg, "sender", None) or getattr(msg, "sender_email", None)
-        remitente_nom = getattr(msg, "sender_name", None)
-
-        # 👉 1A) Usamos .body y, si está vacío, htmlBody o rtfBody
-        cuerpo = msg.body or getattr(msg, "htmlBody", "") or getattr(msg, "rtfBody", "")
-
-        # Si viene como bytes convertimos a texto para evitar errores
-        if isinstance(cuerpo, bytes):
-            try:
-                cuerpo = cuerpo.decode()
-            except Exception:
-                cuerpo = cuerpo.decode("latin-1", "ignore")
-        if isinstance(asunto, bytes):
-            try:
-                asunto = asunto.decode()
-            except Exception:
-                asunto = asunto.decode("latin-1", "ignore")
-
-        # 👉 1B) Convertimos HTML a texto si es necesario
-        if "<html" in cuerpo.lower():
-            try:
-                from bs4 import BeautifulSoup
-
-                cuerpo = BeautifulSoup(cuerpo, "html.parser").get_text("\n")
-            except ModuleNotFoundError:
-                logger.warning("beautifulsoup4 no instalado; continúo con HTML crudo")
-        cuerpo = cuerpo.strip()
-
-        encabezado = []
-        if remitente:
-            encabezado.append(f"From: {remitente}")
-        if remitente_nom:
-            encabezado.append(f"Name: {remitente_nom}")
-        texto = "\n".join(encabezado + [asunto, cuerpo]).strip()
-
-        if not texto:
-            try:
-                texto = Path(ruta).read_text(encoding="utf-8", errors="ignore")
-            except Exception as err:  # pragma: no cover - error inusual
-                logger.error("Error leyendo texto plano de %s: %s", ruta, err)
-                texto = ""
-
-        return texto
-    except Exception as exc:  # pragma: no cover
-        logger.error("Error leyendo MSG %s: %s", ruta, exc)
-        return ""
+        contenido = await leer_msg_async(ruta_tmp, procesos)
     finally:
-        if msg and hasattr(msg, "close"):
-            msg.close()
+        if os.path.exists(ruta_tmp):
+            os.remove(ruta_tmp)
+    if not contenido:
+        raise ValueError(
+            "no se pudo leer el correo (¿está instalada la librería 'extract-msg'?)"
+        )
+    async with limite:
+        return await extraer_tarea_correo(contenido, carrier_nombre)
 
 
 # ────────────────────────── HANDLER PRINCIPAL ───────────────────────
 async def procesar_correos(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Procesa archivos `.msg` adjuntos y registra las tareas encontradas."""
+    """Procesa archivos `.msg` adjuntos y registra las tareas encontradas.
+
+    Los adjuntos se descargan, leen y analizan en paralelo (con a lo sumo
+    ``CORREOS_CONCURRENCIA`` extracciones a la vez); el registro en la base se
+    hace después, de a uno y en el orden recibido. Un adjunto con errores no
+    frena a los demás: todos los problemas se informan en el resumen final.
+    """
     mensaje = obtener_mensaje(update)
     if not mensaje:
         return
@@ -115,28 +95,24 @@ async def procesar_correos(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     first_name = getattr(docs[0], "file_name", "")
     tareas: list[str] = []
     rutas_msg: list[Path] = []
-
-    for doc in docs:
-        # Descarga temporal del .msg recibido
-        archivo = await doc.get_file()
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            await archivo.download_to_drive(tmp.name)
-            ruta_tmp = tmp.name
-
+    errores: list[str] = []
+
+    limite = asyncio.Semaphore(max(1, config.CORREOS_CONCURRENCIA))
+    # Con pocos adjuntos no compensa arrancar los procesos lectores
+    procesos = config.MSG_WORKERS if len(docs) >= MIN_PARA_POOL else 0
+    resultados = await asyncio.gather(
+        *(_extraer_adjunto(doc, carrier_nombre, limite, procesos) for doc in docs),
+        return_exceptions=True,
+    )
+
+    # Registro serializado: una tarea por vez y en el orden de los adjuntos
+    for doc, extraida in zip(docs, resultados):
+        nombre = getattr(doc, "file_name", "adjunto")
+        if isinstance(extraida, BaseException):
+            logger.error("Fallo procesando correo %s: %s", nombre, extraida)
+            errores.append(f"{nombre}: {extraida}")
+            continue
         try:
-            contenido = _leer_msg(ruta_tmp)
-            if not contenido:
-                await responder_registrando(
-                    mensaje,
-                    user_id,
-                    doc.file_name,
-                    "Instalá la librería 'extract-msg' para procesar correos .MSG.",
-                    "tareas",
-                )
-                os.remove(ruta_tmp)
-                return
-
-            # Procesar correo → registrar tarea → generar .msg final
             (
                 tarea,
                 _creada_nueva,
@@ -144,37 +120,21 @@ async def procesar_correos(update: Update, context: ContextTypes.DEFAULT_TYPE) -
                 ruta_msg,
                 cuerpo,
                 _,
-                carrier_nombre,
-            ) = await procesar_correo_a_tarea(
-                contenido, cliente_nombre, carrier_nombre, generar_msg=True
-            )
+                carrier_tarea,
+            ) = registrar_tarea_extraida(extraida, cliente_nombre, generar_msg=True)
 
-        except ValueError as err:  # pragma: no cover
-            logger.error("Fallo procesando correo %s: %s", doc.file_name, err)
-            await responder_registrando(
-                mensaje,
-                user_id,
-                doc.file_name,
-                str(err),
-                "tareas",
+            # Aviso por correo a destinatarios del cliente
+            encolar_correo(
+                f"Aviso de tarea programada - {cliente.nombre}",
+                cuerpo,
+                cliente.id,
+                carrier_tarea,
+                clave=f"aviso-tarea-{tarea.id}",
             )
-            os.remove(ruta_tmp)
-            continue
-        except Exception as e:  # pragma: no cover
-            logger.error("Fallo procesando correo %s: %s", doc.file_name, e)
-            os.remove(ruta_tmp)
+        except Exception as e:
+            logger.error("Fallo registrando correo %s: %s", nombre, e)
+            errores.append(f"{nombre}: {e}")
             continue
-        finally:
-            if os.path.exists(ruta_tmp):
-                os.remove(ruta_tmp)
-
-        # Aviso por correo a destinatarios del cliente
-        enviar_correo(
-            f"Aviso de tarea programada - {cliente.nombre}",
-            cuerpo,
-            cliente.id,
-            carrier_nombre,
-        )
 
         if ruta_msg.exists():
             rutas_msg.append(ruta_msg)
@@ -182,12 +142,17 @@ async def procesar_correos(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         tareas.append(str(tarea.id))
 
     # Resumen final
+    resumen = []
     if tareas:
+        resumen.append(f"Tareas registradas: {', '.join(tareas)}")
+    if errores:
+        resumen.append("No se pudieron procesar:\n" + "\n".join(f"• {e}" for e in errores))
+    if resumen:
         await responder_registrando(
             mensaje,
             user_id,
             first_name,
-            f"Tareas registradas: {', '.join(tareas)}",
+            "\n".join(resumen),
             "tareas",
         )
 
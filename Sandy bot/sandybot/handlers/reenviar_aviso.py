@@ -9,16 +9,9 @@ from telegram.ext import ContextTypes
 
 from ..utils import obtener_mensaje
 from ..registrador import responder_registrando
-from ..database import (
-    TareaProgramada,
-    TareaServicio,
-    Servicio,
-    Cliente,
-    Carrier,
-    SessionLocal,
-    obtener_cliente_por_nombre,
-)
-from ..email_utils import generar_archivo_msg, enviar_correo
+from ..avisos import cargar_avisos
+from ..database import SessionLocal
+from ..email_utils import generar_archivo_msg, encolar_correo
 
 
 async def reenviar_aviso(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -42,8 +35,8 @@ async def reenviar_aviso(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     carrier_nombre = context.args[1] if len(context.args) > 1 else None
 
     with SessionLocal() as session:
-        tarea = session.get(TareaProgramada, tarea_id)
-        if not tarea:
+        avisos = cargar_avisos(session, tarea_id, tarea_id, carrier_nombre)
+        if not avisos:
             await responder_registrando(
                 mensaje,
                 user_id,
@@ -52,25 +45,8 @@ async def reenviar_aviso(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 "tareas",
             )
             return
-
-        rels = (
-            session.query(TareaServicio)
-            .filter(TareaServicio.tarea_id == tarea.id)
-            .all()
-        )
-        servicios = [session.get(Servicio, r.servicio_id) for r in rels]
-
-        cliente = None
-        for s in servicios:
-            if not s:
-                continue
-            if s.cliente_id:
-                cli = session.get(Cliente, s.cliente_id)
-            else:
-                cli = obtener_cliente_por_nombre(s.cliente)
-            if cli:
-                cliente = cli
-                break
+        aviso = avisos[0]
+        tarea, cliente, carrier = aviso.tarea, aviso.cliente, aviso.carrier
         if not cliente:
             await responder_registrando(
                 mensaje,
@@ -81,28 +57,17 @@ async def reenviar_aviso(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
             return
 
-        carrier = None
-        if carrier_nombre:
-            carrier = (
-                session.query(Carrier).filter(Carrier.nombre == carrier_nombre).first()
-            )
-        elif tarea.carrier_id:
-            carrier = session.get(Carrier, tarea.carrier_id)
-        if not carrier:
-            ids = {s.carrier_id for s in servicios if s and s.carrier_id}
-            if len(ids) == 1:
-                carrier = session.get(Carrier, ids.pop())
-
         nombre_arch = f"tarea_{tarea.id}.msg"
         ruta_path = Path(tempfile.gettempdir()) / nombre_arch
         _, cuerpo = generar_archivo_msg(
             tarea,
             cliente,
-            [s for s in servicios if s],
+            aviso.servicios,
             str(ruta_path),
             carrier,
         )
-        enviar_correo(
+        # Sin clave de idempotencia: el reenvío lo pide el usuario a propósito
+        encolar_correo(
             f"Aviso de tarea programada - {cliente.nombre}",
             cuerpo,
             cliente.id,
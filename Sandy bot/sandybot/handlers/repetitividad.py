@@ -6,10 +6,10 @@ Handler para la generación de informes de repetitividad.
 """
 from telegram import Update
 from telegram.ext import ContextTypes
+import io
 import os
 import tempfile
 import pandas as pd
-from docx import Document
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.shared import Inches
 from docx.oxml import OxmlElement
@@ -33,7 +33,9 @@ from sandybot.config import config
 from ..utils import obtener_mensaje
 from .estado import UserState
 from ..registrador import responder_registrando, registrar_conversacion
-from ..geo_utils import extraer_coordenada, generar_mapa_puntos
+from ..geo_utils import extraer_coordenada, renderizar_mapas
+from ..plantillas import cargar_plantilla
+from ..excel_utils import leer_excel
 
 # Ruta a la plantilla Word definida en la configuración global
 # Permite modificar la ubicación mediante la variable de entorno "PLANTILLA_PATH"
@@ -201,12 +203,6 @@ def generar_informe_y_modificar(ruta_excel):
         except locale.Error:
             continue
 
-    try:
-        casos_df = pd.read_excel(ruta_excel)
-    except Exception as exc:
-        logger.error("Error leyendo el Excel %s: %s", ruta_excel, exc)
-        raise ValueError("⚠️ No se pudo leer el Excel. Verificá el archivo.") from exc
-
     columnas_a_conservar_casos = [
         'Número Reclamo',
         'Número Línea',
@@ -220,6 +216,13 @@ def generar_informe_y_modificar(ruta_excel):
         'Descripción Solución Reclamo',
     ]
 
+    try:
+        # Solo se cargan las columnas necesarias para el informe
+        casos_df = leer_excel(ruta_excel, columnas_a_conservar_casos)
+    except Exception as exc:
+        logger.error("Error leyendo el Excel %s: %s", ruta_excel, exc)
+        raise ValueError("⚠️ No se pudo leer el Excel. Verificá el archivo.") from exc
+
     faltantes = set(columnas_a_conservar_casos) - set(casos_df.columns)
     if faltantes:
         logger.error("Faltan columnas requeridas: %s", ", ".join(faltantes))
@@ -257,7 +260,10 @@ def generar_informe_y_modificar(ruta_excel):
             f"⚠️ No se encontró la plantilla en {RUTA_PLANTILLA}. \
 Configurá la variable PLANTILLA_PATH."
         )
-    doc = Document(RUTA_PLANTILLA)
+    # Copia en memoria de la plantilla ya parseada (se relee solo si cambió)
+    doc, _ = cargar_plantilla(RUTA_PLANTILLA)
+    # Tablas con coordenadas cuyo mapa se genera al final: (tabla, puntos, filas)
+    mapas_pendientes = []
 
     for numero_linea, grupo in casos_filtrados.groupby('Número Línea'):
         nombre_cliente = grupo['Nombre Cliente'].iloc[0]
@@ -315,15 +321,17 @@ Configurá la variable PLANTILLA_PATH."
                 indices_mapa.append(idx)
 
         if coordenadas:
-            imagen = os.path.join(tempfile.gettempdir(), f"mapa_linea_{numero_linea}.png")
-
-            generar_mapa_puntos(coordenadas, indices_mapa, imagen)
-            parrafo_mapa = _insertar_parrafo_despues(tabla)
-            run = parrafo_mapa.add_run()
-            run.add_picture(imagen, width=Inches(5))
-            parrafo_mapa.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            os.remove(imagen)
-
+            # El mapa se dibuja más abajo, todos juntos en paralelo
+            mapas_pendientes.append((tabla, coordenadas, indices_mapa))
+
+    # Render de mapas en procesos separados; los PNG vuelven en memoria y
+    # en el mismo orden, por lo que cada uno se ubica tras su tabla
+    imagenes = renderizar_mapas([(c, i) for _, c, i in mapas_pendientes])
+    for (tabla, _, _), png in zip(mapas_pendientes, imagenes):
+        parrafo_mapa = _insertar_parrafo_despues(tabla)
+        run = parrafo_mapa.add_run()
+        run.add_picture(io.BytesIO(png), width=Inches(5))
+        parrafo_mapa.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     nombre_archivo = f"InformeRepetitividad{fecha_cierre.strftime('%m%y')}.docx"
     ruta_docx_generado = os.path.join(tempfile.gettempdir(), nombre_archivo)
@@ -17,6 +17,8 @@ from ..database import (
     obtener_ingresos,
     obtener_tareas_programadas,
     obtener_tareas_servicio,
+    obtener_correos_fallidos,
+    reintentar_correo,
     depurar_servicios_duplicados,
     depurar_reclamos_duplicados,
 )
@@ -60,6 +62,7 @@ async def supermenu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         "/CDB_Ingresos",
         "/CDB_Tareas",
         "/CDB_TareasServicio",
+        "/CDB_CorreosFallidos",
     ]]
     markup = ReplyKeyboardMarkup(botones, resize_keyboard=True)
     await responder_registrando(
@@ -292,3 +295,65 @@ async def listar_tareas_servicio(update: Update, context: ContextTypes.DEFAULT_T
         texto,
         "supermenu",
     )
+
+
+async def listar_correos_fallidos(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Muestra los correos que agotaron los reintentos de envío."""
+    mensaje = obtener_mensaje(update)
+    if not mensaje:
+        return
+    user_id = update.effective_user.id
+    correos = obtener_correos_fallidos(desc=True)
+    if not correos:
+        texto = "No hay correos fallidos."
+    else:
+        texto = "Correos fallidos:\n" + "\n".join(
+            f"{i + 1}. #{c.id} {c.asunto} → {', '.join(c.destinatarios)} ({c.ultimo_error})"
+            for i, c in enumerate(correos)
+        )
+        texto += "\n\nPara reintentar: /Reintentar_Correo <id> [id...]"
+    await responder_registrando(
+        mensaje,
+        user_id,
+        mensaje.text or "CDB_CorreosFallidos",
+        texto,
+        "supermenu",
+    )
+
+
+async def reintentar_correos_fallidos(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Vuelve a poner en la bandeja de salida los correos fallidos indicados."""
+    mensaje = obtener_mensaje(update)
+    if not mensaje:
+        return
+    user_id = update.effective_user.id
+    ids = [int(a.lstrip("#")) for a in context.args or [] if a.lstrip("#").isdigit()]
+    if not ids:
+        texto = "Usá: /Reintentar_Correo <id> [id...] (ver /CDB_CorreosFallidos)"
+    else:
+        reencolados = [i for i in ids if reintentar_correo(i)]
+        omitidos = [i for i in ids if i not in reencolados]
+        if reencolados:
+            from ..outbox import despertar_trabajador
+
+            despertar_trabajador()
+        lineas = []
+        if reencolados:
+            lineas.append(
+                "Reencolados: " + ", ".join(f"#{i}" for i in reencolados)
+            )
+        if omitidos:
+            lineas.append(
+                "No existen o no están fallidos: "
+                + ", ".join(f"#{i}" for i in omitidos)
+            )
+        texto = "\n".join(lineas)
+    await responder_registrando(
+        mensaje,
+        user_id,
+        mensaje.text or "Reintentar_Correo",
+        texto,
+        "supermenu",
+    )
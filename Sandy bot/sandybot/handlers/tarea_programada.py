@@ -17,7 +17,7 @@ from ..database import (
     crear_tarea_programada,
     obtener_cliente_por_nombre,
 )
-from ..email_utils import enviar_correo, generar_archivo_msg
+from ..email_utils import encolar_correo, generar_archivo_msg
 from ..registrador import responder_registrando
 from ..utils import obtener_mensaje
 
@@ -84,7 +84,10 @@ async def registrar_tarea_programada(
             ids,
             carrier_id=carrier.id if carrier else None,
         )
-        servicios = [session.get(Servicio, i) for i in ids]
+        por_id = {
+            s.id: s for s in session.query(Servicio).filter(Servicio.id.in_(ids))
+        }
+        servicios = [por_id.get(i) for i in ids]
         if carrier:
             for s in servicios:
                 if s:
@@ -102,11 +105,12 @@ async def registrar_tarea_programada(
             carrier,
         )
 
-        enviar_correo(
+        encolar_correo(
             f"Aviso de tarea programada - {cliente.nombre}",
             cuerpo,
             cliente.id,
             carrier.nombre if carrier else None,
+            clave=f"aviso-tarea-{tarea.id}",
         )
 
         if ruta_path.exists():
@@ -0,0 +1,234 @@
+# Nombre de archivo: lector_msg.py
+# Ubicación de archivo: Sandy bot/sandybot/lector_msg.py
+# User-provided custom instructions
+"""Lectura de correos ``.msg`` de Outlook y conversión de su HTML a texto.
+
+Parsear un ``.msg`` (formato OLE) es trabajo de CPU puro y ``extract_msg``
+tarda en importarse, así que cuando llegan varios correos se leen en un pool
+de procesos persistente. Cada proceso importa ``extract_msg`` y el parser de
+HTML una sola vez, al arrancar, y los reutiliza en todos los archivos.
+
+Para pasar el cuerpo HTML a texto se usa el parser más rápido disponible:
+``selectolax`` → ``lxml`` → ``BeautifulSoup`` con ``html.parser``. Los tres
+devuelven los fragmentos de texto separados por saltos de línea.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import importlib.util
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Con menos archivos no compensa repartirlos entre procesos
+MIN_PARA_POOL = 3
+
+if importlib.util.find_spec("selectolax"):  # pragma: no cover - opcional
+    MOTOR_HTML = "selectolax"
+elif importlib.util.find_spec("lxml"):
+    MOTOR_HTML = "lxml"
+else:  # pragma: no cover - depende de la instalación
+    MOTOR_HTML = "html.parser"
+
+# Etiquetas cuyo contenido no es texto del correo
+_SIN_TEXTO = ("script", "style")
+
+# Archivos que, si no son un MSG, se leen como texto plano
+_SUFIJOS_TEXTO = (".txt", ".eml", ".html", ".htm")
+# Firmas de OLE (MSG dañado), PDF y ZIP: nunca se leen como texto
+_FIRMAS_BINARIAS = (b"\xd0\xcf\x11\xe0", b"%PDF", b"PK\x03\x04")
+
+
+def _texto_selectolax(html: str) -> str:  # pragma: no cover - opcional
+    from selectolax.parser import HTMLParser
+
+    arbol = HTMLParser(html)
+    arbol.strip_tags(list(_SIN_TEXTO))
+    raiz = arbol.body or arbol.root
+    return raiz.text(separator="\n") if raiz else ""
+
+
+def _texto_lxml(html: str) -> str:
+    import lxml.html
+
+    doc = lxml.html.fromstring(html)
+    for elemento in list(doc.iter(*_SIN_TEXTO)):
+        elemento.drop_tree()
+    return "\n".join(doc.itertext())
+
+
+def _texto_bs4(html: str) -> str:
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser").get_text("\n")
+
+
+def html_a_texto(html: str) -> str:
+    """Texto visible de ``html``, un fragmento por línea.
+
+    Si el parser rápido no puede con el documento se recurre a
+    BeautifulSoup; si tampoco está instalado se devuelve el HTML crudo.
+    """
+    if MOTOR_HTML == "selectolax":
+        convertidores = (_texto_selectolax, _texto_bs4)
+    elif MOTOR_HTML == "lxml":
+        convertidores = (_texto_lxml, _texto_bs4)
+    else:
+        convertidores = (_texto_bs4,)
+    for convertir in convertidores:
+        try:
+            return convertir(html)
+        except ModuleNotFoundError:
+            logger.warning("beautifulsoup4 no instalado; continúo con HTML crudo")
+        except Exception as exc:
+            logger.debug("%s no pudo convertir el HTML: %s", convertir.__name__, exc)
+    return html
+
+
+def _a_texto(valor) -> str:
+    if isinstance(valor, bytes):
+        try:
+            return valor.decode()
+        except Exception:
+            return valor.decode("latin-1", "ignore")
+    return valor or ""
+
+
+def _es_texto(ruta: str) -> bool:
+    """``True`` si ``ruta`` tiene sufijo de texto o lo parece por su contenido.
+
+    Los adjuntos de Telegram se guardan sin extensión, así que además se miran
+    los primeros bytes: sin firmas binarias conocidas ni bytes nulos.
+    """
+    if Path(ruta).suffix.lower() in _SUFIJOS_TEXTO:
+        return True
+    try:
+        with open(ruta, "rb") as fh:
+            inicio = fh.read(1024)
+    except OSError:
+        return False
+    return bool(inicio) and not (
+        inicio.startswith(_FIRMAS_BINARIAS) or b"\0" in inicio
+    )
+
+
+def leer_msg(ruta: str) -> str:
+    """Devuelve «asunto + cuerpo» del archivo MSG, o '' si falla.
+
+    Si ``extract_msg`` no está instalado se registra el error y se retorna una
+    cadena vacía. Si el archivo no es un ``.msg`` válido pero es texto (un
+    ``.txt``, ``.eml`` o ``.html`` con el aviso pegado) se usa su contenido
+    como texto plano; un MSG dañado, un PDF o cualquier otro binario devuelve
+    ``''`` para no mandarle basura a GPT.
+    """
+    try:
+        import extract_msg
+    except ModuleNotFoundError as exc:
+        logger.error("No se encontró la librería 'extract-msg': %s", exc)
+        return ""
+
+    msg = None
+    texto = ""
+    try:
+        msg = extract_msg.Message(ruta)
+        asunto = _a_texto(msg.subject)
+        remitente = getattr(msg, "sender", None) or getattr(msg, "sender_email", None)
+        remitente_nom = getattr(msg, "sender_name", None)
+
+        # Se usa .body y, si está vacío, htmlBody o rtfBody
+        cuerpo = _a_texto(
+            msg.body or getattr(msg, "htmlBody", "") or getattr(msg, "rtfBody", "")
+        )
+        if "<html" in cuerpo.lower():
+            cuerpo = html_a_texto(cuerpo)
+        cuerpo = cuerpo.strip()
+
+        encabezado = []
+        if remitente:
+            encabezado.append(f"From: {remitente}")
+        if remitente_nom:
+            encabezado.append(f"Name: {remitente_nom}")
+        texto = "\n".join(encabezado + [asunto, cuerpo]).strip()
+    except Exception as exc:
+        if not _es_texto(ruta):
+            logger.error("Error leyendo MSG %s: %s", ruta, exc)
+            return ""
+        logger.info("%s no es un MSG legible (%s); se lee como texto", ruta, exc)
+    finally:
+        if msg is not None and hasattr(msg, "close"):
+            try:
+                msg.close()
+            except Exception:  # pragma: no cover - error inusual
+                pass
+
+    if not texto and _es_texto(ruta):
+        try:
+            texto = Path(ruta).read_text(encoding="utf-8", errors="ignore")
+        except Exception as err:  # pragma: no cover - error inusual
+            logger.error("Error leyendo texto plano de %s: %s", ruta, err)
+            return ""
+        if "<html" in texto.lower():
+            texto = html_a_texto(texto)
+        texto = texto.strip()
+    return texto
+
+
+# ───────────────────────── POOL DE PROCESOS ─────────────────────────
+def _precargar() -> None:
+    """Inicializador de cada proceso: importa las librerías una sola vez."""
+    for modulo in ("extract_msg", MOTOR_HTML if MOTOR_HTML != "html.parser" else "bs4"):
+        try:
+            __import__(modulo)
+        except Exception:  # pragma: no cover - se informa al leer
+            pass
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool(procesos: int) -> ProcessPoolExecutor:
+    """Pool compartido de lectores, creado bajo demanda."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, procesos),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_precargar,
+            )
+            atexit.register(cerrar_pool)
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Detiene el pool compartido (se registra con ``atexit``)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def leer_msg_async(ruta: str, procesos: int = 0) -> str:
+    """Lee ``ruta`` sin bloquear el loop.
+
+    Con ``procesos > 0`` se usa el pool de procesos; si no, o si el pool se
+    rompió, se lee en un hilo del proceso actual.
+    """
+    if procesos > 0:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(obtener_pool(procesos), leer_msg, ruta)
+        except BrokenProcessPool as exc:
+            logger.warning("Pool de lectura de MSG caído (%s); se lee en el proceso", exc)
+            cerrar_pool()
+    return await asyncio.to_thread(leer_msg, ruta)
@@ -0,0 +1,351 @@
+# Nombre de archivo: outbox.py
+# Ubicación de archivo: Sandy bot/sandybot/outbox.py
+# User-provided custom instructions
+"""Bandeja de salida persistente para los correos del bot.
+
+Los handlers no hablan con el servidor SMTP: guardan el correo en la tabla
+``correos_salientes`` con :func:`encolar` y siguen. Un trabajador asíncrono
+(:class:`TrabajadorCorreos`) revisa la tabla cada ``OUTBOX_INTERVALO`` segundos,
+o apenas se encola algo, y envía los pendientes en un hilo aparte usando el
+pool SMTP.
+
+- Si un envío falla se reintenta con espera exponencial
+  (``OUTBOX_BACKOFF_BASE`` · 2ⁿ, hasta ``OUTBOX_BACKOFF_MAX``).
+- Tras ``OUTBOX_MAX_INTENTOS`` el correo queda ``fallido``; esos correos se
+  listan con :func:`~sandybot.database.obtener_correos_fallidos` y pueden
+  volver a la cola con :func:`~sandybot.database.reintentar_correo`.
+- La ``clave`` de idempotencia evita encolar dos veces el mismo aviso. Si el
+  correo con esa clave había quedado ``fallido``, volver a encolarlo lo
+  devuelve a la cola en lugar de ignorarlo.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import smtplib
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from .config import config
+from .database import CorreoSaliente, SessionLocal
+from .smtp_pool import obtener_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _clave(clave: str, destinatarios: Sequence[str], asunto: str, cuerpo: str, adjunto) -> str:
+    """Combina la clave del llamador con un resumen del contenido."""
+    resumen = hashlib.sha256(
+        json.dumps([sorted(destinatarios), asunto, cuerpo], ensure_ascii=False).encode()
+    )
+    if adjunto:
+        resumen.update(adjunto)
+    return f"{clave}:{resumen.hexdigest()[:16]}"
+
+
+def _rearmar(correo: CorreoSaliente) -> bool:
+    """Devuelve a la cola un correo ``fallido``. ``True`` si hubo cambio."""
+    if correo.estado != "fallido":
+        return False
+    correo.estado = "pendiente"
+    correo.intentos = 0
+    correo.proximo_intento = datetime.utcnow()
+    correo.ultimo_error = None
+    logger.info("Correo %s fallido vuelve a la bandeja de salida", correo.id)
+    return True
+
+
+def encolar(
+    destinatarios: Sequence[str],
+    asunto: str,
+    cuerpo: str,
+    *,
+    adjunto: str | Path | None = None,
+    nombre_adjunto: str | None = None,
+    tipo_adjunto: str = "application/octet-stream",
+    clave: str | None = None,
+) -> Optional[int]:
+    """Guarda un correo en la bandeja de salida y devuelve su ID.
+
+    El adjunto se lee en el momento, así el llamador puede borrar el archivo
+    enseguida. Si se indica ``clave`` (por ejemplo ``"aviso-tarea-15"``) y ya
+    existe un correo con esa clave y el mismo contenido, no se duplica y se
+    devuelve el ID existente; si ese correo estaba ``fallido`` vuelve a quedar
+    pendiente con los intentos en cero. Devuelve ``None`` si no se pudo
+    encolar.
+    """
+    destinatarios = list(destinatarios)
+    if not destinatarios:
+        return None
+    datos = None
+    if adjunto is not None:
+        try:
+            datos = Path(adjunto).read_bytes()
+        except OSError as e:
+            logger.error("No se pudo adjuntar %s: %s", adjunto, e)
+            return None
+        nombre_adjunto = nombre_adjunto or Path(adjunto).name
+
+    clave_final = (
+        _clave(clave, destinatarios, asunto, cuerpo, datos)
+        if clave
+        else uuid.uuid4().hex
+    )
+    correo = CorreoSaliente(
+        clave=clave_final,
+        destinatarios=destinatarios,
+        asunto=asunto,
+        cuerpo=cuerpo,
+        nombre_adjunto=nombre_adjunto,
+        tipo_adjunto=tipo_adjunto if datos is not None else None,
+        adjunto=datos,
+    )
+    try:
+        with SessionLocal() as session:
+            session.add(correo)
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                existente = (
+                    session.query(CorreoSaliente)
+                    .filter(CorreoSaliente.clave == clave_final)
+                    .one_or_none()
+                )
+                if existente is None:
+                    return None
+                logger.info("Correo %s ya estaba en la bandeja de salida", clave_final)
+                if not _rearmar(existente):
+                    return existente.id
+                session.commit()
+                correo = existente
+            id_correo = correo.id
+    except SQLAlchemyError as e:
+        logger.error("No se pudo encolar el correo: %s", e)
+        return None
+    despertar_trabajador()
+    return id_correo
+
+
+def encolar_lote(
+    correos: Sequence[tuple[Sequence[str], str, str, str | None]],
+) -> list[Optional[int]]:
+    """Guarda varios correos ``(destinatarios, asunto, cuerpo, clave)`` de una vez.
+
+    Equivale a llamar a :func:`encolar` por cada uno (sin adjuntos) pero con
+    una sola consulta para las claves ya existentes y un único ``commit``. El
+    trabajador los envía luego reutilizando la misma sesión SMTP del pool.
+    Las claves que ya estaban ``fallido`` vuelven a la cola, como en
+    :func:`encolar`. Devuelve los IDs en el mismo orden; ``None`` para los que
+    no tienen destinatarios o si falló la base.
+    """
+    filas: list[Optional[CorreoSaliente]] = []
+    claves: list[Optional[str]] = []
+    for destinatarios, asunto, cuerpo, clave in correos:
+        destinatarios = list(destinatarios)
+        if not destinatarios:
+            filas.append(None)
+            claves.append(None)
+            continue
+        clave_final = (
+            _clave(clave, destinatarios, asunto, cuerpo, None) if clave else uuid.uuid4().hex
+        )
+        filas.append(
+            CorreoSaliente(
+                clave=clave_final, destinatarios=destinatarios, asunto=asunto, cuerpo=cuerpo
+            )
+        )
+        claves.append(clave_final)
+
+    try:
+        with SessionLocal() as session:
+            existentes = {
+                c.clave: c
+                for c in session.query(CorreoSaliente).filter(
+                    CorreoSaliente.clave.in_([c for c in claves if c])
+                )
+            }
+            rearmados = [c for c in existentes.values() if _rearmar(c)]
+            nuevas: dict[str, CorreoSaliente] = {}
+            for fila in filas:
+                if fila is not None and fila.clave not in existentes:
+                    nuevas.setdefault(fila.clave, fila)
+            session.add_all(nuevas.values())
+            session.commit()
+            ids = {c: f.id for c, f in {**existentes, **nuevas}.items()}
+    except SQLAlchemyError as e:
+        logger.error("No se pudo encolar el lote de correos: %s", e)
+        return [None] * len(filas)
+    if nuevas or rearmados:
+        despertar_trabajador()
+    return [ids.get(c) if c else None for c in claves]
+
+
+def _construir_mensaje(correo: CorreoSaliente) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = correo.asunto or ""
+    msg["From"] = config.EMAIL_FROM or config.SMTP_USER or ""
+    msg["To"] = ", ".join(correo.destinatarios)
+    msg.set_content(correo.cuerpo or "")
+    if correo.adjunto is not None:
+        maintype, _, subtype = (correo.tipo_adjunto or "application/octet-stream").partition("/")
+        msg.add_attachment(
+            correo.adjunto,
+            maintype=maintype,
+            subtype=subtype or "octet-stream",
+            filename=correo.nombre_adjunto,
+        )
+    return msg
+
+
+def _enviar_smtp(msg: EmailMessage) -> None:
+    """Envía ``msg`` con la sesión compartida del pool SMTP."""
+    port = config.SMTP_PORT
+    usar_ssl = port == 465
+    obtener_pool().enviar(
+        lambda smtp: smtp.send_message(msg),
+        smtplib.SMTP_SSL if usar_ssl else smtplib.SMTP,
+        config.SMTP_HOST,
+        port,
+        usuario=config.SMTP_USER,
+        clave=config.SMTP_PASSWORD,
+        starttls=not usar_ssl and config.SMTP_USE_TLS,
+    )
+
+
+def _espera(intentos: int) -> timedelta:
+    segundos = config.OUTBOX_BACKOFF_BASE * 2 ** max(0, intentos - 1)
+    return timedelta(seconds=min(segundos, config.OUTBOX_BACKOFF_MAX))
+
+
+def enviar_pendientes(
+    limite: int = 50, enviar: Callable[[EmailMessage], None] | None = None
+) -> int:
+    """Envía los correos pendientes cuyo próximo intento ya venció.
+
+    Es sincrónica: el trabajador la ejecuta en un hilo. Cada correo se
+    confirma por separado para no reenviarlo si el proceso se corta a mitad
+    del lote. Devuelve la cantidad de correos enviados.
+    """
+    enviar = enviar or _enviar_smtp
+    ahora = datetime.utcnow()
+    enviados = 0
+    with SessionLocal() as session:
+        pendientes = (
+            session.query(CorreoSaliente)
+            .filter(
+                CorreoSaliente.estado == "pendiente",
+                CorreoSaliente.proximo_intento <= ahora,
+            )
+            .order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id)
+            .limit(limite)
+            .all()
+        )
+        for correo in pendientes:
+            try:
+                enviar(_construir_mensaje(correo))
+            except Exception as e:
+                correo.intentos = (correo.intentos or 0) + 1
+                correo.ultimo_error = str(e)[:500]
+                if correo.intentos >= config.OUTBOX_MAX_INTENTOS:
+                    correo.estado = "fallido"
+                    logger.error(
+                        "Correo %s descartado tras %s intentos: %s",
+                        correo.id,
+                        correo.intentos,
+                        e,
+                    )
+                else:
+                    correo.proximo_intento = datetime.utcnow() + _espera(correo.intentos)
+                    logger.warning(
+                        "Fallo enviando correo %s (intento %s): %s",
+                        correo.id,
+                        correo.intentos,
+                        e,
+                    )
+            else:
+                correo.estado = "enviado"
+                correo.enviado = datetime.utcnow()
+                correo.ultimo_error = None
+                correo.adjunto = None  # ya no hace falta conservarlo
+                enviados += 1
+                logger.info("Correo enviado a %s", correo.destinatarios)
+            session.commit()
+    return enviados
+
+
+class TrabajadorCorreos:
+    """Tarea asíncrona que vacía la bandeja de salida en segundo plano."""
+
+    def __init__(self, intervalo: float | None = None) -> None:
+        self.intervalo = config.OUTBOX_INTERVALO if intervalo is None else intervalo
+        self._tarea: asyncio.Task | None = None
+        self._evento: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def _ciclo(self) -> None:
+        while True:
+            self._evento.clear()
+            try:
+                await asyncio.to_thread(enviar_pendientes)
+            except Exception as e:  # pragma: no cover - base o red caídas
+                logger.error("Error procesando la bandeja de salida: %s", e)
+            try:
+                await asyncio.wait_for(self._evento.wait(), self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+
+    def iniciar(self) -> None:
+        """Arranca el ciclo en el loop actual (debe llamarse desde una corrutina)."""
+        if self._tarea and not self._tarea.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._evento = asyncio.Event()
+        self._tarea = self._loop.create_task(self._ciclo())
+
+    def despertar(self) -> None:
+        """Pide revisar la bandeja ya mismo; se puede llamar desde cualquier hilo."""
+        if self._loop and self._evento and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._evento.set)
+
+    async def detener(self) -> None:
+        if self._tarea:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+
+_trabajador: TrabajadorCorreos | None = None
+
+
+async def iniciar_trabajador(_app=None) -> None:
+    """Arranca el trabajador compartido. Sirve como ``post_init`` del bot."""
+    global _trabajador
+    if _trabajador is None:
+        _trabajador = TrabajadorCorreos()
+    _trabajador.iniciar()
+
+
+async def detener_trabajador(_app=None) -> None:
+    """Detiene el trabajador compartido. Sirve como ``post_shutdown`` del bot."""
+    global _trabajador
+    if _trabajador is not None:
+        await _trabajador.detener()
+        _trabajador = None
+
+
+def despertar_trabajador() -> None:
+    """Avisa al trabajador que hay correos nuevos, si está corriendo."""
+    if _trabajador is not None:
+        _trabajador.despertar()
@@ -0,0 +1,96 @@
+# Nombre de archivo: plantillas.py
+# Ubicación de archivo: Sandy bot/sandybot/plantillas.py
+# User-provided custom instructions
+"""Cache en memoria de plantillas Word ya procesadas.
+
+Abrir un ``.docx`` implica descomprimirlo y parsear todo su XML. Como las
+plantillas de SLA y repetitividad cambian muy de vez en cuando, se guarda un
+"esqueleto" ya preparado por ruta y se entrega una copia profunda en cada
+informe. La entrada se invalida sola cuando cambia la fecha de modificación o
+el tamaño del archivo.
+"""
+
+from __future__ import annotations
+
+import copy
+import io
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from docx import Document
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PlantillaCacheada:
+    """Esqueleto parseado junto con los datos extraídos de la plantilla."""
+
+    firma: tuple[int, int]
+    documento: Any
+    extra: Any
+
+
+# Clave: (ruta absoluta, nombre del preparador)
+_cache: dict[tuple[str, str], _PlantillaCacheada] = {}
+_lock = threading.Lock()
+
+
+def _firma(ruta: Path) -> tuple[int, int]:
+    """Devuelve ``(mtime_ns, tamaño)`` para detectar cambios en disco."""
+    st = ruta.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def cargar_plantilla(
+    ruta: str | Path,
+    preparar: Callable[[Any], Any] | None = None,
+) -> tuple[Any, Any]:
+    """Devuelve una copia del esqueleto de ``ruta`` y sus datos extraídos.
+
+    ``preparar`` recibe el ``Document`` recién abierto, puede modificarlo
+    (por ejemplo quitando tablas de ejemplo) y devolver cualquier dato que
+    convenga reutilizar. Solo se ejecuta cuando la plantilla no está en cache
+    o cambió en disco. El segundo elemento retornado es ese mismo dato, por
+    lo que quien lo use no debe modificarlo.
+    """
+    ruta = Path(ruta).resolve()
+    clave = (str(ruta), getattr(preparar, "__qualname__", "") if preparar else "")
+    firma = _firma(ruta)
+
+    with _lock:
+        entrada = _cache.get(clave)
+        if entrada is None or entrada.firma != firma:
+            logger.debug("Parseando plantilla %s", ruta)
+            documento = Document(str(ruta))
+            extra = None
+            if preparar:
+                extra = preparar(documento)
+                # Los objetos auxiliares que python-docx guarda tras
+                # recorrer el documento (cuerpo, tablas) apuntan a nodos
+                # internos que ``deepcopy`` no preserva. Se serializa el
+                # esqueleto y se vuelve a abrir para cachear un documento
+                # "limpio" que solo referencia las raíces del XML.
+                buffer = io.BytesIO()
+                documento.save(buffer)
+                buffer.seek(0)
+                documento = Document(buffer)
+            entrada = _PlantillaCacheada(firma, documento, extra)
+            _cache[clave] = entrada
+        # La copia profunda genera un paquete independiente, mucho más
+        # barato que volver a descomprimir y parsear el archivo
+        return copy.deepcopy(entrada.documento), entrada.extra
+
+
+def invalidar_plantilla(ruta: str | Path | None = None) -> None:
+    """Descarta la cache de ``ruta`` o de todas las plantillas si es ``None``."""
+    with _lock:
+        if ruta is None:
+            _cache.clear()
+            return
+        destino = str(Path(ruta).resolve())
+        for clave in [c for c in _cache if c[0] == destino]:
+            del _cache[clave]
@@ -48,8 +48,12 @@ async def responder_registrando(
     registrar_conversacion(user_id, texto_usuario, texto_respuesta, modo)
 
 
-def registrar_envio_email(user_id: int, destinatarios: list[str], archivo: str) -> None:
-    """Registra en la base que se envió un correo con un adjunto."""
+def registrar_email_encolado(user_id: int, destinatarios: list[str], archivo: str) -> None:
+    """Registra en la base que un correo con adjunto quedó en la bandeja de salida.
+
+    El envío real lo hace luego el trabajador del outbox; si falla, el correo
+    aparece en ``/CDB_CorreosFallidos``.
+    """
     mensaje = f"Email a {', '.join(destinatarios)}"
-    respuesta = f"Archivo {archivo} enviado por email"
+    respuesta = f"Archivo {archivo} encolado para enviar por email"
     registrar_conversacion(user_id, mensaje, respuesta, "email")
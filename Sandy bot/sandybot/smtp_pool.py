@@ -0,0 +1,217 @@
+# Nombre de archivo: smtp_pool.py
+# Ubicación de archivo: Sandy bot/sandybot/smtp_pool.py
+# User-provided custom instructions
+"""Pool de conexiones SMTP persistentes.
+
+Abrir una sesión SMTP implica conexión TCP, TLS y ``login``; hacerlo por cada
+correo suma fácilmente un segundo por envío. Acá las conexiones se reutilizan:
+
+- Al devolverla al pool la conexión queda abierta para el siguiente envío.
+- Si estuvo inactiva más de ``SMTP_KEEPALIVE`` segundos se verifica con
+  ``NOOP`` antes de usarla; si pasó ``SMTP_IDLE_MAX`` se descarta directamente
+  porque la mayoría de los servidores ya la habrán cerrado.
+- Si el servidor corta la sesión durante el envío se reconecta y se reintenta
+  una vez.
+
+La clase de conexión (``smtplib.SMTP`` o ``smtplib.SMTP_SSL``) y el uso de
+``starttls`` los decide quien envía y forman parte de la clave, de modo que
+cada combinación de servidor, usuario y cifrado tiene sus propias conexiones.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import smtplib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _es_corte(error: Exception) -> bool:
+    """Indica si ``error`` significa que la sesión se cortó y conviene reconectar.
+
+    ``SMTPException`` hereda de ``OSError``, por eso se filtran aparte: un
+    destinatario rechazado no se arregla reconectando.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 421: el servidor avisa que cierra la sesión
+        return error.smtp_code == 421
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+class _Conexion:
+    """Sesión SMTP abierta junto con su momento de último uso."""
+
+    __slots__ = ("smtp", "ultimo_uso", "debug")
+
+    def __init__(self, smtp) -> None:
+        self.smtp = smtp
+        self.ultimo_uso = time.monotonic()
+        self.debug = False
+
+    def cerrar(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class PoolSMTP:
+    """Conexiones SMTP reutilizables, agrupadas por servidor y usuario."""
+
+    def __init__(
+        self,
+        max_conexiones: int = 2,
+        keepalive: float = 30.0,
+        inactividad_max: float = 240.0,
+    ) -> None:
+        self.max_conexiones = max(1, max_conexiones)
+        self.keepalive = keepalive
+        self.inactividad_max = inactividad_max
+        self._libres: Dict[Tuple, List[_Conexion]] = {}
+        self._lock = threading.Lock()
+        # Sesiones abiertas en total; útil para diagnóstico y pruebas
+        self.conexiones_abiertas = 0
+
+    # ───────────────────────── Conexiones ─────────────────────────
+    def _abrir(
+        self,
+        fabrica: Callable,
+        host: str,
+        port: int,
+        usuario: Optional[str],
+        clave: Optional[str],
+        starttls: bool,
+    ) -> _Conexion:
+        smtp = fabrica(host, port)
+        try:
+            if starttls:
+                smtp.starttls()
+            if usuario and clave:
+                smtp.login(usuario, clave)
+        except Exception:
+            _Conexion(smtp).cerrar()
+            raise
+        with self._lock:
+            self.conexiones_abiertas += 1
+        return _Conexion(smtp)
+
+    def _viva(self, conexion: _Conexion) -> bool:
+        """Indica si una conexión libre puede reutilizarse."""
+        inactiva = time.monotonic() - conexion.ultimo_uso
+        if inactiva > self.inactividad_max:
+            return False
+        if inactiva <= self.keepalive:
+            return True
+        try:
+            codigo = conexion.smtp.noop()[0]
+        except Exception:
+            return False
+        return codigo == 250
+
+    def _tomar(self, clave: Tuple) -> Optional[_Conexion]:
+        while True:
+            with self._lock:
+                libres = self._libres.get(clave)
+                if not libres:
+                    return None
+                conexion = libres.pop()
+            if self._viva(conexion):
+                return conexion
+            logger.debug("Conexión SMTP vencida con %s:%s; se descarta", clave[1], clave[2])
+            conexion.cerrar()
+
+    def _devolver(self, clave: Tuple, conexion: _Conexion) -> None:
+        conexion.ultimo_uso = time.monotonic()
+        with self._lock:
+            libres = self._libres.setdefault(clave, [])
+            if len(libres) < self.max_conexiones:
+                libres.append(conexion)
+                return
+        conexion.cerrar()
+
+    # ─────────────────────────── Envío ───────────────────────────
+    def enviar(
+        self,
+        accion: Callable[[Any], Any],
+        fabrica: Callable,
+        host: str,
+        port: int,
+        *,
+        usuario: Optional[str] = None,
+        clave: Optional[str] = None,
+        starttls: bool = False,
+        debug: bool = False,
+    ) -> Any:
+        """Ejecuta ``accion(smtp)`` con una conexión del pool.
+
+        ``accion`` recibe la sesión SMTP ya autenticada y normalmente llama a
+        ``send_message`` o ``sendmail``. Si la conexión se cortó se abre otra
+        y se reintenta una vez; cualquier otro error se propaga.
+        """
+        # ``starttls`` forma parte de la clave: una sesión abierta sin TLS no
+        # debe reutilizarse para un envío que lo pide
+        clave_pool = (fabrica, host, port, usuario, starttls)
+        for intento in range(2):
+            conexion = self._tomar(clave_pool)
+            if conexion is None:
+                conexion = self._abrir(fabrica, host, port, usuario, clave, starttls)
+            if debug != conexion.debug:
+                conexion.smtp.set_debuglevel(1 if debug else 0)
+                conexion.debug = debug
+            try:
+                resultado = accion(conexion.smtp)
+            except Exception as e:
+                # El estado de la sesión es incierto: no se reutiliza
+                conexion.cerrar()
+                if intento or not _es_corte(e):
+                    raise
+                logger.info("Se perdió la conexión SMTP (%s); se reconecta", e)
+                continue
+            self._devolver(clave_pool, conexion)
+            return resultado
+
+    def cerrar(self) -> None:
+        """Cierra todas las conexiones libres."""
+        with self._lock:
+            conexiones = [c for libres in self._libres.values() for c in libres]
+            self._libres.clear()
+        for conexion in conexiones:
+            conexion.cerrar()
+
+
+_pool: Optional[PoolSMTP] = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool() -> PoolSMTP:
+    """Pool compartido, creado bajo demanda con la configuración actual."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PoolSMTP(
+                config.SMTP_POOL_SIZE, config.SMTP_KEEPALIVE, config.SMTP_IDLE_MAX
+            )
+            atexit.register(cerrar_pool)
+        return _pool
+
+
+def cerrar_pool() -> None:
+    """Cierra las conexiones del pool compartido (se registra con ``atexit``)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.cerrar()
+            _pool = None
@@ -0,0 +1,313 @@
+# Nombre de archivo: teselas.py
+# Ubicación de archivo: Sandy bot/sandybot/teselas.py
+# User-provided custom instructions
+"""Cache local de teselas para los mapas de repetitividad.
+
+Las teselas se guardan en disco con la estructura ``z/x/y.png`` dentro de
+``config.TILES_DIR``. Cada lectura actualiza la fecha de modificación del
+archivo y, cuando el directorio supera ``config.TILES_MAX_MB``, se borran las
+teselas menos usadas (LRU). Con ``config.TILES_OFFLINE`` activo nunca se accede
+a la red: las teselas faltantes se rellenan con gris claro, por lo que los
+mapas se generan igual en equipos sin internet.
+
+Los mapas eligen el zoom según la extensión dibujada (:func:`calcular_zoom`):
+alrededor de 11 para líneas repartidas por todo el AMBA, 13 o 14 para un
+barrio y hasta 17 para una sola cámara (ventana mínima de 1 km). Las teselas
+que no estén en disco se descargan a medida que se usan.
+
+La precarga descarga en bloque, algo que la política de uso de
+tile.openstreetmap.org prohíbe, así que solo se permite contra un servidor
+propio o contratado configurado en ``TILES_URL``. Por defecto llega hasta el
+zoom 13 (unas mil teselas para el AMBA; cada nivel más multiplica por cuatro):
+
+    TILES_URL=https://mi-servidor/{z}/{x}/{y}.png python -m sandybot.teselas
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import math
+import os
+import threading
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Semiperímetro de la Tierra en Web Mercator (EPSG:3857)
+ORIGEN_MERCATOR = 20037508.342789244
+TAM_TESELA = 256
+# Área Metropolitana de Buenos Aires: (oeste, sur, este, norte) en grados
+AMBA_BBOX = (-59.1, -35.1, -57.8, -34.2)
+# Zoom máximo que se precarga si no se indica otro
+ZOOM_MAX_PRECARGA = 13
+# Servidores cuya política de uso prohíbe la descarga masiva
+_SERVIDORES_SIN_PRECARGA = ("openstreetmap.org",)
+# Color usado cuando falta una tesela en modo sin conexión
+_GRIS = (0.9, 0.9, 0.9, 1.0)
+# Teselas decodificadas que se conservan en memoria por proceso (~256 KB c/u)
+_MAX_DECODIFICADAS = 256
+
+
+# ──────────────────────────── MATEMÁTICA ─────────────────────────────
+def lonlat_a_tesela(lon: float, lat: float, zoom: int) -> tuple[int, int]:
+    """Devuelve la tesela ``(x, y)`` que contiene la coordenada."""
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _mercator_a_lonlat(x: float, y: float) -> tuple[float, float]:
+    lon = x / ORIGEN_MERCATOR * 180.0
+    lat = math.degrees(math.atan(math.sinh(y / ORIGEN_MERCATOR * math.pi)))
+    return lon, lat
+
+
+def calcular_zoom(oeste: float, sur: float, este: float, norte: float) -> int:
+    """Zoom automático para una extensión en grados (mismo criterio que contextily)."""
+    ancho = max(este - oeste, 1e-9)
+    alto = max(norte - sur, 1e-9)
+    zoom_lon = math.ceil(math.log2(360 * 2.0 / ancho))
+    zoom_lat = math.ceil(math.log2(360 * 2.0 / alto))
+    return int(min(max(zoom_lon, zoom_lat), 19))
+
+
+def _decodificar_png(datos: bytes) -> np.ndarray:
+    """Convierte los bytes PNG en una matriz RGBA ``float32`` de 0 a 1."""
+    import matplotlib.image as mpimg
+
+    tesela = mpimg.imread(io.BytesIO(datos), format="png")
+    if tesela.dtype != np.float32:
+        tesela = tesela.astype(np.float32) / 255.0
+    if tesela.shape[2] == 3:
+        alfa = np.ones(tesela.shape[:2] + (1,), dtype=np.float32)
+        tesela = np.concatenate([tesela, alfa], axis=2)
+    return tesela[:TAM_TESELA, :TAM_TESELA]
+
+
+# ───────────────────────────── CACHE ─────────────────────────────────
+class CacheTeselas:
+    """Directorio ``z/x/y.png`` con desalojo LRU y modo sin conexión."""
+
+    def __init__(
+        self,
+        directorio: str | Path,
+        url: str,
+        max_bytes: int,
+        offline: bool = False,
+    ) -> None:
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.url = url
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+        # Teselas ya decodificadas en este proceso; evita releer y
+        # descomprimir el mismo PNG en mapas consecutivos de la zona
+        self._decodificadas: "OrderedDict[tuple[int, int, int], np.ndarray]" = OrderedDict()
+
+    def _ruta(self, z: int, x: int, y: int) -> Path:
+        return self.directorio / str(z) / str(x) / f"{y}.png"
+
+    def _archivos(self) -> list[Path]:
+        return list(self.directorio.glob("*/*/*.png"))
+
+    def _descargar(self, z: int, x: int, y: int) -> bytes:
+        pedido = urllib.request.Request(
+            self.url.format(z=z, x=x, y=y),
+            headers={"User-Agent": "SandyBot/1.0 (mapas de repetitividad)"},
+        )
+        with urllib.request.urlopen(pedido, timeout=10) as resp:
+            return resp.read()
+
+    def obtener(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Devuelve los bytes PNG de la tesela o ``None`` si no está disponible."""
+        ruta = self._ruta(z, x, y)
+        if ruta.exists():
+            # Se "toca" el archivo para que cuente como usado recientemente
+            try:
+                os.utime(ruta)
+            except OSError:
+                pass
+            return ruta.read_bytes()
+
+        if self.offline:
+            return None
+
+        try:
+            datos = self._descargar(z, x, y)
+        except Exception as exc:
+            logger.warning("No se pudo descargar la tesela %s/%s/%s: %s", z, x, y, exc)
+            return None
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_bytes(datos)
+        self._registrar_escritura(len(datos))
+        return datos
+
+    def obtener_imagen(self, z: int, x: int, y: int) -> Optional[np.ndarray]:
+        """Como :meth:`obtener` pero devuelve la tesela RGBA decodificada."""
+        clave = (z, x, y)
+        with self._lock:
+            if clave in self._decodificadas:
+                self._decodificadas.move_to_end(clave)
+                return self._decodificadas[clave]
+
+        datos = self.obtener(z, x, y)
+        imagen = _decodificar_png(datos) if datos is not None else None
+
+        if imagen is not None:
+            with self._lock:
+                self._decodificadas[clave] = imagen
+                while len(self._decodificadas) > _MAX_DECODIFICADAS:
+                    self._decodificadas.popitem(last=False)
+        return imagen
+
+    def _registrar_escritura(self, tam: int) -> None:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(p.stat().st_size for p in self._archivos())
+            else:
+                self._total += tam
+            if self._total > self.max_bytes:
+                self._desalojar()
+
+    def _desalojar(self) -> None:
+        """Borra las teselas más antiguas hasta quedar en el 90 % del límite."""
+        objetivo = int(self.max_bytes * 0.9)
+        archivos = []
+        for p in self._archivos():
+            st = p.stat()
+            archivos.append((st.st_mtime_ns, st.st_size, p))
+        archivos.sort()
+        for _, tam, p in archivos:
+            if self._total <= objetivo:
+                break
+            p.unlink(missing_ok=True)
+            self._total -= tam
+        logger.info("Cache de teselas recortada a %.1f MB", self._total / 1e6)
+
+    def precargar(
+        self,
+        bbox: tuple[float, float, float, float] = AMBA_BBOX,
+        zooms: Iterable[int] = range(10, ZOOM_MAX_PRECARGA + 1),
+    ) -> int:
+        """Descarga todas las teselas de ``bbox`` para ``zooms``. Devuelve la cantidad.
+
+        Lanza ``ValueError`` si ``url`` apunta a un servidor que no admite
+        descargas masivas (el de OpenStreetMap que viene por defecto).
+        """
+        host = urllib.parse.urlsplit(self.url).hostname or ""
+        if not self.offline and any(
+            host == s or host.endswith("." + s) for s in _SERVIDORES_SIN_PRECARGA
+        ):
+            raise ValueError(
+                f"{host} no permite descargas masivas; configurá TILES_URL con un "
+                "servidor de teselas propio para precargar"
+            )
+        oeste, sur, este, norte = bbox
+        total = 0
+        for z in zooms:
+            x0, y0 = lonlat_a_tesela(oeste, norte, z)
+            x1, y1 = lonlat_a_tesela(este, sur, z)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    if self.obtener(z, x, y) is not None:
+                        total += 1
+        return total
+
+
+_cache: Optional[CacheTeselas] = None
+
+
+def obtener_cache() -> CacheTeselas:
+    """Instancia compartida configurada desde :mod:`sandybot.config`."""
+    global _cache
+    if _cache is None:
+        _cache = CacheTeselas(
+            config.TILES_DIR,
+            config.TILES_URL,
+            config.TILES_MAX_MB * 1024 * 1024,
+            config.TILES_OFFLINE,
+        )
+    return _cache
+
+
+# ─────────────────────────── MAPA BASE ───────────────────────────────
+def componer_mapa_base(
+    xmin: float,
+    xmax: float,
+    ymin: float,
+    ymax: float,
+    zoom: Optional[int] = None,
+    cache: Optional[CacheTeselas] = None,
+) -> tuple[np.ndarray, tuple[float, float, float, float]]:
+    """Une las teselas que cubren la extensión (en EPSG:3857).
+
+    Devuelve la imagen RGBA y su extensión ``(izq, der, abajo, arriba)``
+    lista para ``imshow``.
+    """
+    cache = cache or obtener_cache()
+    oeste, sur = _mercator_a_lonlat(xmin, ymin)
+    este, norte = _mercator_a_lonlat(xmax, ymax)
+    if zoom is None:
+        zoom = calcular_zoom(oeste, sur, este, norte)
+
+    x0, y0 = lonlat_a_tesela(oeste, norte, zoom)
+    x1, y1 = lonlat_a_tesela(este, sur, zoom)
+    imagen = np.empty(
+        ((y1 - y0 + 1) * TAM_TESELA, (x1 - x0 + 1) * TAM_TESELA, 4), dtype=np.float32
+    )
+    imagen[:] = _GRIS
+
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            tesela = cache.obtener_imagen(zoom, x, y)
+            if tesela is None:
+                continue
+            fila = (y - y0) * TAM_TESELA
+            col = (x - x0) * TAM_TESELA
+            imagen[fila:fila + TAM_TESELA, col:col + TAM_TESELA] = tesela
+
+    lado = 2 * ORIGEN_MERCATOR / 2 ** zoom
+    izquierda = -ORIGEN_MERCATOR + x0 * lado
+    derecha = -ORIGEN_MERCATOR + (x1 + 1) * lado
+    arriba = ORIGEN_MERCATOR - y0 * lado
+    abajo = ORIGEN_MERCATOR - (y1 + 1) * lado
+    return imagen, (izquierda, derecha, abajo, arriba)
+
+
+def agregar_mapa_base(ax, zoom: Optional[int] = None, cache: Optional[CacheTeselas] = None) -> None:
+    """Dibuja el mapa base detrás del contenido de ``ax`` sin cambiar sus límites."""
+    xmin, xmax = ax.get_xlim()
+    ymin, ymax = ax.get_ylim()
+    imagen, extension = componer_mapa_base(xmin, xmax, ymin, ymax, zoom, cache)
+    ax.imshow(imagen, extent=extension, interpolation="bilinear", zorder=0)
+    ax.set_xlim(xmin, xmax)
+    ax.set_ylim(ymin, ymax)
+
+
+if __name__ == "__main__":  # pragma: no cover - uso manual
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precarga teselas de la zona AMBA")
+    parser.add_argument("--zoom-min", type=int, default=10)
+    parser.add_argument("--zoom-max", type=int, default=ZOOM_MAX_PRECARGA)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        cantidad = obtener_cache().precargar(zooms=range(args.zoom_min, args.zoom_max + 1))
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    logger.info("Teselas disponibles: %d", cantidad)
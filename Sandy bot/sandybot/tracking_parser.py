@@ -5,72 +5,437 @@
 
 from __future__ import annotations
 
+import codecs
+import hashlib
+import json
+import logging
+import multiprocessing
 import os
 import re
-from typing import List, Tuple
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 
-import pandas as pd
+logger = logging.getLogger(__name__)
+
+# Patrones compilados una sola vez para todo el módulo
+_RE_DISTANCIA = re.compile(r"\*\s*(\d+(?:\.\d+)?)\s*mts", re.I)
+_RE_EMPALME = re.compile(r"^Empalme\s+\d+\s*:\s*(.+)")
+_RE_HOJA_INVALIDA = re.compile(r"[\\/*?\[\]]")
+
+# Bytes leídos al inicio del archivo para adivinar la codificación
+_MUESTRA_CODIFICACION = 64 * 1024
+# Se incrementa si cambia el resultado del parser, para invalidar la cache
+_VERSION_CACHE = 1
+# Trackings parseados que la cache conserva en memoria
+_MAX_EN_MEMORIA = 64
+
+
+class RegistroTracking(NamedTuple):
+    """Cámara detectada en un tracking junto con la distancia previa."""
+
+    camara: str
+    distancia: str
+
+
+def detectar_codificacion(path: str) -> str:
+    """Adivina la codificación de ``path`` a partir de una muestra inicial.
+
+    Se prueba UTF-8 (con o sin BOM) y, si falla, se usa ``cp1252``, que es
+    como exportan los trackings las PC con Windows en español.
+    """
+    with open(path, "rb") as f:
+        muestra = f.read(_MUESTRA_CODIFICACION)
+    if muestra.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # ``final=False`` tolera un carácter multibyte cortado al final
+        codecs.getincrementaldecoder("utf-8")().decode(muestra, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def _decodificar_lineas(path: str) -> Iterator[str]:
+    """Devuelve las líneas decodificadas, con respaldo a Latin-1 por línea."""
+    codificacion = detectar_codificacion(path)
+    avisado = False
+    with open(path, "rb") as f:
+        for crudo in f:
+            try:
+                yield crudo.decode(codificacion)
+            except UnicodeDecodeError:
+                # Latin-1 nunca falla: sirve para archivos con mezclas
+                if not avisado:
+                    logger.warning(
+                        "%s no es %s válido; se usa Latin-1 en las líneas afectadas",
+                        path,
+                        codificacion,
+                    )
+                    avisado = True
+                yield crudo.decode("latin-1")
+
+
+def iterar_registros(path: str) -> Iterator[RegistroTracking]:
+    """Recorre el tracking línea a línea y genera cada empalme encontrado."""
+    distancia_prev = ""
+    buscar_distancia = _RE_DISTANCIA.search
+    buscar_empalme = _RE_EMPALME.match
+
+    for line in _decodificar_lineas(path):
+        line = line.strip()
+        if not line:
+            continue
+
+        # Capturar distancia previa (solo las líneas con "*" pueden tenerla)
+        if "*" in line:
+            match_dist = buscar_distancia(line)
+            if match_dist:
+                distancia_prev = match_dist.group(1)
+                continue
+
+        # Capturar línea de empalme
+        if line.startswith("Empalme"):
+            match_emp = buscar_empalme(line)
+            if match_emp:
+                yield RegistroTracking(match_emp.group(1).strip(), distancia_prev)
+
+
+def _parsear_archivo(path: str) -> List[RegistroTracking]:
+    """Función de trabajo para el pool de procesos (debe ser de módulo)."""
+    return list(iterar_registros(path))
+
+
+def hash_archivo(path: str) -> str:
+    """SHA-256 del contenido de ``path`` leído en bloques."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+class CacheTrackings:
+    """Cache en disco de trackings parseados, direccionada por contenido.
+
+    Cada archivo se guarda como ``<sha256>.json`` dentro de ``directorio``.
+    Para no volver a calcular el hash de un archivo que no cambió se recuerda
+    la firma ``(mtime_ns, tamaño)`` de cada ruta, y los últimos resultados se
+    mantienen también en memoria.
+    """
+
+    def __init__(self, directorio: str | Path) -> None:
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._memoria: "OrderedDict[str, List[RegistroTracking]]" = OrderedDict()
+
+    def clave(self, path: str) -> str:
+        """Hash del contenido de ``path``, reutilizado si no cambió la firma."""
+        st = os.stat(path)
+        ruta = os.path.abspath(path)
+        with self._lock:
+            previo = self._hashes.get(ruta)
+        if previo and previo[:2] == (st.st_mtime_ns, st.st_size):
+            return previo[2]
+        digest = hash_archivo(path)
+        with self._lock:
+            self._hashes[ruta] = (st.st_mtime_ns, st.st_size, digest)
+        return digest
+
+    def _ruta(self, clave: str) -> Path:
+        return self.directorio / f"{clave}.json"
+
+    def obtener(self, clave: str) -> Optional[List[RegistroTracking]]:
+        """Registros guardados para ``clave`` o ``None`` si no están."""
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                return self._memoria[clave]
+        try:
+            with open(self._ruta(clave), encoding="utf-8") as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if datos.get("version") != _VERSION_CACHE:
+            return None
+        registros = [RegistroTracking(*r) for r in datos["registros"]]
+        self._recordar(clave, registros)
+        return registros
+
+    def guardar(self, clave: str, registros: List[RegistroTracking]) -> None:
+        """Persiste ``registros`` bajo ``clave`` con escritura atómica."""
+        self._recordar(clave, registros)
+        destino = self._ruta(clave)
+        temporal = destino.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": _VERSION_CACHE, "registros": registros},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(temporal, destino)
+        except OSError as exc:
+            logger.warning("No se pudo guardar la cache de tracking %s: %s", clave, exc)
+            temporal.unlink(missing_ok=True)
+
+    def _recordar(self, clave: str, registros: List[RegistroTracking]) -> None:
+        with self._lock:
+            self._memoria[clave] = registros
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > _MAX_EN_MEMORIA:
+                self._memoria.popitem(last=False)
+
+
+_cache: Optional[CacheTrackings] = None
+
+
+def obtener_cache() -> CacheTrackings:
+    """Instancia compartida en ``config.TRACKING_CACHE_DIR``."""
+    global _cache
+    if _cache is None:
+        # Import diferido: los procesos del pool no necesitan la configuración
+        from .config import config
+
+        _cache = CacheTrackings(config.TRACKING_CACHE_DIR)
+    return _cache
 
 
 class TrackingParser:
     """Procesa archivos de tracking para detectar cámaras comunes."""
 
-    def __init__(self) -> None:
-        self._data: List[Tuple[str, pd.DataFrame]] = []
+    def __init__(self, cache: Optional[CacheTrackings] = None) -> None:
+        # (hoja, registros); el DataFrame se arma recién al generar el Excel
+        self._data: List[Tuple[str, List[RegistroTracking]]] = []
+        # Con ``cache`` los archivos ya vistos no se vuelven a parsear
+        self.cache = cache
 
     def _sanitize_sheet_name(self, name: str) -> str:
         """Limpia el nombre de la hoja para que sea válida en Excel."""
-        cleaned = re.sub(r"[\\/*?\[\]]", "_", name)
+        cleaned = _RE_HOJA_INVALIDA.sub("_", name)
         return cleaned[:31]
 
     def parse_file(self, path: str, sheet_name: str | None = None) -> None:
         """Lee un archivo de texto y guarda sus datos en memoria."""
-        registros: List[Tuple[str, str]] = []
-        distancia_prev = ""
-
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # Capturar distancia previa
-                match_dist = re.search(r"\*\s*(\d+(?:\.\d+)?)\s*mts", line, re.I)
-                if match_dist:
-                    distancia_prev = match_dist.group(1)
-                    continue
-
-                # Capturar línea de empalme
-                match_emp = re.search(r"^Empalme\s+\d+\s*:\s*(.+)", line)
-                if match_emp:
-                    camara = match_emp.group(1).strip()
-                    registros.append((camara, distancia_prev))
-
-        df = pd.DataFrame(registros, columns=["camara", "distancia"])
+        clave, registros = self._desde_cache(path)
+        if registros is None:
+            registros = _parsear_archivo(path)
+            self._a_cache(clave, registros)
+        self._agregar(path, registros, sheet_name)
+
+    def _desde_cache(
+        self, path: str
+    ) -> Tuple[Optional[str], Optional[List[RegistroTracking]]]:
+        """Devuelve ``(clave, registros)``; ambos ``None`` si no aplica."""
+        if self.cache is None:
+            return None, None
+        clave = self.cache.clave(path)
+        return clave, self.cache.obtener(clave)
+
+    def _a_cache(self, clave: Optional[str], registros: List[RegistroTracking]) -> None:
+        if self.cache is not None and clave is not None:
+            self.cache.guardar(clave, registros)
+
+    def parse_files(
+        self,
+        archivos: Sequence[Tuple[str, Optional[str]]],
+        procesos: Optional[int] = None,
+    ) -> List[Tuple[str, str]]:
+        """Procesa varios trackings en paralelo y los agrega en el mismo orden.
+
+        ``archivos`` es una secuencia de ``(ruta, nombre_hoja)``. Cada archivo
+        se parsea en un proceso del pool; si alguno falla se sigue con el
+        resto y se devuelve la lista de ``(ruta, error)`` para informarlo.
+        Los que ya están en la cache no se parsean; si quedan uno o dos
+        pendientes se leen en el proceso actual porque levantar el pool cuesta
+        más que leerlos.
+        """
+        archivos = list(archivos)
+        errores: Dict[int, str] = {}
+        # Resultado por posición para respetar el orden de las hojas
+        resultados: List[Optional[List[RegistroTracking]]] = [None] * len(archivos)
+        claves: List[Optional[str]] = [None] * len(archivos)
+        pendientes: List[int] = []
+
+        for i, (ruta, _) in enumerate(archivos):
+            try:
+                claves[i], resultados[i] = self._desde_cache(ruta)
+            except Exception as exc:
+                errores[i] = str(exc)
+                continue
+            if resultados[i] is None:
+                pendientes.append(i)
+
+        procesos = procesos or min(len(pendientes), os.cpu_count() or 1)
+        if len(pendientes) <= 2 or procesos <= 1:
+            for i in pendientes:
+                try:
+                    resultados[i] = _parsear_archivo(archivos[i][0])
+                except Exception as exc:
+                    errores[i] = str(exc)
+        else:
+            # "spawn" evita heredar hilos y locks del bot al crear los procesos
+            contexto = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+                futuros = {i: pool.submit(_parsear_archivo, archivos[i][0]) for i in pendientes}
+                for i, futuro in futuros.items():
+                    try:
+                        resultados[i] = futuro.result()
+                    except Exception as exc:
+                        errores[i] = str(exc)
+
+        for i in pendientes:
+            if i not in errores:
+                self._a_cache(claves[i], resultados[i])
+
+        for i, (ruta, nombre) in enumerate(archivos):
+            if i in errores:
+                logger.warning("No se pudo leer el tracking %s: %s", ruta, errores[i])
+                continue
+            self._agregar(ruta, resultados[i], nombre)
+        return [(archivos[i][0], errores[i]) for i in sorted(errores)]
+
+    def _agregar(
+        self, path: str, registros: List[RegistroTracking], sheet_name: str | None
+    ) -> None:
+        """Guarda los registros de ``path`` bajo un nombre de hoja válido."""
         if sheet_name is None:
             sheet_name = os.path.splitext(os.path.basename(path))[0]
-        sheet = self._sanitize_sheet_name(sheet_name)
-        self._data.append((sheet, df))
+        self._data.append((self._sanitize_sheet_name(sheet_name), registros))
+
+    def camaras(self, indice: int = 0) -> List[str]:
+        """Devuelve las cámaras del tracking número ``indice`` en orden."""
+        return [r.camara for r in self._data[indice][1]]
 
     def clear_data(self) -> None:
         """Elimina cualquier información almacenada previamente."""
         self._data.clear()
 
+    def indice_camaras(self) -> Dict[str, Dict[int, str]]:
+        """Índice de cámara normalizada → trackings que la contienen.
+
+        Para cada clave normalizada guarda ``{posición: grafía original}``,
+        de modo que "Cam. Av. Gral Paz" y "camara avenida general paz" cuentan
+        como la misma cámara pero cada tracking conserva cómo la escribió.
+        Se arma en una sola pasada; cada nombre distinto se normaliza una vez
+        aunque se repita en muchos trackings.
+        """
+        # Import diferido: ``utils`` carga Telegram y la configuración
+        from .utils import normalizar_camara
+
+        indice: Dict[str, Dict[int, str]] = {}
+        normalizadas: Dict[str, str] = {}
+        for i, (_, registros) in enumerate(self._data):
+            for r in registros:
+                clave = normalizadas.get(r.camara)
+                if clave is None:
+                    clave = normalizadas[r.camara] = normalizar_camara(r.camara)
+                indice.setdefault(clave, {}).setdefault(i, r.camara)
+        return indice
+
+    def matriz_superposicion(
+        self, indice: Optional[Dict[str, Dict[int, str]]] = None
+    ) -> List[List[int]]:
+        """Cámaras compartidas entre cada par de trackings (matriz N×N).
+
+        La diagonal tiene la cantidad de cámaras distintas de cada tracking.
+        Se calcula como ``A.T @ A`` sobre la matriz de incidencia
+        cámara × tracking, sin reconstruir conjuntos por cada par.
+        """
+        import numpy as np
+
+        if indice is None:
+            indice = self.indice_camaras()
+        n = len(self._data)
+        incidencia = np.zeros((len(indice), n), dtype=np.int32)
+        for fila, grafias in enumerate(indice.values()):
+            incidencia[fila, list(grafias)] = 1
+        return (incidencia.T @ incidencia).tolist()
+
+    def camaras_compartidas(
+        self,
+        minimo: int = 2,
+        indice: Optional[Dict[str, Dict[int, str]]] = None,
+    ) -> List[Tuple[str, List[str]]]:
+        """Cámaras presentes en al menos ``minimo`` trackings.
+
+        Devuelve ``(cámara, hojas)`` ordenado de la más compartida a la menos,
+        con la cámara escrita como en el primer tracking que la contiene.
+        ``indice`` permite reutilizar el resultado de :meth:`indice_camaras`.
+        """
+        if indice is None:
+            indice = self.indice_camaras()
+        hojas = [hoja for hoja, _ in self._data]
+        compartidas = [
+            (next(iter(grafias.values())), [hojas[i] for i in sorted(grafias)])
+            for grafias in indice.values()
+            if len(grafias) >= minimo
+        ]
+        compartidas.sort(key=lambda c: (-len(c[1]), c[0]))
+        return compartidas
+
+    def _comunes(self, indice: Dict[str, Dict[int, str]]) -> List[Dict[int, str]]:
+        """Grafías de las cámaras presentes en todos los trackings."""
+        n = len(self._data)
+        comunes = [grafias for grafias in indice.values() if len(grafias) == n]
+        comunes.sort(key=lambda g: g[0])
+        return comunes
+
     def _find_common_chambers(self) -> List[str]:
-        """Obtiene las cámaras presentes en todos los trackings."""
+        """Obtiene las cámaras presentes en todos los trackings.
+
+        La comparación se hace sobre la forma normalizada; se devuelve la
+        grafía del primer tracking.
+        """
         if not self._data:
             return []
-        sets = [set(df["camara"].astype(str)) for _, df in self._data]
-        comunes = set.intersection(*sets)
-        return sorted(comunes)
-
-    def generate_excel(self, output: str) -> None:
-        """Genera un Excel con cada tracking y las coincidencias."""
-        coincidencias = pd.DataFrame(
-            self._find_common_chambers(), columns=["camara"]
-        )
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            for sheet, df in self._data:
-                df.to_excel(writer, sheet_name=sheet, index=False)
-            coincidencias.to_excel(writer, sheet_name="Coincidencias", index=False)
+        return [grafias[0] for grafias in self._comunes(self.indice_camaras())]
+
+    def generate_excel(self, output: str, minimo_compartidas: int = 2) -> None:
+        """Genera un Excel con cada tracking, las coincidencias y la superposición.
+
+        ``Coincidencias`` muestra cada cámara común con la grafía usada en
+        cada tracking. La hoja ``Superposicion`` tiene la matriz de cámaras
+        compartidas entre cada par de trackings y, debajo, las cámaras
+        presentes en al menos ``minimo_compartidas`` recorridos.
+        """
+        # Escritura en modo ``write_only``: la memoria no crece con las filas
+        from .excel_utils import Hoja, escribir_excel
 
+        hojas = [hoja for hoja, _ in self._data]
+        indice = self.indice_camaras()
+        matriz = self.matriz_superposicion(indice)
+        compartidas = self.camaras_compartidas(minimo_compartidas, indice)
+
+        def superposicion():
+            for hoja, fila in zip(hojas, matriz):
+                yield [hoja] + fila
+            # Dos renglones en blanco y el listado de cámaras compartidas
+            yield []
+            yield []
+            yield ["camara", "cantidad", "trackings"]
+            for camara, ids in compartidas:
+                yield [camara, len(ids), ", ".join(ids)]
+
+        escribir_excel(
+            output,
+            [
+                *(
+                    Hoja(sheet, RegistroTracking._fields, registros)
+                    for sheet, registros in self._data
+                ),
+                Hoja(
+                    "Coincidencias",
+                    ["camara"] + hojas,
+                    (
+                        [grafias[0]] + [grafias[i] for i in range(len(hojas))]
+                        for grafias in self._comunes(indice)
+                    ),
+                ),
+                Hoja("Superposicion", [None] + hojas, superposicion()),
+            ],
+        )
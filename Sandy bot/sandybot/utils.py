@@ -9,6 +9,7 @@ import json
 import logging
 import unicodedata
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from pathlib import Path
 from telegram import Update, Message
@@ -17,7 +18,7 @@ from .config import config
 
 logger = logging.getLogger(__name__)
 
-# Patrón precargado para evitar recompilaciones en normalizar_camara
+# Equivalencias de abreviaturas de normalizar_camara, en orden de prioridad
 REEMPLAZOS_REGEX: dict[re.Pattern, str] = {
     re.compile(r"\bcam\.\b"): "camara",
     re.compile(r"\bcam\b"): "camara",
@@ -27,6 +28,16 @@ REEMPLAZOS_REGEX: dict[re.Pattern, str] = {
     re.compile(r"\bgral\b"): "general",
     re.compile(r"\bcra\.?\b"): "carrera",
 }
+# Las mismas equivalencias en una sola alternancia; el grupo que coincide
+# (``lastindex``) indica la prioridad y el reemplazo a usar
+_RE_ABREVIATURAS = re.compile(
+    "|".join(f"({patron.pattern})" for patron in REEMPLAZOS_REGEX)
+)
+_REEMPLAZOS = tuple(REEMPLAZOS_REGEX.values())
+# Puntuación eliminada antes de comparar cámaras
+_SIN_PUNTUACION = str.maketrans("", "", ".,;:")
+# Nombres distintos que se recuerdan ya normalizados
+_MAX_CAMARAS_MEMO = 65536
 
 def normalizar_texto(texto: str) -> str:
     """
@@ -34,18 +45,37 @@ def normalizar_texto(texto: str) -> str:
     """
     return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii').lower()
 
+def _expandir_abreviaturas(t: str) -> str:
+    """Aplica ``REEMPLAZOS_REGEX`` en una sola pasada.
+
+    Da el mismo resultado que aplicar cada patrón por separado y en orden:
+    allí, después de reemplazar una abreviatura, la siguiente pegada a ella
+    ("cam.av") pierde el límite de palabra si su patrón se aplica más tarde.
+    """
+    partes = []
+    pos = 0
+    ultimo_fin = -1
+    ultima_prioridad = -1
+    for m in _RE_ABREVIATURAS.finditer(t):
+        prioridad = m.lastindex - 1
+        if m.start() == ultimo_fin and ultima_prioridad < prioridad:
+            continue
+        partes.append(t[pos:m.start()])
+        partes.append(_REEMPLAZOS[prioridad])
+        pos = ultimo_fin = m.end()
+        ultima_prioridad = prioridad
+    if not partes:
+        return t
+    partes.append(t[pos:])
+    return "".join(partes)
+
+@lru_cache(maxsize=_MAX_CAMARAS_MEMO)
 def normalizar_camara(texto: str) -> str:
     """Normaliza nombres de cámara eliminando acentos y abreviaturas."""
-    t = normalizar_texto(texto)
-
-    # Aplicar equivalencias precompiladas
-    for patron, reemplazo in REEMPLAZOS_REGEX.items():
-        t = patron.sub(reemplazo, t)
+    t = _expandir_abreviaturas(normalizar_texto(texto))
 
-    # Eliminar puntuación que pueda afectar la comparación
-    t = re.sub(r"[.,;:]", "", t)
-    t = re.sub(r"\s+", " ", t)
-    return t.strip()
+    # Eliminar puntuación que pueda afectar la comparación y unificar espacios
+    return " ".join(t.translate(_SIN_PUNTUACION).split())
 
 def cargar_json(ruta: Path) -> Dict:
     """
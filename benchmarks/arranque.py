@@ -0,0 +1,168 @@
+# Nombre de archivo: arranque.py
+# Ubicación de archivo: benchmarks/arranque.py
+# User-provided custom instructions
+"""Mide el costo de arranque del bot con ``python -X importtime``.
+
+Ejecuta la importación en un proceso nuevo (arranque en frío) y reporta el
+tiempo total de importación, la memoria residual máxima y los módulos que más
+tardan. También indica si se cargó alguna de las dependencias pesadas que
+deberían importarse recién cuando se usan.
+
+Uso:
+
+    python benchmarks/arranque.py
+    python benchmarks/arranque.py --modulo sandybot.handlers.repetitividad --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+PAQUETE = RAIZ / "Sandy bot"
+
+# Presupuesto de arranque controlado por tests/test_arranque.py
+PRESUPUESTO_MS = float(os.getenv("SANDY_ARRANQUE_MAX_MS", "800"))
+PRESUPUESTO_RSS_MB = float(os.getenv("SANDY_ARRANQUE_MAX_RSS_MB", "100"))
+# Dependencias que no deben cargarse solo por importar el bot
+PESADOS = (
+    "pandas",
+    "numpy",
+    "docx",
+    "openpyxl",
+    "matplotlib",
+    "geopandas",
+    "contextily",
+    "openai",
+    "notion_client",
+    "jsonschema",
+    "extract_msg",
+)
+
+# Variables obligatorias de Config; se completan con valores ficticios
+_VARIABLES = (
+    "TELEGRAM_TOKEN",
+    "OPENAI_API_KEY",
+    "NOTION_TOKEN",
+    "NOTION_DATABASE_ID",
+    "DB_USER",
+    "DB_PASSWORD",
+)
+
+# ``ru_maxrss`` se hereda del proceso padre a través de ``exec`` en Linux, por
+# eso se prefiere ``VmHWM`` (pico del espacio de memoria propio) si existe.
+_CODIGO = """
+import resource, sys
+import {modulo}
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+try:
+    with open("/proc/self/status") as f:
+        rss = next(int(l.split()[1]) for l in f if l.startswith("VmHWM"))
+except (OSError, StopIteration):
+    pass
+print("RSS_KB", rss)
+print("MODULOS", " ".join(sorted(sys.modules)))
+"""
+
+
+@dataclass
+class Resultado:
+    """Datos de una medición de arranque."""
+
+    modulo: str
+    total_ms: float
+    rss_mb: float
+    mas_lentos: list[tuple[str, float]] = field(default_factory=list)
+    pesados: list[str] = field(default_factory=list)
+
+
+def _parsear_importtime(salida: str) -> tuple[float, dict[str, float]]:
+    """Devuelve el total en ms y el acumulado (ms) de cada módulo."""
+    total_us = 0
+    acumulados: dict[str, float] = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre_crudo = linea[len("import time:"):].split("|")
+        acumulado_us = int(acumulado)
+        # Los módulos importados directamente tienen un solo espacio de
+        # sangría; los anidados, más. Solo los primeros suman al total.
+        if not nombre_crudo.startswith("  "):
+            total_us += acumulado_us
+        acumulados[nombre_crudo.strip()] = acumulado_us / 1000
+    return total_us / 1000, acumulados
+
+
+def medir_arranque(modulo: str = "sandybot.bot", top: int = 10) -> Resultado:
+    """Importa ``modulo`` en un intérprete nuevo y mide el costo."""
+    entorno = dict(os.environ)
+    for var in _VARIABLES:
+        entorno.setdefault(var, "benchmark")
+    entorno["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(PAQUETE), entorno.get("PYTHONPATH")])
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CODIGO.format(modulo=modulo)],
+        cwd=PAQUETE,
+        env=entorno,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_ms, acumulados = _parsear_importtime(proc.stderr)
+
+    rss_kb = 0
+    modulos: set[str] = set()
+    for linea in proc.stdout.splitlines():
+        if linea.startswith("RSS_KB"):
+            rss_kb = int(linea.split()[1])
+        elif linea.startswith("MODULOS"):
+            modulos = set(linea.split()[1:])
+
+    mas_lentos = sorted(acumulados.items(), key=lambda x: x[1], reverse=True)[:top]
+    return Resultado(
+        modulo=modulo,
+        total_ms=total_ms,
+        rss_mb=rss_kb / 1024,
+        mas_lentos=mas_lentos,
+        pesados=[p for p in PESADOS if p in modulos],
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modulo", default="sandybot.bot")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    res = medir_arranque(args.modulo, args.top)
+    if args.json:
+        print(json.dumps(res.__dict__, ensure_ascii=False, indent=2))
+    else:
+        print(f"Módulo: {res.modulo}")
+        print(f"Importación: {res.total_ms:.1f} ms (presupuesto {PRESUPUESTO_MS:.0f} ms)")
+        print(f"RSS máximo: {res.rss_mb:.1f} MB (presupuesto {PRESUPUESTO_RSS_MB:.0f} MB)")
+        print("Pesados cargados:", ", ".join(res.pesados) or "ninguno")
+        print("Más lentos (acumulado):")
+        for nombre, ms in res.mas_lentos:
+            print(f"  {ms:8.1f} ms  {nombre}")
+
+    excedido = (
+        res.total_ms > PRESUPUESTO_MS
+        or res.rss_mb > PRESUPUESTO_RSS_MB
+        or bool(res.pesados)
+    )
+    return 1 if excedido else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# Nombre de archivo: escaner_correo.py
+# Ubicación de archivo: benchmarks/escaner_correo.py
+# User-provided custom instructions
+"""Benchmark del escáner de una pasada sobre correos pegados muy largos.
+
+Arma un aviso sintético de varios MB (encabezados, tablas de servicios con
+muchos números, hilos reenviados y un aviso legal al final) y compara la
+limpieza y detección actuales (``RegistroCarriers.escanear``) con la
+implementación anterior: regex sin compilar por línea en ``_limpiar_correo`` y
+varios ``re.search``/``re.findall`` sobre el texto completo.
+
+Uso:
+
+    python benchmarks/escaner_correo.py --mb 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Sandy bot"))
+for _var in (
+    "TELEGRAM_TOKEN",
+    "OPENAI_API_KEY",
+    "NOTION_TOKEN",
+    "NOTION_DATABASE_ID",
+    "DB_USER",
+    "DB_PASSWORD",
+):
+    os.environ.setdefault(_var, "x")
+
+from sandybot.carriers import obtener_registro  # noqa: E402
+
+_BLOQUE = (
+    "> From: NOC Telxius <noc@telxius.com>\n"
+    "> Sent: 02/01/2024 07:{n2:02d}\n"
+    "> Ticket SWX{n7:07d} | Ventana 02/01/2024 08:00 - 02/01/2024 10:00\n"
+    "> | CRT-{n6:06d} | Cámara {n} | 48 hilos | {n} mts | 2 empalmes |\n"
+    "> | CRT-{m6:06d} | Cámara {m} | 96 hilos | {m} mts | 1 empalme |\n"
+    "> Comentario {n}: se reemplazan 3 tramos de 120 m entre 4 cámaras.\n"
+    ">\n"
+)
+
+
+def generar_correo(mb: float) -> str:
+    """Devuelve un correo de al menos ``mb`` megabytes."""
+    partes = [
+        "Subject: TELXIUS - METROTEL - Mantenimiento programado\n",
+        "From: NOC Telxius <noc@telxius.com>\n",
+    ]
+    tam = 0
+    n = 0
+    while tam < mb * 1e6:
+        bloque = _BLOQUE.format(
+            n=n, m=n + 1, n2=n % 60, n6=n % 1_000_000, m6=(n + 1) % 1_000_000, n7=n
+        )
+        partes.append(bloque)
+        tam += len(bloque.encode("utf-8"))
+        n += 1
+    partes.append("Aviso legal: este correo es confidencial.\nFirma\n")
+    return "".join(partes)
+
+
+def _anterior(texto: str) -> dict:
+    """Limpieza y detección previas, conservadas solo como referencia."""
+    lineas: list[str] = []
+    for linea in texto.splitlines():
+        l = linea.strip()
+        if not l:
+            continue
+        if re.search(
+            r"disclaimer|confidencial|aviso legal|confidentiality notice|"
+            r"correo(?:\s+electronico)?\s*(?:es\s+)?privado",
+            l,
+            re.I,
+        ):
+            break
+        lineas.append(l)
+    texto = "\n".join(lineas)
+
+    resultado: dict = {}
+    lineas = texto.splitlines()
+    asunto = lineas[0].split(":", 1)[1].strip() if lineas else ""
+    m = re.search(r"From:\s*([^\n]+)", texto, re.I)
+    if not m:
+        m = re.search(r"Name:\s*([^\n]+)", texto, re.I)
+    if m:
+        correo = m.group(1).strip().split()[-1].strip("<>")
+        if re.search(r".*telxius.*", correo.lower()):
+            resultado["carrier"] = "TELXIUS"
+    carrier_norm = resultado.get("carrier", "").upper()
+    if carrier_norm == "TELXIUS":
+        id_pat, srv_pat = r"SWX\d{7}", r"CRT-\d{6}"
+    else:
+        id_pat, srv_pat = r"ID\w+", r"\b\d+\b"
+    m = re.search(id_pat, texto)
+    if m:
+        resultado["id_interno"] = m.group(0)
+    resultado["ids"] = re.findall(srv_pat, texto)
+    resultado["tipo"] = "Emergencia" if "EMERGENCY" in asunto.upper() else "Programada"
+    return resultado
+
+
+def _medir(funcion, *args) -> tuple[float, float]:
+    """Devuelve (segundos, pico de memoria en MB) de ``funcion(*args)``.
+
+    El tiempo se toma en una corrida sin ``tracemalloc`` porque este agrega
+    un costo por cada asignación; la memoria se mide en una segunda corrida.
+    """
+    inicio = time.perf_counter()
+    funcion(*args)
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion, pico / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=float, default=2.0, help="Tamaño del correo")
+    parser.add_argument("--sin-anterior", action="store_true", help="No medir la versión previa")
+    args = parser.parse_args()
+
+    texto = generar_correo(args.mb)
+    print(f"Correo: {len(texto.encode('utf-8')) / 1e6:.1f} MB, {texto.count(chr(10)):,} líneas")
+
+    registro = obtener_registro()
+    escaneo = registro.escanear(texto)
+    seg, mem = _medir(registro.escanear, texto)
+    print(f"Actual:   {seg:6.3f} s  pico {mem:7.1f} MB  ({len(escaneo.ids):,} servicios)")
+
+    if not args.sin_anterior:
+        previo = _anterior(texto)
+        seg_ant, mem_ant = _medir(_anterior, texto)
+        print(
+            f"Anterior: {seg_ant:6.3f} s  pico {mem_ant:7.1f} MB  "
+            f"({len(set(previo['ids'])):,} servicios)"
+        )
+        print(f"Mejora:   x{seg_ant / seg:.2f} en tiempo")
+        distintos = set(previo["ids"]) ^ set(escaneo.ids)
+        if distintos or previo.get("id_interno") != escaneo.id_interno:
+            raise SystemExit(f"Los resultados difieren: {sorted(distintos)[:10]}")
+
+
+if __name__ == "__main__":
+    main()
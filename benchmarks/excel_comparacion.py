@@ -0,0 +1,92 @@
+# Nombre de archivo: excel_comparacion.py
+# Ubicación de archivo: benchmarks/excel_comparacion.py
+# User-provided custom instructions
+"""Benchmark de ``TrackingParser.generate_excel`` con muchas hojas grandes.
+
+Compara la escritura actual (openpyxl en modo ``write_only``) contra la
+anterior (``pd.ExcelWriter`` con openpyxl, que arma el libro en memoria).
+
+Uso:
+
+    python benchmarks/excel_comparacion.py --trackings 10 --filas 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Sandy bot"))
+for _var in ("TELEGRAM_TOKEN", "OPENAI_API_KEY", "NOTION_TOKEN", "NOTION_DATABASE_ID", "DB_USER", "DB_PASSWORD"):
+    os.environ.setdefault(_var, "benchmark")
+
+from sandybot.tracking_parser import RegistroTracking, TrackingParser  # noqa: E402
+
+
+def armar_parser(trackings: int, filas: int) -> TrackingParser:
+    """Parser con ``trackings`` hojas sintéticas de ``filas`` cámaras."""
+    parser = TrackingParser()
+    for t in range(trackings):
+        registros = [
+            RegistroTracking(f"Camara Av. Siempreviva {(n * (t + 1)) % (filas * 2)}", str(n * 10))
+            for n in range(filas)
+        ]
+        parser._data.append((f"Tracking {t}", registros))
+    return parser
+
+
+def _excel_anterior(parser: TrackingParser, salida: str) -> None:
+    """Escritura previa con ``pd.ExcelWriter``, conservada como referencia."""
+    import pandas as pd
+
+    coincidencias = pd.DataFrame(parser._find_common_chambers(), columns=["camara"])
+    with pd.ExcelWriter(salida, engine="openpyxl") as writer:
+        for sheet, registros in parser._data:
+            df = pd.DataFrame(registros, columns=list(RegistroTracking._fields))
+            df.to_excel(writer, sheet_name=sheet, index=False)
+        coincidencias.to_excel(writer, sheet_name="Coincidencias", index=False)
+
+
+def _medir(funcion, *args) -> tuple[float, float]:
+    """Devuelve (segundos, pico de memoria en MB); se mide en corridas separadas."""
+    inicio = time.perf_counter()
+    funcion(*args)
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion, pico / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trackings", type=int, default=10)
+    parser.add_argument("--filas", type=int, default=50_000)
+    parser.add_argument("--sin-anterior", action="store_true", help="No medir la versión previa")
+    args = parser.parse_args()
+
+    datos = armar_parser(args.trackings, args.filas)
+    # Índice y normalización ya calculados para medir solo la escritura
+    datos.indice_camaras()
+    print(f"Trackings: {args.trackings} x {args.filas:,} filas")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        salida = os.path.join(tmp, "comparacion.xlsx")
+        seg, mem = _medir(datos.generate_excel, salida)
+        print(f"Actual:   {seg:6.2f} s  pico {mem:7.1f} MB")
+
+        if not args.sin_anterior:
+            seg_ant, mem_ant = _medir(_excel_anterior, datos, salida)
+            print(f"Anterior: {seg_ant:6.2f} s  pico {mem_ant:7.1f} MB")
+            print(f"Mejora:   x{seg_ant / seg:.2f} en tiempo, x{mem_ant / mem:.1f} en memoria")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Nombre de archivo: lector_msg.py
+# Ubicación de archivo: benchmarks/lector_msg.py
+# User-provided custom instructions
+"""Benchmark de ``sandybot.lector_msg`` sobre avisos de mantenimiento.
+
+Genera avisos sintéticos (la mitad en HTML con una tabla de servicios, como
+los que mandan los carriers, y la otra mitad en texto plano) y mide:
+
+- el tiempo por correo de ``leer_msg`` con el parser HTML rápido
+  (``selectolax``/``lxml``) y con BeautifulSoup ``html.parser``;
+- el lote completo leído en el proceso actual y en el pool de procesos.
+
+Con ``--dir`` se agregan los ``.msg`` reales de esa carpeta.
+
+Uso:
+
+    python benchmarks/lector_msg.py --correos 200 --filas 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Sandy bot"))
+
+from sandybot import lector_msg  # noqa: E402
+
+_HTML = """<html><head><style>td {{ border: 1px solid }}</style></head><body>
+<p>Estimado cliente,</p>
+<p>Le informamos la siguiente <b>tarea programada</b> en la red de {carrier}.</p>
+<table>
+<tr><th>Inicio</th><th>Fin</th><th>Tipo</th><th>Afectación</th></tr>
+<tr><td>02/01/2024 08:00</td><td>02/01/2024 10:00</td><td>Mantenimiento</td><td>2 h</td></tr>
+</table>
+<table><tr><th>Servicio</th><th>Ubicación</th></tr>
+{filas}
+</table>
+<p>Saludos cordiales,<br>NOC {carrier}</p>
+</body></html>
+"""
+
+_TEXTO = """From: noc@{carrier}.com
+Aviso de mantenimiento {n}
+Inicio: 2024-01-02 08:00
+Fin: 2024-01-02 10:00
+Tipo de tarea: Mantenimiento
+Servicios afectados: {ids}
+"""
+
+
+def generar_avisos(carpeta: str, correos: int, filas: int) -> list[str]:
+    """Escribe ``correos`` avisos en ``carpeta`` y devuelve sus rutas."""
+    rutas = []
+    for n in range(correos):
+        carrier = ("telxius", "ignetwork", "metrotel")[n % 3]
+        if n % 2:
+            ruta = os.path.join(carpeta, f"aviso{n}.txt")
+            ids = ", ".join(str(70000 + n * filas + i) for i in range(filas))
+            contenido = _TEXTO.format(carrier=carrier, n=n, ids=ids)
+        else:
+            ruta = os.path.join(carpeta, f"aviso{n}.html")
+            filas_html = "\n".join(
+                f"<tr><td>{70000 + n * filas + i}</td><td>Cámara {i}</td></tr>"
+                for i in range(filas)
+            )
+            contenido = _HTML.format(carrier=carrier.upper(), filas=filas_html)
+        Path(ruta).write_text(contenido, encoding="utf-8")
+        rutas.append(ruta)
+    return rutas
+
+
+def _medir(funcion, *args) -> tuple[float, float]:
+    """Devuelve (segundos, pico de memoria en MB) de ``funcion(*args)``.
+
+    El tiempo se toma en una corrida sin ``tracemalloc`` porque este agrega
+    un costo por cada asignación; la memoria se mide en una segunda corrida.
+    """
+    inicio = time.perf_counter()
+    funcion(*args)
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion, pico / 1e6
+
+
+def _leer_todos(rutas: list[str]) -> None:
+    for ruta in rutas:
+        lector_msg.leer_msg(ruta)
+
+
+def _leer_con_motor(motor: str, rutas: list[str]) -> None:
+    previo = lector_msg.MOTOR_HTML
+    lector_msg.MOTOR_HTML = motor
+    try:
+        _leer_todos(rutas)
+    finally:
+        lector_msg.MOTOR_HTML = previo
+
+
+async def _lote(rutas: list[str], procesos: int) -> None:
+    await asyncio.gather(*(lector_msg.leer_msg_async(r, procesos) for r in rutas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--correos", type=int, default=200)
+    parser.add_argument("--filas", type=int, default=300, help="Servicios por aviso")
+    parser.add_argument("--procesos", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--dir", help="Carpeta con archivos .msg reales")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = generar_avisos(tmp, args.correos, args.filas)
+        if args.dir:
+            rutas += [str(p) for p in sorted(Path(args.dir).glob("*.msg"))]
+        tam = sum(os.path.getsize(r) for r in rutas) / 1e6
+        print(f"Avisos: {len(rutas)} ({tam:.1f} MB) - parser HTML: {lector_msg.MOTOR_HTML}")
+
+        lector_msg.leer_msg(rutas[0])  # importa extract_msg antes de medir
+        motores = [lector_msg.MOTOR_HTML]
+        if lector_msg.MOTOR_HTML != "html.parser":
+            motores.append("html.parser")
+        for motor in motores:
+            seg, mem = _medir(_leer_con_motor, motor, rutas)
+            print(
+                f"{motor:12} {seg / len(rutas) * 1000:7.2f} ms/correo  pico {mem:7.1f} MB"
+            )
+
+        inicio = time.perf_counter()
+        asyncio.run(_lote(rutas, 0))
+        en_proceso = time.perf_counter() - inicio
+        print(f"Lote en el proceso:      {en_proceso:6.2f} s")
+
+        # La primera tanda arranca los procesos; se mide la segunda
+        asyncio.run(_lote(rutas[: args.procesos], args.procesos))
+        inicio = time.perf_counter()
+        asyncio.run(_lote(rutas, args.procesos))
+        en_pool = time.perf_counter() - inicio
+        lector_msg.cerrar_pool()
+        print(f"Lote en {args.procesos} procesos:      {en_pool:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
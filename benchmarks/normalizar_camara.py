@@ -0,0 +1,101 @@
+# Nombre de archivo: normalizar_camara.py
+# Ubicación de archivo: benchmarks/normalizar_camara.py
+# User-provided custom instructions
+"""Micro-benchmark de ``utils.normalizar_camara`` sobre 100.000 nombres.
+
+Compara la versión actual (una sola alternancia compilada y memo LRU) contra
+la anterior (siete ``sub`` en secuencia y dos ``re.sub`` sin compilar) y
+verifica que ambas devuelvan exactamente lo mismo para cada nombre.
+
+Uso:
+
+    python benchmarks/normalizar_camara.py --nombres 100000 --distintos 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Sandy bot"))
+for _var in ("TELEGRAM_TOKEN", "OPENAI_API_KEY", "NOTION_TOKEN", "NOTION_DATABASE_ID", "DB_USER", "DB_PASSWORD"):
+    os.environ.setdefault(_var, "benchmark")
+
+from sandybot import utils  # noqa: E402
+
+_PREFIJOS = ("Cam.", "Cam", "CAM", "Cámara", "camara", "Cra.", "Cra", "")
+_VIAS = ("Av.", "Av", "Avenida", "Gral.", "Gral", "Cno.", "")
+_NOMBRES = ("Paz", "San Martín", "Rivadavia", "Belgrano", "Córdoba", "Ñandú", "Mitre")
+_SEPARADORES = (" ", "  ", ".", ", ", " - ", ";", ":")
+
+
+def _anterior(texto: str) -> str:
+    """Implementación previa, conservada solo como referencia."""
+    t = utils.normalizar_texto(texto)
+    for patron, reemplazo in utils.REEMPLAZOS_REGEX.items():
+        t = patron.sub(reemplazo, t)
+    t = re.sub(r"[.,;:]", "", t)
+    t = re.sub(r"\s+", " ", t)
+    return t.strip()
+
+
+def generar_nombres(cantidad: int, distintos: int, semilla: int = 1) -> list[str]:
+    """Nombres de cámara sintéticos con abreviaturas y separadores variados."""
+    azar = random.Random(semilla)
+    base = []
+    for n in range(distintos):
+        partes = [
+            azar.choice(_PREFIJOS),
+            azar.choice(_VIAS),
+            azar.choice(_VIAS),
+            azar.choice(_NOMBRES),
+            str(n),
+        ]
+        texto = ""
+        for parte in partes:
+            texto += parte + azar.choice(_SEPARADORES)
+        base.append(texto)
+    return [azar.choice(base) for _ in range(cantidad)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nombres", type=int, default=100_000)
+    parser.add_argument("--distintos", type=int, default=20_000)
+    args = parser.parse_args()
+
+    nombres = generar_nombres(args.nombres, args.distintos)
+
+    inicio = time.perf_counter()
+    esperados = [_anterior(n) for n in nombres]
+    seg_ant = time.perf_counter() - inicio
+
+    utils.normalizar_camara.cache_clear()
+    inicio = time.perf_counter()
+    obtenidos = [utils.normalizar_camara(n) for n in nombres]
+    seg_frio = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    [utils.normalizar_camara(n) for n in nombres]
+    seg_memo = time.perf_counter() - inicio
+
+    distintos = [i for i, (a, b) in enumerate(zip(esperados, obtenidos)) if a != b]
+    print(f"Nombres: {len(nombres):,} ({args.distintos:,} distintos)")
+    print(f"Anterior:          {seg_ant:6.3f} s")
+    print(f"Actual (en frío):  {seg_frio:6.3f} s  x{seg_ant / seg_frio:.1f}")
+    print(f"Actual (con memo): {seg_memo:6.3f} s  x{seg_ant / seg_memo:.1f}")
+    if distintos:
+        i = distintos[0]
+        print(f"Diferencias: {len(distintos)} (ej. {nombres[i]!r}: {esperados[i]!r} != {obtenidos[i]!r})")
+        return 1
+    print("Resultados idénticos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# Nombre de archivo: tracking_parser.py
+# Ubicación de archivo: benchmarks/tracking_parser.py
+# User-provided custom instructions
+"""Benchmark de ``TrackingParser.parse_file`` sobre un tracking grande.
+
+Genera un archivo sintético (1.000.000 de líneas por defecto) con el formato
+de los trackings reales y compara el parser actual contra la implementación
+anterior (``re.search`` sin compilar y DataFrame por archivo).
+
+Uso:
+
+    python benchmarks/tracking_parser.py --lineas 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "Sandy bot"))
+
+from sandybot.tracking_parser import TrackingParser  # noqa: E402
+
+
+def generar_tracking(ruta: str, lineas: int) -> None:
+    """Escribe un tracking sintético con ``lineas`` líneas."""
+    bloque = (
+        "* {d} mts\n",
+        "Empalme {n}: Cámara Av. Siempreviva {n} - Tapa {n}\n",
+        "Fibra 48 hilos - Cable troncal\n",
+        "\n",
+    )
+    with open(ruta, "w", encoding="utf-8") as f:
+        for i in range(lineas):
+            n = i // len(bloque)
+            f.write(bloque[i % len(bloque)].format(d=n * 10, n=n))
+
+
+def _parse_anterior(path: str):
+    """Implementación previa, conservada solo como referencia."""
+    import pandas as pd
+
+    registros = []
+    distancia_prev = ""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            match_dist = re.search(r"\*\s*(\d+(?:\.\d+)?)\s*mts", line, re.I)
+            if match_dist:
+                distancia_prev = match_dist.group(1)
+                continue
+            match_emp = re.search(r"^Empalme\s+\d+\s*:\s*(.+)", line)
+            if match_emp:
+                registros.append((match_emp.group(1).strip(), distancia_prev))
+    return pd.DataFrame(registros, columns=["camara", "distancia"])
+
+
+def _medir(funcion, *args) -> tuple[float, float]:
+    """Devuelve (segundos, pico de memoria en MB) de ``funcion(*args)``.
+
+    El tiempo se toma en una corrida sin ``tracemalloc`` porque este agrega
+    un costo por cada asignación; la memoria se mide en una segunda corrida.
+    """
+    inicio = time.perf_counter()
+    funcion(*args)
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion, pico / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lineas", type=int, default=1_000_000)
+    parser.add_argument("--sin-anterior", action="store_true", help="No medir la versión previa")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "tracking.txt")
+        generar_tracking(ruta, args.lineas)
+        tam = os.path.getsize(ruta) / 1e6
+        print(f"Archivo: {args.lineas:,} líneas ({tam:.1f} MB)")
+
+        seg, mem = _medir(lambda p: TrackingParser().parse_file(p), ruta)
+        print(f"Actual:   {seg:6.2f} s  pico {mem:7.1f} MB")
+
+        if not args.sin_anterior:
+            seg_ant, mem_ant = _medir(_parse_anterior, ruta)
+            print(f"Anterior: {seg_ant:6.2f} s  pico {mem_ant:7.1f} MB")
+            print(f"Mejora:   x{seg_ant / seg:.2f} en tiempo")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # Nombre de archivo: conftest.py
 # Ubicación de archivo: tests/conftest.py
 # User-provided custom instructions
+import importlib
 import sys
 import os
 from types import ModuleType
@@ -51,3 +52,36 @@ def entorno_sandy(monkeypatch):
     for k, v in REQUIRED_VARS.items():
         monkeypatch.setenv(k, os.getenv(k, v))
     yield
+
+
+@pytest.fixture(autouse=True)
+def contador_aislado(monkeypatch, tmp_path):
+    """El contador diario se escribe en ``tmp_path`` y no en ``data/``.
+
+    Algunas pruebas recargan ``sandybot.config``: la variable cubre las
+    instancias nuevas y el bucle las que ya importaron otros módulos.
+    """
+    ruta = tmp_path / "contador_diario.json"
+    monkeypatch.setenv("CONTADOR_FILE", str(ruta))
+    for nombre, modulo in list(sys.modules.items()):
+        cfg = getattr(modulo, "config", None) if nombre.startswith("sandybot") else None
+        if cfg is not None and hasattr(cfg, "ARCHIVO_CONTADOR"):
+            monkeypatch.setattr(cfg, "ARCHIVO_CONTADOR", ruta)
+
+
+@pytest.fixture(autouse=True)
+def cache_extracciones_aislada(monkeypatch, tmp_path):
+    """Cada prueba usa una cache de extracciones vacía guardada en ``tmp_path``."""
+    extractor = importlib.import_module("sandybot.extractor_correo")
+    monkeypatch.setattr(
+        extractor.config, "EXTRACCION_CACHE_FILE", tmp_path / "extracciones.json"
+    )
+    monkeypatch.setattr(extractor.cache_extracciones, "_datos", {})
+    monkeypatch.setattr(extractor.cache_extracciones, "_pendientes", 0)
+
+
+@pytest.fixture
+def sin_cache_extracciones(monkeypatch):
+    """Desactiva la cache de extracciones en la prueba que la pida."""
+    extractor = importlib.import_module("sandybot.extractor_correo")
+    monkeypatch.setattr(extractor.config, "EXTRACCION_CACHE_TTL", 0)
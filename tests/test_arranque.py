@@ -0,0 +1,41 @@
+# Nombre de archivo: test_arranque.py
+# Ubicación de archivo: tests/test_arranque.py
+# User-provided custom instructions
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+spec = importlib.util.spec_from_file_location(
+    "benchmark_arranque", ROOT_DIR / "benchmarks" / "arranque.py"
+)
+arranque = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = arranque
+spec.loader.exec_module(arranque)
+
+
+def test_parsear_importtime():
+    salida = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   _io\n"
+        "import time:       200 |        300 | sandybot.config\n"
+        "import time:        50 |        500 | sandybot.bot\n"
+    )
+    total, acumulados = arranque._parsear_importtime(salida)
+    assert total == 0.8
+    assert acumulados["_io"] == 0.1
+
+
+def test_arranque_dentro_del_presupuesto():
+    try:
+        res = arranque.medir_arranque("sandybot.bot")
+    except subprocess.CalledProcessError as exc:  # dependencias reales ausentes
+        pytest.skip(f"No se pudo importar el bot en un proceso limpio: {exc.stderr[-200:]}")
+
+    assert res.pesados == []
+    assert res.total_ms < arranque.PRESUPUESTO_MS
+    assert res.rss_mb < arranque.PRESUPUESTO_RSS_MB
@@ -0,0 +1,184 @@
+# Nombre de archivo: test_avisos.py
+# Ubicación de archivo: tests/test_avisos.py
+# User-provided custom instructions
+import asyncio
+import importlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+import tests.telegram_stub  # Registra las clases fake de telegram
+from tests.telegram_stub import Message, Update
+
+orig_create_engine = sqlalchemy.create_engine
+sqlalchemy.create_engine = lambda *a, **k: orig_create_engine("sqlite:///:memory:")
+bd = importlib.import_module("sandybot.database")
+sqlalchemy.create_engine = orig_create_engine
+bd.SessionLocal = sessionmaker(bind=bd.engine, expire_on_commit=False)
+bd.Base.metadata.create_all(bind=bd.engine)
+
+avisos = importlib.import_module("sandybot.avisos")
+outbox = importlib.import_module("sandybot.outbox")
+
+
+def _vaciar_tablas():
+    with bd.SessionLocal() as s:
+        for tabla in (
+            bd.CorreoSaliente,
+            bd.TareaServicio,
+            bd.TareaProgramada,
+            bd.Servicio,
+            bd.Cliente,
+            bd.Carrier,
+        ):
+            s.query(tabla).delete()
+        s.commit()
+
+
+@pytest.fixture(autouse=True)
+def base_limpia(monkeypatch):
+    monkeypatch.setattr(avisos, "SessionLocal", bd.SessionLocal)
+    monkeypatch.setattr(outbox, "SessionLocal", bd.SessionLocal)
+    monkeypatch.setattr(avisos, "leer_plantilla_aviso", lambda: None)
+    _vaciar_tablas()
+    yield
+    # La base en memoria la comparten otros módulos de prueba
+    _vaciar_tablas()
+
+
+def _crear_tareas(cantidad):
+    with bd.SessionLocal() as s:
+        car = bd.Carrier(nombre="TELXIUS")
+        cli = bd.Cliente(
+            nombre="Cli",
+            destinatarios=["general@x.com"],
+            destinatarios_carrier={"TELXIUS": ["noc@x.com"]},
+        )
+        viejo = bd.Cliente(nombre="Viejo", destinatarios=["viejo@x.com"])
+        s.add_all([car, cli, viejo])
+        s.commit()
+        ids_carrier, ids_cliente = car.id, cli.id
+    ids = []
+    for n in range(cantidad):
+        srv = bd.crear_servicio(
+            nombre=f"S{n}", cliente="Cli", cliente_id=ids_cliente, carrier_id=ids_carrier
+        )
+        # Servicio que solo guarda el nombre del cliente
+        srv_viejo = bd.crear_servicio(nombre=f"V{n}", cliente="Viejo")
+        tarea, _ = bd.crear_tarea_programada(
+            datetime(2024, 1, 2, 8),
+            datetime(2024, 1, 2, 10),
+            f"Mantenimiento {n}",
+            [srv.id, srv_viejo.id],
+        )
+        ids.append(tarea.id)
+    return ids
+
+
+@pytest.fixture
+def consultas():
+    """Registra los SELECT que se ejecutan durante la prueba."""
+    registro = []
+
+    def anotar(conn, cursor, sentencia, *a):
+        if sentencia.lstrip().upper().startswith("SELECT"):
+            registro.append(sentencia)
+
+    event.listen(bd.engine, "before_cursor_execute", anotar)
+    yield registro
+    event.remove(bd.engine, "before_cursor_execute", anotar)
+
+
+def test_cargar_avisos_con_pocas_consultas(consultas):
+    ids = _crear_tareas(20)
+    consultas.clear()
+    with bd.SessionLocal() as s:
+        cargados = avisos.cargar_avisos(s, ids[0], ids[-1])
+
+    assert len(cargados) == 20
+    # Tareas, servicios con cliente y carrier, clientes por nombre
+    assert len(consultas) <= 3
+    primero = cargados[0]
+    assert primero.cliente.nombre == "Cli"
+    assert primero.carrier_nombre == "TELXIUS"
+    assert [s.nombre for s in primero.servicios] == ["S0", "V0"]
+    assert "Carrier: TELXIUS" in primero.cuerpo()
+
+
+def test_enviar_avisos_encola_un_lote():
+    ids = _crear_tareas(5)
+    resultado = avisos.enviar_avisos(ids[0], ids[-1])
+
+    assert resultado.encolados == ids
+    assert not resultado.sin_cliente and not resultado.sin_destinatarios
+    with bd.SessionLocal() as s:
+        correos = s.query(bd.CorreoSaliente).order_by(bd.CorreoSaliente.id).all()
+    assert len(correos) == 5
+    # Con carrier se usan los destinatarios del par (cliente, carrier)
+    assert correos[0].destinatarios == ["noc@x.com"]
+    assert "Mantenimiento 0" in correos[0].cuerpo
+    assert correos[0].asunto == "Aviso de tarea programada - Cli"
+
+
+def test_enviar_avisos_informa_tareas_sin_cliente():
+    tarea, _ = bd.crear_tarea_programada(
+        datetime(2024, 1, 2, 8), datetime(2024, 1, 2, 10), "Mantenimiento", []
+    )
+    resultado = avisos.enviar_avisos(tarea.id, tarea.id)
+    assert resultado.sin_cliente == [tarea.id]
+    assert resultado.encolados == []
+
+
+def test_enviar_avisos_rechaza_rangos_grandes(monkeypatch):
+    monkeypatch.setattr(avisos.config, "AVISOS_MAX_TAREAS", 10)
+    with pytest.raises(ValueError):
+        avisos.enviar_avisos(1, 11)
+    with bd.SessionLocal() as s:
+        assert s.query(bd.CorreoSaliente).count() == 0
+
+
+def test_repetir_el_rango_no_duplica_avisos():
+    ids = _crear_tareas(3)
+    primero = avisos.enviar_avisos(ids[0], ids[-1])
+    segundo = avisos.enviar_avisos(ids[0], ids[-1])
+
+    assert primero.encolados == ids
+    assert segundo.encolados == [] and segundo.repetidos == ids
+    with bd.SessionLocal() as s:
+        assert s.query(bd.CorreoSaliente).count() == 3
+    # Otro rango que incluye las mismas tareas es un pedido distinto
+    assert avisos.enviar_avisos(ids[0], ids[1]).encolados == ids[:2]
+
+
+def _ejecutar_comando(monkeypatch, args):
+    handler = importlib.import_module("sandybot.handlers.avisos_tareas")
+    respuestas = []
+
+    async def responder(_msg, _uid, _texto, respuesta, _modo, **_k):
+        respuestas.append(respuesta)
+
+    monkeypatch.setattr(handler, "responder_registrando", responder)
+    update = Update(message=Message("/avisos_tareas " + " ".join(args)))
+    asyncio.run(handler.avisos_tareas(update, SimpleNamespace(args=args)))
+    return respuestas[0]
+
+
+def test_comando_informa_rango_excedido(monkeypatch):
+    monkeypatch.setattr(avisos.config, "AVISOS_MAX_TAREAS", 10)
+    respuesta = _ejecutar_comando(monkeypatch, ["1", "11"])
+    assert "supera el máximo de 10 tareas" in respuesta
+
+
+def test_comando_informa_error_de_base(monkeypatch):
+    def falla(*_a):
+        raise sqlalchemy.exc.OperationalError("SELECT", {}, Exception("caída"))
+
+    handler = importlib.import_module("sandybot.handlers.avisos_tareas")
+    monkeypatch.setattr(handler, "enviar_avisos", falla)
+    respuesta = _ejecutar_comando(monkeypatch, ["1", "2"])
+    assert "base de datos" in respuesta
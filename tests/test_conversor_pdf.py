@@ -0,0 +1,65 @@
+# Nombre de archivo: test_conversor_pdf.py
+# Ubicación de archivo: tests/test_conversor_pdf.py
+# User-provided custom instructions
+import importlib
+import stat
+import threading
+
+conversor = importlib.import_module("sandybot.conversor_pdf")
+
+
+def _soffice_falso(tmp_path, espera=0):
+    """Crea un ejecutable que imita ``soffice --convert-to pdf``."""
+    script = tmp_path / "soffice"
+    script.write_text(
+        "#!/bin/sh\n"
+        f"sleep {espera}\n"
+        'while [ "$1" != "--outdir" ]; do shift; done\n'
+        'out="$2"; src="$3"\n'
+        'base=$(basename "$src" .docx)\n'
+        'echo "%PDF-1.4" > "$out/$base.pdf"\n'
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_convierte_en_paralelo(tmp_path):
+    pool = conversor.PoolLibreOffice(_soffice_falso(tmp_path), 2, usar_uno=False)
+    rutas = []
+    for i in range(4):
+        docx = tmp_path / f"informe_{i}.docx"
+        docx.write_bytes(b"docx")
+        rutas.append(docx)
+
+    resultados = [None] * len(rutas)
+
+    def convertir(i):
+        resultados[i] = pool.convertir(rutas[i], timeout=10)
+
+    hilos = [threading.Thread(target=convertir, args=(i,)) for i in range(len(rutas))]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    pool.cerrar()
+
+    assert resultados == [str(r.with_suffix(".pdf")) for r in rutas]
+    assert all(r.with_suffix(".pdf").read_text().startswith("%PDF") for r in rutas)
+
+
+def test_timeout_devuelve_none(tmp_path):
+    pool = conversor.PoolLibreOffice(_soffice_falso(tmp_path, espera=5), 1, usar_uno=False)
+    docx = tmp_path / "lento.docx"
+    docx.write_bytes(b"docx")
+
+    assert pool.convertir(docx, timeout=0.5) is None
+    assert not docx.with_suffix(".pdf").exists()
+    pool.cerrar()
+
+
+def test_sin_libreoffice(monkeypatch, tmp_path):
+    monkeypatch.setattr(conversor, "buscar_soffice", lambda: None)
+    monkeypatch.setattr(conversor, "_pool", None)
+    docx = tmp_path / "a.docx"
+    docx.write_bytes(b"docx")
+    assert conversor.convertir_a_pdf(docx) is None
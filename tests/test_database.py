@@ -133,6 +133,77 @@ def test_actualizar_tracking_string():
         assert reg.trackings[0]["tipo"] == "complementario"
 
 
+def test_versiones_tracking(tmp_path, monkeypatch):
+    """Cada carga deja una versión comprimida y se pueden comparar."""
+    monkeypatch.setattr(bd.config, "TRACKINGS_MAX_ENTRADAS", 2, raising=False)
+    servicio = bd.crear_servicio(nombre="S8", cliente="H")
+    cargas = [["Cámara A", "B"], ["camara a", "C"], ["C", "D"]]
+    for i, camaras in enumerate(cargas):
+        ruta = tmp_path / f"t{i}.txt"
+        ruta.write_text("\n".join(camaras), encoding="utf-8")
+        bd.actualizar_tracking(servicio.id, str(ruta), camaras, [str(ruta)])
+
+    versiones = bd.listar_versiones_tracking(servicio.id)
+    assert [v.version for v in versiones] == [1, 2, 3]
+    assert versiones[1].agregadas == ["C"]
+    assert versiones[1].quitadas == ["B"]
+    assert bd.obtener_camaras_version(servicio.id, 3) == ["C", "D"]
+    assert bd.obtener_contenido_version(servicio.id, 1) == "Cámara A\nB".encode()
+
+    dif = bd.comparar_versiones_tracking(servicio.id, 1, 3)
+    assert dif == {"agregadas": ["C", "D"], "quitadas": ["Cámara A", "B"]}
+    assert bd.comparar_versiones_tracking(servicio.id, 1, 9) is None
+
+    # ``servicios.trackings`` queda acotado al límite configurado
+    with bd.SessionLocal() as s:
+        reg = s.get(bd.Servicio, servicio.id)
+        assert [t["ruta"] for t in reg.trackings] == [
+            str(tmp_path / "t1.txt"),
+            str(tmp_path / "t2.txt"),
+        ]
+
+
+def test_archivar_tracking_sin_copia_duplicada(tmp_path, monkeypatch):
+    """El tracking anterior solo va al histórico si la base no lo tiene."""
+    monkeypatch.setattr(bd.config, "HISTORICO_DIR", tmp_path / "hist", raising=False)
+    monkeypatch.setattr(bd.config, "TRACKING_HISTORICO_TXT", False, raising=False)
+    (tmp_path / "hist").mkdir()
+    servicio = bd.crear_servicio(nombre="S9", cliente="H")
+    ruta = tmp_path / f"tracking_{servicio.id}.txt"
+
+    # Archivo previo a ``tracking_versiones``: se conserva en el histórico
+    ruta.write_text("viejo", encoding="utf-8")
+    archivado = bd.archivar_tracking_anterior(servicio.id, ruta)
+    assert archivado and Path(archivado).read_text(encoding="utf-8") == "viejo"
+
+    # Ya comprimido en la base: se borra sin copiarlo
+    ruta.write_text("nuevo", encoding="utf-8")
+    bd.actualizar_tracking(servicio.id, str(ruta), ["A"], [str(ruta)])
+    assert bd.archivar_tracking_anterior(servicio.id, ruta) is None
+    assert not ruta.exists()
+    assert len(list((tmp_path / "hist").iterdir())) == 1
+
+
+def test_version_tracking_concurrente(monkeypatch):
+    """Si otra carga tomó el mismo número de versión se reintenta."""
+    servicio = bd.crear_servicio(nombre="S10", cliente="H")
+    bd.actualizar_tracking(servicio.id, camaras=["A"])
+
+    original = bd._siguiente_version
+    llamadas = []
+
+    def desactualizada(session, id_servicio):
+        llamadas.append(id_servicio)
+        # La primera vez devuelve un número ya usado, como si leyera antes del commit ajeno
+        return 1 if len(llamadas) == 1 else original(session, id_servicio)
+
+    monkeypatch.setattr(bd, "_siguiente_version", desactualizada)
+    bd.actualizar_tracking(servicio.id, camaras=["A", "B"])
+
+    assert [v.version for v in bd.listar_versiones_tracking(servicio.id)] == [1, 2]
+    assert len(llamadas) == 2
+
+
 def test_crear_ingreso():
     servicio = bd.crear_servicio(nombre="S5", cliente="E")
     fecha = datetime(2023, 1, 1, 12, 30)
@@ -151,6 +151,46 @@ def test_enviar_tracking_reciente_por_correo(tmp_path):
     assert reg["sent"] is True
 
 
+def test_tracking_reciente_desde_base(tmp_path, monkeypatch):
+    """La ruta se toma del índice que se actualiza en cada carga."""
+    monkeypatch.setattr(email_utils.config, "HISTORICO_DIR", tmp_path)
+    monkeypatch.setattr(bd.config, "HISTORICO_DIR", tmp_path)
+    servicio = bd.crear_servicio(nombre="Hist", cliente="H")
+    archivada = tmp_path / f"tracking_{servicio.id}_20240101_000000.txt"
+    archivada.write_text("A")
+    actual = tmp_path.parent / f"tracking_{servicio.id}.txt"
+    actual.write_text("B")
+    bd.actualizar_tracking(
+        servicio.id, str(actual), ["B"], [str(archivada), str(actual)]
+    )
+
+    def sin_glob(*a, **k):
+        raise AssertionError("no debería recorrer el histórico")
+
+    monkeypatch.setattr(email_utils, "_buscar_tracking_historico", sin_glob)
+    assert email_utils.obtener_tracking_reciente(servicio.id) == str(actual)
+
+
+def test_tracking_reciente_repara_el_indice(tmp_path, monkeypatch):
+    """Un servicio sin índice se resuelve una vez por la carpeta y queda registrado."""
+    monkeypatch.setattr(email_utils.config, "HISTORICO_DIR", tmp_path)
+    servicio = bd.crear_servicio(nombre="Legado", cliente="H")
+    archivada = tmp_path / f"tracking_{servicio.id}_20240101_000000.txt"
+    archivada.write_text("A")
+
+    buscar = email_utils._buscar_tracking_historico
+    llamadas = []
+
+    def contar(id_servicio):
+        llamadas.append(id_servicio)
+        return buscar(id_servicio)
+
+    monkeypatch.setattr(email_utils, "_buscar_tracking_historico", contar)
+    assert email_utils.obtener_tracking_reciente(servicio.id) == str(archivada)
+    assert email_utils.obtener_tracking_reciente(servicio.id) == str(archivada)
+    assert len(llamadas) == 1
+
+
 def test_procesar_correo_fecha_dia_mes(tmp_path):
     """La tarea se registra con fechas en formato dia/mes/año."""
 
@@ -476,6 +516,74 @@ def test_procesar_correo_sin_servicios(monkeypatch, caplog):
     assert ids_pend == []
 
 
+def _gpt_contado(monkeypatch):
+    """Reemplaza GPT por una respuesta fija y devuelve la lista de consultas."""
+    consultas = []
+
+    class GPTStub(email_utils.gpt.__class__):
+        async def consultar_gpt(self, mensaje: str, cache: bool = True) -> str:
+            consultas.append(mensaje)
+            return (
+                '{"inicio": "2024-03-02T08:00:00", "fin": "2024-03-02T10:00:00", '
+                '"tipo": "Mant", "afectacion": null, "descripcion": null, '
+                '"ids": ["777777"]}'
+            )
+
+        async def procesar_json_response(self, resp, schema):
+            import json
+
+            return json.loads(resp)
+
+    monkeypatch.setattr(email_utils, "gpt", GPTStub())
+    return consultas
+
+
+CORREO_ACME = "Carrier: ACME\nAviso IDACME42 reenviado\n\nAviso legal: texto confidencial"
+
+
+def test_cache_de_extraccion_evita_gpt(tmp_path, monkeypatch):
+    """Un correo reenviado se registra sin volver a consultar a GPT."""
+    extractor = importlib.import_module("sandybot.extractor_correo")
+    monkeypatch.setattr(extractor.config, "EXTRACCION_CACHE_TTL", 3600)
+    monkeypatch.setattr(extractor.config, "GPT_CACHE_SAVE_INTERVAL", 1)
+    consultas = _gpt_contado(monkeypatch)
+
+    correo = CORREO_ACME
+    tarea1, nueva1, _, _ = asyncio.run(
+        email_utils.procesar_correo_a_tarea(correo, "Cli", generar_msg=False)
+    )
+    # Otro reenvío: cambia lo que sigue al aviso legal, no el texto limpio
+    tarea2, nueva2, _, _ = asyncio.run(
+        email_utils.procesar_correo_a_tarea(
+            "  " + correo.replace("confidencial", "privado"), "Cli", generar_msg=False
+        )
+    )
+    assert len(consultas) == 1
+    assert (nueva1, nueva2) == (True, False)
+    assert tarea1.id == tarea2.id
+    assert (tmp_path / "extracciones.json").exists()
+
+    # Con otro carrier forzado el resultado puede cambiar: no se reutiliza
+    asyncio.run(
+        email_utils.procesar_correo_a_tarea(correo, "Cli", "OTRO", generar_msg=False)
+    )
+    assert len(consultas) == 2
+
+    # Un análisis equivocado se descarta y el próximo reenvío vuelve a GPT
+    assert extractor.cache_extracciones.descartar("idacme42") == 2
+    asyncio.run(email_utils.procesar_correo_a_tarea(correo, "Cli", generar_msg=False))
+    assert len(consultas) == 3
+
+
+def test_sin_cache_de_extraccion_siempre_consulta(monkeypatch, sin_cache_extracciones):
+    consultas = _gpt_contado(monkeypatch)
+    for _ in range(2):
+        asyncio.run(
+            email_utils.procesar_correo_a_tarea(CORREO_ACME, "Cli", generar_msg=False)
+        )
+    assert len(consultas) == 2
+
+
 def test_procesar_correo_respuesta_con_texto(monkeypatch):
     """Extrae JSON aunque venga acompañado de texto."""
 
@@ -547,6 +655,76 @@ def test_detectar_carrier_por_remitente():
     assert email_utils.detectar_carrier_por_remitente("otro@ejemplo.com") is None
 
 
+def test_carrier_nuevo_por_configuracion(tmp_path, monkeypatch):
+    """Un carrier agregado al JSON se detecta sin tocar el código."""
+    import json
+
+    carriers = importlib.import_module("sandybot.carriers")
+    archivo = tmp_path / "carriers.json"
+    archivo.write_text(
+        json.dumps(
+            {
+                "carriers": [
+                    {
+                        "nombre": "SILICA",
+                        "remitentes": [r"silica\.(?:net|com)"],
+                        "id_interno": r"SIL-\d{5}",
+                        "servicio": r"SN\d{6}",
+                        "formatos_fecha": ["%d.%m.%Y %H:%M"],
+                    }
+                ]
+            }
+        )
+    )
+    try:
+        with monkeypatch.context() as m:
+            m.setattr(carriers.config, "ARCHIVO_CARRIERS", archivo)
+            carriers.recargar_registro()
+            datos = email_utils._detectar_datos_correo(
+                "From: NOC <noc@silica.net>\nAviso SIL-12345\nServicios SN123456 y SN654321"
+            )
+            assert datos["carrier"] == "SILICA"
+            assert datos["id_interno"] == "SIL-12345"
+            assert datos["ids"] == ["SN123456", "SN654321"]
+            perfil = carriers.obtener_registro().obtener("silica")
+            assert perfil.formatos_fecha[0] == "%d.%m.%Y %H:%M"
+            assert perfil.filtrar_ids(["SN123456", "123456"]) == (["SN123456"], ["123456"])
+            # El genérico conserva los IDs no numéricos y descarta los cortos
+            generico = carriers.obtener_registro().obtener(None)
+            assert generico.filtrar_ids(["1234", "123456", "ABC-1"]) == (
+                ["123456", "ABC-1"],
+                ["1234"],
+            )
+    finally:
+        # Fuera del contexto vuelve el archivo original
+        carriers.recargar_registro()
+
+
+def test_extraccion_sin_gpt_para_plantilla_conocida(monkeypatch):
+    """Un aviso con tabla conocida no consulta a GPT y se contabiliza."""
+
+    class GPTStub(email_utils.gpt.__class__):
+        async def consultar_gpt(self, mensaje: str, cache: bool = True) -> str:
+            raise AssertionError("no debería consultarse GPT")
+
+    monkeypatch.setattr(email_utils, "gpt", GPTStub())
+    email_utils.metricas.reiniciar()
+    texto = (
+        "From: NOC <noc@telxius.com>\n"
+        "Planned Work SWX0030940\n"
+        "Start Time | End Time | Type\n"
+        "Jan 2, 2024 8:00 AM | Jan 2, 2024 11:30 AM | Fiber repair\n"
+        "Affected services: CRT-008785"
+    )
+    extraida = asyncio.run(email_utils.extraer_tarea_correo(texto))
+    assert extraida.carrier_nombre == "TELXIUS"
+    assert extraida.inicio == datetime(2024, 1, 2, 8, 0)
+    assert extraida.fin == datetime(2024, 1, 2, 11, 30)
+    assert extraida.ids == ["CRT-008785"]
+    assert extraida.id_interno == "SWX0030940"
+    assert email_utils.metricas.tasa_gpt("TELXIUS") == 0.0
+
+
 def test_ids_ignetwork(tmp_path):
     """Filtra IDs del tipo MTR.xxxx.yyyy."""
 
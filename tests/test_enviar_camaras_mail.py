@@ -43,14 +43,14 @@ def _importar(tmp_path):
 
     email_stub = ModuleType("sandybot.email_utils")
 
-    def enviar_excel_por_correo(dest, ruta_excel, *, asunto="Reporte SandyBot", cuerpo="Adjunto el archivo Excel."):
+    def encolar_excel_por_correo(dest, ruta_excel, *, asunto="Reporte SandyBot", cuerpo="Adjunto el archivo Excel."):
         registros["dest"] = dest
         registros["ruta"] = ruta_excel
         registros["asunto"] = asunto
         registros["cuerpo"] = cuerpo
         return True
 
-    email_stub.enviar_excel_por_correo = enviar_excel_por_correo
+    email_stub.encolar_excel_por_correo = encolar_excel_por_correo
     sys.modules["sandybot.email_utils"] = email_stub
 
     mod_name = f"{pkg}.enviar_camaras_mail"
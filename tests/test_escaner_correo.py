@@ -0,0 +1,60 @@
+# Nombre de archivo: test_escaner_correo.py
+# Ubicación de archivo: tests/test_escaner_correo.py
+# User-provided custom instructions
+import importlib
+
+import tests.telegram_stub  # Registra las clases fake de telegram
+
+carriers = importlib.import_module("sandybot.carriers")
+
+REGISTRO = carriers.RegistroCarriers(
+    [
+        {
+            "nombre": "TELXIUS",
+            "remitentes": ["telxius"],
+            "id_interno": r"SWX\d{7}",
+            "servicio": r"CRT-\d{6}",
+        },
+        {
+            "nombre": "IGNETWORK",
+            "remitentes": ["ignetwork"],
+            "id_interno": r"MTR\.\d{4,6}\.[A0]\d+",
+            "servicio": r"MTR\.\d{4,6}\.[A0]\d+",
+        },
+    ]
+)
+
+
+def test_una_pasada_detecta_todo():
+    texto = (
+        "Subject: TELXIUS - METROTEL - EMERGENCY\n"
+        "   \n"
+        "From: NOC Telxius <noc@telxius.com> CRT-000001\n"
+        "Ticket SWX0030940 del 12/06 a las 11:00\n"
+        "Servicios: CRT-008785, CRT-008785, CRT-008786\n"
+        "Aviso legal: este mensaje es confidencial CRT-999999\n"
+        "Más texto que no debe leerse"
+    )
+    escaneo = REGISTRO.escanear(texto)
+    assert escaneo.carrier == "TELXIUS"
+    assert escaneo.asunto == "TELXIUS - METROTEL - EMERGENCY"
+    assert escaneo.tipo == "Emergencia"
+    assert escaneo.id_interno == "SWX0030940"
+    # El ID en la línea From también cuenta; el aviso legal corta la pasada
+    assert escaneo.ids == ["CRT-000001", "CRT-008785", "CRT-008786"]
+    assert escaneo.texto_limpio.splitlines()[-1].startswith("Servicios:")
+
+
+def test_mismo_patron_para_id_y_servicio():
+    escaneo = REGISTRO.escanear("From: ops@ignetwork.net\nCorte MTR.1234.A001")
+    assert escaneo.carrier == "IGNETWORK"
+    assert escaneo.id_interno == "MTR.1234.A001"
+    assert escaneo.ids == ["MTR.1234.A001"]
+
+
+def test_generico_sin_numeros_cortos():
+    texto = "Carrier: ACME\nVentana 2 de 3, 45 minutos, 10/01 a las 08:00\nServicio 7654321"
+    escaneo = REGISTRO.escanear(texto)
+    assert escaneo.carrier is None
+    assert escaneo.carrier_declarado == "ACME"
+    assert escaneo.ids == ["7654321"]
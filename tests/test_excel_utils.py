@@ -0,0 +1,68 @@
+# Nombre de archivo: test_excel_utils.py
+# Ubicación de archivo: tests/test_excel_utils.py
+# User-provided custom instructions
+import importlib
+
+import openpyxl
+import pytest
+
+excel_utils = importlib.import_module("sandybot.excel_utils")
+
+
+@pytest.mark.parametrize("motor", ["xlsxwriter", "openpyxl"])
+def test_escribir_excel(tmp_path, monkeypatch, motor):
+    if motor == "openpyxl":
+        monkeypatch.setattr(excel_utils, "xlsxwriter", None)
+    elif excel_utils.xlsxwriter is None:
+        pytest.skip("xlsxwriter no está instalado")
+
+    ruta = tmp_path / "salida.xlsx"
+    filas = ((f"Camara {i}", str(i)) for i in range(3))
+    excel_utils.escribir_excel(
+        str(ruta),
+        [
+            excel_utils.Hoja("Datos", ["camara", "distancia"], filas),
+            excel_utils.Hoja("datos", ["x"], [[1], [], ["=SUMA(A1)"]]),
+        ],
+    )
+
+    libro = openpyxl.load_workbook(ruta)
+    assert libro.sheetnames == ["Datos", "datos (2)"]
+    assert list(libro["Datos"].values) == [
+        ("camara", "distancia"),
+        ("Camara 0", "0"),
+        ("Camara 1", "1"),
+        ("Camara 2", "2"),
+    ]
+    assert libro["Datos"]["A1"].font.bold
+    # Las filas vacías dejan un renglón en blanco y el texto no se convierte en fórmula
+    assert libro["datos (2)"]["A3"].value is None
+    celda = libro["datos (2)"]["A4"]
+    assert celda.value == "=SUMA(A1)"
+    assert celda.data_type == "s"
+
+
+@pytest.mark.parametrize("motor", ["calamine", None])
+def test_leer_excel_columnas_y_encabezado(tmp_path, monkeypatch, motor):
+    pd = pytest.importorskip("pandas")
+    if motor and excel_utils.MOTOR_LECTURA is None:
+        pytest.skip("python-calamine no está instalado")
+    monkeypatch.setattr(excel_utils, "MOTOR_LECTURA", motor)
+    excel_utils._encabezados.clear()
+
+    ruta = tmp_path / "reclamos.xlsx"
+    pd.DataFrame(
+        {"Número  Reclamo": [1, 2], "Otra": ["x", "y"], "Tipo Solución": ["a", "b"]}
+    ).to_excel(ruta, index=False)
+
+    assert excel_utils.leer_encabezado(str(ruta)) == ["Número  Reclamo", "Otra", "Tipo Solución"]
+
+    # La carga reutiliza el encabezado recordado en lugar de volver a leerlo
+    lecturas = []
+    original = pd.read_excel
+    monkeypatch.setattr(pd, "read_excel", lambda *a, **k: lecturas.append(k) or original(*a, **k))
+    df = excel_utils.leer_excel(str(ruta), ["numero reclamo", "TIPO SOLUCION"])
+
+    assert list(df.columns) == ["Número  Reclamo", "Tipo Solución"]
+    assert df["Número  Reclamo"].tolist() == [1, 2]
+    assert all("nrows" not in k for k in lecturas)
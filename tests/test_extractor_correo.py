@@ -0,0 +1,123 @@
+# Nombre de archivo: test_extractor_correo.py
+# Ubicación de archivo: tests/test_extractor_correo.py
+# User-provided custom instructions
+import importlib
+from datetime import datetime
+
+import pytest
+
+import tests.telegram_stub  # Registra las clases fake de telegram
+
+extractor = importlib.import_module("sandybot.extractor_correo")
+carriers = importlib.import_module("sandybot.carriers")
+
+
+@pytest.fixture
+def registro():
+    return carriers.RegistroCarriers(
+        [{"nombre": "TELXIUS", "remitentes": ["telxius"], "servicio": r"CRT-\d{6}"}]
+    )
+
+
+@pytest.mark.parametrize(
+    "valor",
+    [
+        "02/01/2024 08:00",
+        "2024-01-02T08:00:00",
+        "2 de enero de 2024 08:00 hs",
+        "Tuesday, January 2, 2024 8:00 AM (UTC)",
+        "02 Jan 2024 08h00",
+        "terça-feira, 2 de janeiro de 2024 08:00",
+    ],
+)
+def test_fechas_multilingues(valor, registro):
+    fecha = extractor.parsear_fecha(valor, registro.generico.formatos_fecha)
+    assert fecha == datetime(2024, 1, 2, 8, 0)
+
+
+def test_tabla_con_separadores(registro):
+    texto = (
+        "Planned Work SWX0030940\n"
+        "Start Time (UTC) | End Time (UTC) | Type\n"
+        "02-Jan-2024 08:00 | 02-Jan-2024 10:00 | Fiber repair\n"
+        "Affected services: CRT-008785, CRT-008786"
+    )
+    datos = extractor.extraer_por_plantilla(texto, registro.obtener("TELXIUS"))
+    assert datos["inicio"] == "2024-01-02T08:00:00"
+    assert datos["fin"] == "2024-01-02T10:00:00"
+    assert datos["tipo"] == "Fiber repair"
+    assert datos["ids"] == ["CRT-008785", "CRT-008786"]
+
+
+def test_tabla_html_con_ventana_nocturna(registro):
+    # Así queda una tabla HTML pasada a texto: una celda por línea
+    texto = "\n".join(
+        [
+            "Fecha", "Horario", "Tipo",
+            "02/01/2024", "23:00 a 03:00", "Mantenimiento",
+            "Servicio", "Ubicación",
+            "123456", "Cámara 1",
+            "654321", "Cámara 2",
+            "Saludos",
+        ]
+    )
+    datos = extractor.extraer_por_plantilla(texto, registro.generico)
+    assert datos["inicio"] == "2024-01-02T23:00:00"
+    assert datos["fin"] == "2024-01-03T03:00:00"
+    assert datos["ids"] == ["123456", "654321"]
+
+
+def test_fecha_de_encabezado_citado_no_es_la_de_la_tarea(registro):
+    texto = (
+        "Date: Tue, 2 Jan 2024 10:15:00 +0000\n"
+        "Window: 01:00 - 05:00 UTC\n"
+        "Circuit ID: 7654321"
+    )
+    # Sin fecha propia del aviso se deja que decida GPT
+    assert extractor.extraer_por_plantilla(texto, registro.generico) is None
+
+
+def test_aviso_reenviado_ignora_los_encabezados(registro):
+    texto = (
+        "---------- Forwarded message ---------\n"
+        "From: NOC <noc@carrier.com>\n"
+        "Date: Tue, 2 Jan 2024 10:15:00 +0000\n"
+        "To: ops@sandy.com\n"
+        "Subject: Mantenimiento programado\n"
+        "\n"
+        "Fecha: 05/01/2024\n"
+        "Window: 01:00 - 05:00 UTC\n"
+        "Circuit ID: 7654321"
+    )
+    datos = extractor.extraer_por_plantilla(texto, registro.generico)
+    assert datos["inicio"] == "2024-01-05T01:00:00"
+    assert datos["fin"] == "2024-01-05T05:00:00"
+    assert datos["ids"] == ["7654321"]
+
+
+def test_tabla_con_varias_filas_de_servicios(registro):
+    texto = (
+        "Inicio | Fin | Servicio\n"
+        "02/01/2024 08:00 | 02/01/2024 10:00 | 111111\n"
+        "| | 222222\n"
+        "| | 333333\n"
+        "\n"
+        "Referencia interna 444444"
+    )
+    datos = extractor.extraer_por_plantilla(texto, registro.generico)
+    assert datos["inicio"] == "2024-01-02T08:00:00"
+    # La línea en blanco cierra la lista de servicios
+    assert datos["ids"] == ["111111", "222222", "333333"]
+
+
+def test_sin_datos_suficientes(registro):
+    assert extractor.extraer_por_plantilla("Hola, mañana hay corte", registro.generico) is None
+
+
+def test_metricas_por_carrier():
+    m = extractor.MetricasExtraccion()
+    m.registrar("telxius", uso_gpt=False)
+    m.registrar("TELXIUS", uso_gpt=True)
+    m.registrar(None, uso_gpt=True)
+    assert m.tasa_gpt("Telxius") == 0.5
+    assert m.resumen()["N/D"] == {"correos": 1, "gpt": 1, "tasa_gpt": 1.0}
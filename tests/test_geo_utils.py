@@ -0,0 +1,61 @@
+# Nombre de archivo: test_geo_utils.py
+# Ubicación de archivo: tests/test_geo_utils.py
+# User-provided custom instructions
+import importlib
+
+import numpy as np
+import pytest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+geo_utils = importlib.import_module("sandybot.geo_utils")
+teselas = importlib.import_module("sandybot.teselas")
+
+
+def _sin_red(monkeypatch, tmp_path):
+    """Configura la cache de teselas en modo sin conexión (también para hijos)."""
+    monkeypatch.setenv("TILES_OFFLINE", "true")
+    monkeypatch.setenv("TILES_DIR", str(tmp_path / "tiles"))
+    monkeypatch.setattr(
+        teselas, "_cache", teselas.CacheTeselas(tmp_path / "tiles", "", 10**9, True)
+    )
+
+
+def test_extraer_coordenada():
+    assert geo_utils.extraer_coordenada("geo: 34.6, 58.4") == (-34.6, -58.4)
+    assert geo_utils.extraer_coordenada("sin datos") is None
+
+
+def test_renderizar_mapas_en_orden(monkeypatch, tmp_path):
+    _sin_red(monkeypatch, tmp_path)
+    trabajos = [
+        ([(-34.60, -58.40)], [1]),
+        ([(-34.61, -58.41), (-34.62, -58.43)], [1, 2]),
+        ([(-34.70, -58.50)], [3]),
+    ]
+    esperados = [geo_utils.generar_mapa_png(p, i) for p, i in trabajos]
+
+    monkeypatch.setattr(geo_utils.config, "MAP_WORKERS", 2)
+    try:
+        obtenidos = geo_utils.renderizar_mapas(trabajos)
+    finally:
+        geo_utils.cerrar_pool_mapas()
+
+    assert all(png.startswith(b"\x89PNG") for png in obtenidos)
+    assert obtenidos == esperados
+
+
+def test_proyeccion_igual_a_geopandas():
+    gpd = pytest.importorskip("geopandas")
+    from shapely.geometry import Point
+
+    puntos = [(-34.6037, -58.3816), (-34.9205, -57.9536), (-34.45, -58.9)]
+    xs, ys = geo_utils.proyectar_web_mercator(puntos)
+    gdf = gpd.GeoDataFrame(
+        geometry=[Point(lon, lat) for lat, lon in puntos], crs="EPSG:4326"
+    ).to_crs(epsg=3857)
+
+    assert np.allclose(xs, gdf.geometry.x, rtol=0, atol=1e-6)
+    assert np.allclose(ys, gdf.geometry.y, rtol=0, atol=1e-6)
@@ -0,0 +1,123 @@
+# Nombre de archivo: test_lector_msg.py
+# Ubicación de archivo: tests/test_lector_msg.py
+# User-provided custom instructions
+import asyncio
+import importlib
+import sys
+from types import ModuleType
+
+import pytest
+
+lector_msg = importlib.import_module("sandybot.lector_msg")
+
+HTML = (
+    "<html><head><title>Aviso</title><style>p { color: red }</style></head>"
+    "<body><p>Inicio: <b>02/01/2024</b></p><!-- nota -->"
+    "<script>var x = 1;</script><table><tr><td>123</td><td>456</td></tr></table>"
+    "</body></html>"
+)
+
+
+def _lineas(texto):
+    return [l.strip() for l in texto.splitlines() if l.strip()]
+
+
+def test_html_a_texto_igual_que_bs4():
+    bs4 = pytest.importorskip("bs4")
+    esperado = _lineas(bs4.BeautifulSoup(HTML, "html.parser").get_text("\n"))
+    # bs4 conserva el contenido de <style>/<script>; el lector lo descarta
+    esperado = [l for l in esperado if "color" not in l and "var x" not in l]
+    assert _lineas(lector_msg.html_a_texto(HTML)) == esperado
+
+
+def _leer_con(monkeypatch, tmp_path, clase):
+    stub = ModuleType("extract_msg")
+    stub.Message = clase
+    monkeypatch.setitem(sys.modules, "extract_msg", stub)
+    arch = tmp_path / "mail.msg"
+    arch.write_text("x")
+    return lector_msg.leer_msg(str(arch))
+
+
+def test_leer_msg_html(tmp_path, monkeypatch):
+    """Convierte htmlBody a texto plano."""
+
+    class MsgHTML:
+        def __init__(self, path):
+            self.subject = "A"
+            self.body = ""
+            self.htmlBody = "<html><body>hola <b>mundo</b></body></html>"
+            self.rtfBody = ""
+
+        def close(self):
+            pass
+
+    texto = _leer_con(monkeypatch, tmp_path, MsgHTML)
+    assert "hola" in texto and "mundo" in texto
+
+
+def test_leer_msg_bytes(tmp_path, monkeypatch):
+    """Soporta cuerpos en bytes."""
+
+    class MsgBytes:
+        def __init__(self, path):
+            self.subject = b"A"
+            self.body = b"cuerpo bytes"
+            self.htmlBody = b""
+            self.rtfBody = b""
+
+        def close(self):
+            pass
+
+    texto = _leer_con(monkeypatch, tmp_path, MsgBytes)
+    assert "cuerpo bytes" in texto
+
+
+def test_pool_lee_avisos_en_texto(tmp_path):
+    rutas = []
+    for i in range(3):
+        ruta = tmp_path / f"aviso{i}.txt"
+        ruta.write_text(f"Servicios afectados: {i}", encoding="utf-8")
+        rutas.append(str(ruta))
+    html = tmp_path / "aviso.html"
+    html.write_text(HTML, encoding="utf-8")
+    rutas.append(str(html))
+
+    async def leer():
+        return await asyncio.gather(*(lector_msg.leer_msg_async(r, 2) for r in rutas))
+
+    try:
+        textos = asyncio.run(leer())
+    finally:
+        lector_msg.cerrar_pool()
+    if not any(textos):
+        pytest.skip("extract_msg no instalado")
+    assert textos[:3] == [f"Servicios afectados: {i}" for i in range(3)]
+    assert "123" in textos[3] and "<td>" not in textos[3]
+
+
+@pytest.mark.parametrize(
+    "nombre, contenido, esperado",
+    [
+        ("aviso.txt", b"Servicio 123", "Servicio 123"),
+        ("adjunto", b"Servicio 456", "Servicio 456"),  # Telegram, sin extensión
+        ("roto.msg", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\0" * 64, ""),
+        ("informe.pdf", b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj", ""),
+        ("avisos.zip", b"PK\x03\x04\x14\x00\x00\x00", ""),
+    ],
+)
+def test_leer_msg_solo_usa_texto_plano_si_lo_es(
+    tmp_path, monkeypatch, nombre, contenido, esperado
+):
+    """Un MSG dañado o un binario no se manda como texto a GPT."""
+
+    class MsgInvalido:
+        def __init__(self, path):
+            raise ValueError("no es un archivo OLE")
+
+    stub = ModuleType("extract_msg")
+    stub.Message = MsgInvalido
+    monkeypatch.setitem(sys.modules, "extract_msg", stub)
+    arch = tmp_path / nombre
+    arch.write_bytes(contenido)
+    assert lector_msg.leer_msg(str(arch)) == esperado
@@ -0,0 +1,178 @@
+# Nombre de archivo: test_outbox.py
+# Ubicación de archivo: tests/test_outbox.py
+# User-provided custom instructions
+import asyncio
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+from sqlalchemy.orm import sessionmaker
+
+import tests.telegram_stub  # Registra las clases fake de telegram
+
+orig_create_engine = sqlalchemy.create_engine
+sqlalchemy.create_engine = lambda *a, **k: orig_create_engine("sqlite:///:memory:")
+bd = importlib.import_module("sandybot.database")
+sqlalchemy.create_engine = orig_create_engine
+bd.SessionLocal = sessionmaker(bind=bd.engine, expire_on_commit=False)
+bd.Base.metadata.create_all(bind=bd.engine)
+
+outbox = importlib.import_module("sandybot.outbox")
+
+
+@pytest.fixture(autouse=True)
+def bandeja_vacia(monkeypatch):
+    monkeypatch.setattr(outbox, "SessionLocal", bd.SessionLocal)
+    monkeypatch.setattr(outbox.config, "OUTBOX_MAX_INTENTOS", 3, raising=False)
+    monkeypatch.setattr(outbox.config, "OUTBOX_BACKOFF_BASE", 60, raising=False)
+    monkeypatch.setattr(outbox.config, "OUTBOX_BACKOFF_MAX", 3600, raising=False)
+    with bd.SessionLocal() as s:
+        s.query(bd.CorreoSaliente).delete()
+        s.commit()
+
+
+def _vencer_todos():
+    with bd.SessionLocal() as s:
+        for c in s.query(bd.CorreoSaliente):
+            c.proximo_intento = datetime.utcnow() - timedelta(seconds=1)
+        s.commit()
+
+
+def test_encolar_y_enviar_con_adjunto(tmp_path):
+    ruta = tmp_path / "c.xlsx"
+    ruta.write_bytes(b"excel")
+    id_correo = outbox.encolar(["a@x.com"], "Asunto", "Cuerpo", adjunto=ruta)
+    ruta.unlink()  # el handler puede borrar el archivo enseguida
+
+    enviados = []
+    assert outbox.enviar_pendientes(enviar=enviados.append) == 1
+    msg = enviados[0]
+    assert msg["To"] == "a@x.com"
+    adjunto = next(msg.iter_attachments())
+    assert adjunto.get_filename() == "c.xlsx"
+    assert adjunto.get_content() == b"excel"
+    with bd.SessionLocal() as s:
+        assert s.get(bd.CorreoSaliente, id_correo).estado == "enviado"
+    # No se reenvía en la siguiente pasada
+    assert outbox.enviar_pendientes(enviar=enviados.append) == 0
+
+
+def test_clave_de_idempotencia():
+    a = outbox.encolar(["a@x.com"], "Aviso", "X", clave="aviso-tarea-1")
+    b = outbox.encolar(["a@x.com"], "Aviso", "X", clave="aviso-tarea-1")
+    c = outbox.encolar(["a@x.com"], "Aviso", "Y", clave="aviso-tarea-1")
+    d = outbox.encolar(["a@x.com"], "Aviso", "X")
+    assert a == b
+    assert len({a, c, d}) == 3
+
+
+def test_encolar_lote_respeta_claves():
+    previo = outbox.encolar(["a@x.com"], "Aviso", "X", clave="aviso-tarea-1")
+    ids = outbox.encolar_lote(
+        [
+            (["a@x.com"], "Aviso", "X", "aviso-tarea-1"),
+            (["b@x.com"], "Aviso", "Y", None),
+            ([], "Aviso", "Z", None),
+        ]
+    )
+    assert ids[0] == previo
+    assert ids[1] is not None and ids[1] != previo
+    assert ids[2] is None
+    with bd.SessionLocal() as s:
+        assert s.query(bd.CorreoSaliente).count() == 2
+
+
+def _marcar_fallido(id_correo):
+    with bd.SessionLocal() as s:
+        correo = s.get(bd.CorreoSaliente, id_correo)
+        correo.estado = "fallido"
+        correo.intentos = 3
+        correo.ultimo_error = "servidor caído"
+        correo.proximo_intento = datetime.utcnow() + timedelta(hours=1)
+        s.commit()
+
+
+@pytest.mark.parametrize("lote", [False, True])
+def test_clave_repetida_reactiva_fallidos(lote):
+    previo = outbox.encolar(["a@x.com"], "Aviso", "X", clave="aviso-tarea-1")
+    enviado = outbox.encolar(["b@x.com"], "Aviso", "Y", clave="aviso-tarea-2")
+    assert outbox.enviar_pendientes(enviar=lambda m: None) == 2
+    _marcar_fallido(previo)
+
+    if lote:
+        ids = outbox.encolar_lote(
+            [
+                (["a@x.com"], "Aviso", "X", "aviso-tarea-1"),
+                (["b@x.com"], "Aviso", "Y", "aviso-tarea-2"),
+            ]
+        )
+    else:
+        ids = [
+            outbox.encolar(["a@x.com"], "Aviso", "X", clave="aviso-tarea-1"),
+            outbox.encolar(["b@x.com"], "Aviso", "Y", clave="aviso-tarea-2"),
+        ]
+
+    assert ids == [previo, enviado]
+    with bd.SessionLocal() as s:
+        correo = s.get(bd.CorreoSaliente, previo)
+        assert correo.estado == "pendiente"
+        assert correo.intentos == 0 and correo.ultimo_error is None
+        # Los ya enviados no se reenvían
+        assert s.get(bd.CorreoSaliente, enviado).estado == "enviado"
+    assert outbox.enviar_pendientes(enviar=lambda m: None) == 1
+
+
+def test_reintentos_exponenciales_y_fallidos():
+    id_correo = outbox.encolar(["a@x.com"], "Asunto", "Cuerpo")
+
+    def falla(_msg):
+        raise ConnectionError("servidor caído")
+
+    esperas = []
+    for _ in range(3):
+        antes = datetime.utcnow()
+        assert outbox.enviar_pendientes(enviar=falla) == 0
+        with bd.SessionLocal() as s:
+            correo = s.get(bd.CorreoSaliente, id_correo)
+            esperas.append((correo.proximo_intento - antes).total_seconds())
+        _vencer_todos()
+
+    with bd.SessionLocal() as s:
+        correo = s.get(bd.CorreoSaliente, id_correo)
+        assert correo.estado == "fallido"
+        assert correo.intentos == 3
+        assert "servidor caído" in correo.ultimo_error
+    assert 59 <= esperas[0] <= 61 and 119 <= esperas[1] <= 121
+
+    # Cola de correos muertos y reintento manual
+    assert [c.id for c in bd.obtener_correos_fallidos()] == [id_correo]
+    assert bd.reintentar_correo(id_correo) is True
+    assert outbox.enviar_pendientes(enviar=lambda m: None) == 1
+    assert bd.obtener_correos_fallidos() == []
+
+
+def test_trabajador_envia_al_despertar(monkeypatch):
+    enviados = []
+    monkeypatch.setattr(outbox, "_enviar_smtp", enviados.append)
+
+    async def escenario():
+        await outbox.iniciar_trabajador()
+        outbox._trabajador.intervalo = 60
+        await asyncio.sleep(0.05)
+        outbox.encolar(["a@x.com"], "Asunto", "Cuerpo")
+        for _ in range(100):
+            if enviados:
+                break
+            await asyncio.sleep(0.02)
+        await outbox.detener_trabajador()
+
+    # SQLite en memoria: el envío corre en el mismo hilo que las pruebas
+    monkeypatch.setattr(outbox.asyncio, "to_thread", _en_el_mismo_hilo)
+    asyncio.run(escenario())
+    assert len(enviados) == 1
+
+
+async def _en_el_mismo_hilo(func, *a, **k):
+    return func(*a, **k)
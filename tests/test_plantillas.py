@@ -0,0 +1,56 @@
+# Nombre de archivo: test_plantillas.py
+# Ubicación de archivo: tests/test_plantillas.py
+# User-provided custom instructions
+import importlib
+import os
+
+from docx import Document
+
+plantillas = importlib.import_module("sandybot.plantillas")
+
+
+def _crear_plantilla(ruta, texto="Original"):
+    doc = Document()
+    doc.add_paragraph(texto)
+    doc.add_table(rows=2, cols=2)
+    doc.save(ruta)
+
+
+def test_copia_independiente(tmp_path):
+    ruta = tmp_path / "plantilla.docx"
+    _crear_plantilla(ruta)
+    plantillas.invalidar_plantilla()
+
+    doc1, _ = plantillas.cargar_plantilla(ruta)
+    doc1.add_paragraph("Solo en la copia")
+    doc2, _ = plantillas.cargar_plantilla(ruta)
+
+    assert [p.text for p in doc2.paragraphs] == ["Original"]
+    assert len(doc1.paragraphs) == 2
+
+
+def test_preparar_una_vez_y_recarga(tmp_path):
+    ruta = tmp_path / "plantilla.docx"
+    _crear_plantilla(ruta)
+    plantillas.invalidar_plantilla()
+    llamadas = []
+
+    def preparar(doc):
+        llamadas.append(1)
+        tabla = doc.tables[0]
+        tabla._tbl.getparent().remove(tabla._tbl)
+        return doc.paragraphs[0].text
+
+    doc, extra = plantillas.cargar_plantilla(ruta, preparar)
+    plantillas.cargar_plantilla(ruta, preparar)
+    assert extra == "Original"
+    assert not doc.tables
+    assert len(llamadas) == 1
+
+    # Una plantilla nueva en la misma ruta invalida la cache
+    _crear_plantilla(ruta, "Nueva versión")
+    st = ruta.stat()
+    os.utime(ruta, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    _, extra = plantillas.cargar_plantilla(ruta, preparar)
+    assert extra == "Nueva versión"
+    assert len(llamadas) == 2
@@ -149,7 +149,7 @@ def test_procesar_correos(tmp_path):
         enviados["cuerpo"] = cuerpo
         return True
 
-    tarea_mod.enviar_correo = fake_enviar
+    tarea_mod.encolar_correo = fake_enviar
 
     servicio = bd.crear_servicio(nombre="Srv", cliente="Cli")
 
@@ -225,7 +225,7 @@ def test_procesar_correos_varios(tmp_path):
         enviados["cuerpo"] = cuerpo
         return True
 
-    tarea_mod.enviar_correo = fake_enviar
+    tarea_mod.encolar_correo = fake_enviar
 
     servicio = bd.crear_servicio(nombre="Srv", cliente="Cli")
 
@@ -301,7 +301,7 @@ def test_procesar_correos_zip(tmp_path):
         enviados["cuerpo"] = cuerpo
         return True
 
-    tarea_mod.enviar_correo = fake_enviar
+    tarea_mod.encolar_correo = fake_enviar
 
     servicio = bd.crear_servicio(nombre="Srv", cliente="Cli")
 
@@ -392,8 +392,13 @@ def test_procesar_correos_sin_libreria(tmp_path):
     assert msg.sent is None
 
 
-def test_leer_msg_html(tmp_path, monkeypatch):
-    """Convierte htmlBody a texto plano."""
+def test_procesar_correos_concurrente_aislado(tmp_path, monkeypatch):
+    """Un adjunto fallido no frena al resto y GPT respeta el límite."""
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+    # Otros tests dejan stubs de estos módulos; se usan los reales
+    monkeypatch.setitem(sys.modules, "sandybot.database", bd)
+    if not hasattr(sys.modules.get("sandybot.email_utils"), "extraer_tarea_correo"):
+        monkeypatch.delitem(sys.modules, "sandybot.email_utils", raising=False)
 
     pkg = "sandybot.handlers"
     if pkg not in sys.modules:
@@ -406,61 +411,57 @@ def test_leer_msg_html(tmp_path, monkeypatch):
         mod_name,
         ROOT_DIR / "Sandy bot" / "sandybot" / "handlers" / "procesar_correos.py",
     )
-    mod = importlib.util.module_from_spec(spec)
-    sys.modules[mod_name] = mod
-    spec.loader.exec_module(mod)
+    tarea_mod = importlib.util.module_from_spec(spec)
+    sys.modules[mod_name] = tarea_mod
+    spec.loader.exec_module(tarea_mod)
+    tarea_mod.encolar_correo = lambda *a, **k: True
+    monkeypatch.setattr(tarea_mod.config, "CORREOS_CONCURRENCIA", 2, raising=False)
 
-    class MsgHTML:
-        def __init__(self, path):
-            self.subject = "A"
-            self.body = ""
-            self.htmlBody = "<html><body>hola <b>mundo</b></body></html>"
-            self.rtfBody = ""
+    respuestas = []
 
-        def close(self):
-            pass
+    async def responder(_msg, _uid, _nombre, texto, _modo, **k):
+        respuestas.append(texto)
 
-    stub = ModuleType("extract_msg")
-    stub.Message = MsgHTML
-    monkeypatch.setitem(sys.modules, "extract_msg", stub)
+    tarea_mod.responder_registrando = responder
 
-    arch = tmp_path / "mail.msg"
-    arch.write_text("x")
-    texto = mod._leer_msg(str(arch))
-    assert "hola" in texto and "mundo" in texto
+    servicio = bd.crear_servicio(nombre="SrvC", cliente="Cli")
+    import sandybot.email_utils as email_utils
 
+    estado = {"activas": 0, "maximo": 0}
 
-def test_leer_msg_bytes(tmp_path, monkeypatch):
-    """Soporta cuerpos en bytes."""
+    class GPTStub(email_utils.gpt.__class__):
+        async def consultar_gpt(self, mensaje: str, cache: bool = True) -> str:
+            estado["activas"] += 1
+            estado["maximo"] = max(estado["maximo"], estado["activas"])
+            await asyncio.sleep(0.01)
+            estado["activas"] -= 1
+            if "roto" in mensaje:
+                return "sin json"
+            return (
+                '{"inicio": "2024-01-02T08:00:00", "fin": "2024-01-02T10:00:00", '
+                '"tipo": "Mant", "afectacion": "1h", "ids": [' + str(servicio.id) + "]}"
+            )
+
+        async def procesar_json_response(self, resp, esquema):
+            import json
+
+            return json.loads(resp)
+
+    monkeypatch.setattr(email_utils, "gpt", GPTStub())
+
+    docs = [Document(file_name=f"ok{i}.msg", content="dummy") for i in range(4)]
+    docs.insert(1, Document(file_name="roto.msg", content="roto"))
+    msg = Message(documents=docs)
+    ctx = SimpleNamespace(args=["Cliente"])
+
+    with bd.SessionLocal() as s:
+        previas = s.query(bd.TareaProgramada).count()
+    asyncio.run(tarea_mod.procesar_correos(Update(message=msg), ctx))
+    with bd.SessionLocal() as s:
+        assert s.query(bd.TareaProgramada).count() == previas + 4
+
+    assert estado["maximo"] <= 2
+    assert len(respuestas) == 1
+    assert "Tareas registradas" in respuestas[0]
+    assert "roto.msg" in respuestas[0]
 
-    pkg = "sandybot.handlers"
-    mod_name = f"{pkg}.procesar_correos"
-    if mod_name in sys.modules:
-        mod = sys.modules[mod_name]
-    else:
-        spec = importlib.util.spec_from_file_location(
-            mod_name,
-            ROOT_DIR / "Sandy bot" / "sandybot" / "handlers" / "procesar_correos.py",
-        )
-        mod = importlib.util.module_from_spec(spec)
-        sys.modules[mod_name] = mod
-        spec.loader.exec_module(mod)
-
-    class MsgBytes:
-        def __init__(self, path):
-            self.subject = b"A"
-            self.body = b"cuerpo bytes"
-            self.htmlBody = b""
-            self.rtfBody = b""
-
-        def close(self):
-            pass
-
-    stub = ModuleType("extract_msg")
-    stub.Message = MsgBytes
-    monkeypatch.setitem(sys.modules, "extract_msg", stub)
-
-    arch = tmp_path / "mail.msg"
-    arch.write_text("x")
-    texto = mod._leer_msg(str(arch))
-    assert "cuerpo bytes" in texto
@@ -0,0 +1,158 @@
+# Nombre de archivo: test_smtp_pool.py
+# Ubicación de archivo: tests/test_smtp_pool.py
+# User-provided custom instructions
+"""Pruebas del pool SMTP contra un servidor local mínimo.
+
+``aiosmtpd`` no forma parte de las dependencias, así que se levanta un
+servidor SMTP muy simple con ``socketserver`` que cuenta conexiones, mensajes
+y ``NOOP`` y permite cortar las sesiones abiertas.
+"""
+import importlib
+import socketserver
+import threading
+
+import pytest
+
+smtp_pool = importlib.import_module("sandybot.smtp_pool")
+smtplib = smtp_pool.smtplib
+if not hasattr(smtplib, "SMTPServerDisconnected"):  # pragma: no cover
+    pytest.skip("smtplib reemplazado por otro test", allow_module_level=True)
+
+
+class _Manejador(socketserver.StreamRequestHandler):
+    def _responder(self, texto: str) -> None:
+        self.wfile.write(f"{texto}\r\n".encode())
+
+    def handle(self):
+        srv = self.server
+        with srv.lock:
+            srv.conexiones += 1
+            srv.sockets.append(self.connection)
+        self._responder("220 prueba")
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            comando = linea.decode().strip().upper()
+            if comando.startswith(("EHLO", "HELO")):
+                self._responder("250 prueba")
+            elif comando == "NOOP":
+                srv.noops += 1
+                self._responder("250 OK")
+            elif comando == "DATA":
+                self._responder("354 fin con .")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                srv.mensajes += 1
+                self._responder("250 OK")
+            elif comando == "QUIT":
+                self._responder("221 chau")
+                return
+            else:  # MAIL, RCPT, RSET
+                self._responder("250 OK")
+
+
+class _Servidor(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Manejador)
+        self.lock = threading.Lock()
+        self.conexiones = self.mensajes = self.noops = 0
+        self.sockets = []
+
+    def cortar_sesiones(self):
+        """Simula que el servidor cierra las sesiones inactivas."""
+        import socket
+
+        with self.lock:
+            for s in self.sockets:
+                try:
+                    s.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.sockets.clear()
+
+
+@pytest.fixture
+def servidor():
+    srv = _Servidor()
+    hilo = threading.Thread(target=srv.serve_forever, daemon=True)
+    hilo.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _enviar(pool, srv):
+    return pool.enviar(
+        lambda s: s.sendmail("a@x.com", ["b@x.com"], "Subject: x\r\n\r\nhola"),
+        smtplib.SMTP,
+        "127.0.0.1",
+        srv.server_address[1],
+    )
+
+
+def test_reutiliza_la_sesion(servidor):
+    pool = smtp_pool.PoolSMTP()
+    for _ in range(5):
+        _enviar(pool, servidor)
+    pool.cerrar()
+    assert servidor.mensajes == 5
+    assert servidor.conexiones == 1
+
+
+def test_noop_al_superar_keepalive(servidor):
+    pool = smtp_pool.PoolSMTP(keepalive=0)
+    _enviar(pool, servidor)
+    _enviar(pool, servidor)
+    pool.cerrar()
+    assert servidor.noops == 1
+    assert servidor.conexiones == 1
+
+
+def test_reconecta_si_el_servidor_corta(servidor):
+    pool = smtp_pool.PoolSMTP()
+    _enviar(pool, servidor)
+    servidor.cortar_sesiones()
+    _enviar(pool, servidor)
+    pool.cerrar()
+    assert servidor.mensajes == 2
+    assert servidor.conexiones == 2
+
+
+def test_no_reintenta_destinatario_rechazado(servidor):
+    pool = smtp_pool.PoolSMTP()
+
+    def rechazo(smtp):
+        raise smtplib.SMTPRecipientsRefused({"b@x.com": (550, b"no")})
+
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.enviar(rechazo, smtplib.SMTP, "127.0.0.1", servidor.server_address[1])
+    assert servidor.conexiones == 1
+
+
+def test_no_mezcla_sesiones_con_y_sin_tls():
+    """Una sesión abierta sin STARTTLS no se reutiliza para un envío con TLS."""
+    abiertas = []
+
+    class FalsoSMTP:
+        def __init__(self, host, port):
+            self.tls = False
+            abiertas.append(self)
+
+        def starttls(self):
+            self.tls = True
+
+        def quit(self):
+            pass
+
+    usadas = []
+    pool = smtp_pool.PoolSMTP()
+    for tls in (False, True, False, True):
+        pool.enviar(usadas.append, FalsoSMTP, "h", 25, starttls=tls)
+    pool.cerrar()
+
+    assert len(abiertas) == 2
+    assert [s.tls for s in usadas] == [False, True, False, True]
@@ -80,6 +80,7 @@ def test_supermenu_teclado():
         "/CDB_Ingresos",
         "/CDB_Tareas",
         "/CDB_TareasServicio",
+        "/CDB_CorreosFallidos",
     ]
 
 
@@ -180,3 +181,35 @@ def test_depurar_duplicados():
     texto = asyncio.run(_run("depurar_duplicados", []))["texto"]
     assert "Servicios eliminados: 1" in texto
     assert "Reclamos eliminados: 1" in texto
+
+
+def test_reintentar_correos_fallidos():
+    bd.Base.metadata.drop_all(bind=bd.engine)
+    bd.Base.metadata.create_all(bind=bd.engine)
+    with bd.SessionLocal() as s:
+        fallido = bd.CorreoSaliente(
+            clave="f",
+            destinatarios=["a@x.com"],
+            asunto="A",
+            estado="fallido",
+            intentos=6,
+            ultimo_error="sin conexión",
+        )
+        enviado = bd.CorreoSaliente(
+            clave="e", destinatarios=["b@x.com"], asunto="B", estado="enviado"
+        )
+        s.add_all([fallido, enviado])
+        s.commit()
+
+    listado = asyncio.run(_run("listar_correos_fallidos", []))["texto"]
+    assert f"#{fallido.id}" in listado and "/Reintentar_Correo" in listado
+
+    texto = asyncio.run(
+        _run("reintentar_correos_fallidos", [f"#{fallido.id}", str(enviado.id)])
+    )["texto"]
+    assert f"Reencolados: #{fallido.id}" in texto
+    assert f"no están fallidos: #{enviado.id}" in texto
+    assert bd.obtener_correos_fallidos() == []
+
+    uso = asyncio.run(_run("reintentar_correos_fallidos", []))["texto"]
+    assert uso.startswith("Usá: /Reintentar_Correo")
@@ -103,7 +103,7 @@ def test_registrar_tarea_programada(tmp_path):
         enviados["cid"] = cid
         return True
 
-    tarea_mod.enviar_correo = fake_enviar
+    tarea_mod.encolar_correo = fake_enviar
 
     # Crear servicio previo
     servicio = bd.crear_servicio(nombre="Srv", cliente="Cli")
@@ -173,7 +173,7 @@ def test_reenviar_aviso(tmp_path):
         enviados["cid"] = cid
         return True
 
-    mod.enviar_correo = fake_enviar
+    mod.encolar_correo = fake_enviar
 
     cli = bd.Cliente(nombre="Cli2", destinatarios=["d@x.com"])
     with bd.SessionLocal() as s:
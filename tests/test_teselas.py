@@ -0,0 +1,83 @@
+# Nombre de archivo: test_teselas.py
+# Ubicación de archivo: tests/test_teselas.py
+# User-provided custom instructions
+import importlib
+import io
+import os
+
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.image as mpimg  # noqa: E402
+
+teselas = importlib.import_module("sandybot.teselas")
+
+
+def _png(color):
+    buf = io.BytesIO()
+    mpimg.imsave(buf, np.full((256, 256, 3), color, dtype=np.uint8), format="png")
+    return buf.getvalue()
+
+
+def test_offline_no_descarga(tmp_path, monkeypatch):
+    cache = teselas.CacheTeselas(tmp_path, "http://x/{z}/{x}/{y}.png", 10**9, offline=True)
+    monkeypatch.setattr(cache, "_descargar", lambda *a: (_ for _ in ()).throw(AssertionError))
+    assert cache.obtener(16, 1, 1) is None
+
+    ruta = tmp_path / "16" / "1" / "1.png"
+    ruta.parent.mkdir(parents=True)
+    ruta.write_bytes(_png(10))
+    assert cache.obtener(16, 1, 1) == _png(10)
+
+
+def test_precarga_rechaza_servidor_osm(tmp_path, monkeypatch):
+    cache = teselas.CacheTeselas(
+        tmp_path, "https://tile.openstreetmap.org/{z}/{x}/{y}.png", 10**9
+    )
+    monkeypatch.setattr(cache, "_descargar", lambda *a: (_ for _ in ()).throw(AssertionError))
+    try:
+        cache.precargar()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Se esperaba ValueError")
+
+
+def test_desalojo_lru(tmp_path, monkeypatch):
+    datos = _png(200)
+    cache = teselas.CacheTeselas(tmp_path, "http://x", len(datos) * 3 - 1, offline=False)
+    monkeypatch.setattr(cache, "_descargar", lambda z, x, y: datos)
+
+    cache.obtener(1, 0, 0)
+    cache.obtener(1, 0, 1)
+    # Se envejece la primera y luego se la vuelve a usar: la LRU es la segunda
+    for y, edad in ((0, 100), (1, 50)):
+        ruta = tmp_path / "1" / "0" / f"{y}.png"
+        os.utime(ruta, (ruta.stat().st_atime - edad, ruta.stat().st_mtime - edad))
+    cache.obtener(1, 0, 0)
+    cache.obtener(1, 1, 0)
+
+    assert (tmp_path / "1" / "0" / "0.png").exists()
+    assert not (tmp_path / "1" / "0" / "1.png").exists()
+    assert (tmp_path / "1" / "1" / "0.png").exists()
+
+
+def test_mapa_base_sin_red(tmp_path):
+    cache = teselas.CacheTeselas(tmp_path, "http://x", 10**9, offline=True)
+    x, y = teselas.lonlat_a_tesela(-58.4, -34.6, 16)
+    ruta = tmp_path / "16" / str(x) / f"{y}.png"
+    ruta.parent.mkdir(parents=True)
+    ruta.write_bytes(_png(255))
+
+    lado = 2 * teselas.ORIGEN_MERCATOR / 2 ** 16
+    xmin = -teselas.ORIGEN_MERCATOR + x * lado
+    ymax = teselas.ORIGEN_MERCATOR - y * lado
+    imagen, ext = teselas.componer_mapa_base(
+        xmin + 10, xmin + lado * 1.5, ymax - lado * 0.5, ymax - 10, zoom=16, cache=cache
+    )
+    assert imagen.shape == (256, 512, 4)
+    # La tesela presente es blanca y la faltante queda en gris
+    assert np.allclose(imagen[:, :256, :3], 1.0)
+    assert np.allclose(imagen[:, 256:, :3], 0.9)
+    assert ext[0] == xmin and ext[3] == ymax
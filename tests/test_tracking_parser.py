@@ -32,8 +32,8 @@ def test_parse_and_generate_excel(tmp_path):
     parser.parse_file(str(archivo))
 
     assert len(parser._data) == 1
-    df = parser._data[0][1]
-    assert list(df["camara"]) == ["Camara A", "Camara B"]
+    assert parser.camaras(0) == ["Camara A", "Camara B"]
+    assert parser._data[0][1][0] == ("Camara A", "10")
 
     with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp_excel:
         parser.generate_excel(tmp_excel.name)
@@ -43,3 +43,114 @@ def test_parse_and_generate_excel(tmp_path):
     assert "Coincidencias" in wb.sheetnames
 
     os.remove(ruta_excel)
+
+
+def test_parse_latin1(tmp_path):
+    archivo = tmp_path / "latin1.txt"
+    archivo.write_bytes("* 5 mts\nEmpalme 1: Cámara Ñandú\n".encode("latin-1"))
+
+    parser = TrackingParser()
+    parser.parse_file(str(archivo))
+
+    assert parser.camaras(0) == ["Cámara Ñandú"]
+    assert parser._data[0][1][0].distancia == "5"
+
+
+def test_iterar_registros_es_generador(tmp_path):
+    archivo = tmp_path / "t.txt"
+    archivo.write_text("Empalme 1: A\n* 3.5 MTS\nEmpalme 2: B\n", encoding="utf-8")
+
+    gen = tracking_parser.iterar_registros(str(archivo))
+    assert next(gen) == tracking_parser.RegistroTracking("A", "")
+    assert next(gen) == tracking_parser.RegistroTracking("B", "3.5")
+
+
+def test_parse_files_paralelo_orden_y_errores(tmp_path):
+    archivos = []
+    for i in range(4):
+        ruta = tmp_path / f"t{i}.txt"
+        ruta.write_text(f"* {i} mts\nEmpalme 1: Camara {i}\n", encoding="utf-8")
+        archivos.append((str(ruta), f"Hoja {i}"))
+    # Un archivo inexistente no debe frenar al resto
+    archivos.insert(2, (str(tmp_path / "falta.txt"), "Falta"))
+
+    parser = TrackingParser()
+    errores = parser.parse_files(archivos, procesos=2)
+
+    assert [ruta for ruta, _ in errores] == [str(tmp_path / "falta.txt")]
+    assert [hoja for hoja, _ in parser._data] == [f"Hoja {i}" for i in range(4)]
+    assert [parser.camaras(i) for i in range(4)] == [[f"Camara {i}"] for i in range(4)]
+
+
+def test_cache_por_contenido(tmp_path, monkeypatch):
+    archivo = tmp_path / "tracking_1.txt"
+    archivo.write_text("* 5 mts\nEmpalme 1: Camara X\n", encoding="utf-8")
+    cache = tracking_parser.CacheTrackings(tmp_path / "cache")
+
+    TrackingParser(cache=cache).parse_file(str(archivo))
+    clave = tracking_parser.hash_archivo(str(archivo))
+    assert (tmp_path / "cache" / f"{clave}.json").exists()
+
+    # Una segunda lectura (incluso con otra instancia) no vuelve a parsear
+    def falla(_):
+        raise AssertionError("se volvió a parsear")
+
+    with monkeypatch.context() as m:
+        m.setattr(tracking_parser, "_parsear_archivo", falla)
+        otra = TrackingParser(cache=tracking_parser.CacheTrackings(tmp_path / "cache"))
+        assert otra.parse_files([(str(archivo), "A")]) == []
+        assert otra._data[0][1] == [("Camara X", "5")]
+
+    # Si cambia el contenido la clave es otra y se parsea de nuevo
+    archivo.write_text("Empalme 1: Camara Y\n", encoding="utf-8")
+    parser = TrackingParser(cache=cache)
+    parser.parse_file(str(archivo))
+    assert parser.camaras(0) == ["Camara Y"]
+
+
+def test_matriz_superposicion_y_compartidas(tmp_path):
+    rutas = {
+        "A": ["Camara 1", "Camara 2", "Camara 3"],
+        "B": ["Camara 2", "Camara 3"],
+        "C": ["Camara 3", "Camara 4"],
+    }
+    parser = TrackingParser()
+    for hoja, camaras in rutas.items():
+        archivo = tmp_path / f"{hoja}.txt"
+        archivo.write_text(
+            "".join(f"Empalme {i}: {c}\n" for i, c in enumerate(camaras, 1)),
+            encoding="utf-8",
+        )
+        parser.parse_file(str(archivo), sheet_name=hoja)
+
+    assert parser.matriz_superposicion() == [[3, 2, 1], [2, 2, 1], [1, 1, 2]]
+    assert parser.camaras_compartidas(2) == [
+        ("Camara 3", ["A", "B", "C"]),
+        ("Camara 2", ["A", "B"]),
+    ]
+
+    salida = tmp_path / "salida.xlsx"
+    parser.generate_excel(str(salida))
+    hoja = openpyxl.load_workbook(salida)["Superposicion"]
+    assert [c.value for c in hoja[2]] == ["A", 3, 2, 1]
+    assert hoja.cell(row=8, column=1).value == "Camara 3"
+
+
+def test_coincidencias_normalizadas(tmp_path):
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_text("Empalme 1: Cam. Av. Gral Paz\nEmpalme 2: Camara Sur\n", encoding="utf-8")
+    b.write_text("Empalme 1: camara avenida general paz\n", encoding="utf-8")
+    parser = TrackingParser()
+    parser.parse_file(str(a), sheet_name="A")
+    parser.parse_file(str(b), sheet_name="B")
+
+    assert parser._find_common_chambers() == ["Cam. Av. Gral Paz"]
+
+    salida = tmp_path / "salida.xlsx"
+    parser.generate_excel(str(salida))
+    filas = list(openpyxl.load_workbook(salida)["Coincidencias"].values)
+    assert filas == [
+        ("camara", "A", "B"),
+        ("Cam. Av. Gral Paz", "Cam. Av. Gral Paz", "camara avenida general paz"),
+    ]
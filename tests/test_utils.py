@@ -42,6 +42,20 @@ def test_normalizar_camara_abreviaturas():
     esperado = "avenida general san martin"
     assert utils.normalizar_camara("Av. Gral. San Martín") == esperado
 
+def test_normalizar_camara_igual_a_secuencial():
+    def secuencial(texto):
+        t = utils.normalizar_texto(texto)
+        for patron, reemplazo in utils.REEMPLAZOS_REGEX.items():
+            t = patron.sub(reemplazo, t)
+        return re.sub(r"\s+", " ", re.sub(r"[.,;:]", "", t)).strip()
+
+    fichas = ["cam", "av", "gral", "cra", "x", "Cám", "AV", " ", ".", ",", "-"]
+    for a in fichas:
+        for b in fichas:
+            for c in fichas:
+                texto = a + b + c + "." + a + c
+                assert utils.normalizar_camara(texto) == secuencial(texto), texto
+
 def test_guardar_y_cargar_json(tmp_path):
     datos = {"a": 1}
     archivo = tmp_path / "data.json"